@@ -1,7 +1,12 @@
 import ui
+from chatbot.config import WARMUP_RESOURCES
+from chatbot.resources import registry
 
 def main():
     """Main function to run the chatbot app."""
+    # Load indexes and models up front instead of on the first user query
+    if not registry.load_times():
+        registry.warmup(WARMUP_RESOURCES)
     user_query = ui.setup_ui()
     ui.handle_chat(user_query)
 
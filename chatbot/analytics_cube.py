@@ -0,0 +1,136 @@
+import itertools
+import numpy as np
+import pandas as pd
+from chatbot.resources import register, get_resource
+from chatbot.entity_filters import PRICE_TIERS, parse_locations
+
+DIMENSIONS = ("city", "menu_category", "category")
+ALL = "*"  # Dimension value of a rollup over every member
+PRICE_ORDINALS = {tier: ordinal for ordinal, tier in enumerate(PRICE_TIERS, start=1)}
+
+
+def _restaurant_facts(df):
+    """
+    One row per (restaurant, city, menu category, restaurant category) with the
+    restaurant's numeric price tier, mean rating and review total in that city.
+    """
+    base = df[["restaurant_name", "city", "address1", "menu_category", "categories",
+               "rating", "review_count", "price"]].astype(object)
+
+    # review_count and rating repeat on every menu row of a location
+    locations = base.drop_duplicates(["restaurant_name", "city", "address1"]).assign(
+        price=lambda x: x["price"].map(PRICE_ORDINALS).astype(float),
+        rating=lambda x: pd.to_numeric(x["rating"], errors="coerce"),
+        review_count=lambda x: pd.to_numeric(x["review_count"], errors="coerce"),
+    )
+    restaurants = locations.groupby(["restaurant_name", "city"]).agg(
+        price=("price", "mean"), rating=("rating", "mean"), review_count=("review_count", "sum")
+    ).reset_index()
+
+    links = base[["restaurant_name", "city", "menu_category", "categories"]].drop_duplicates()
+    links = links.assign(category=links["categories"].str.split("|")).explode("category")
+    links["category"] = links["category"].str.strip()
+    links = links.drop(columns="categories").drop_duplicates()
+    return links.merge(restaurants, on=["restaurant_name", "city"])
+
+
+class AnalyticsCube:
+    """
+    Price / popularity aggregates for every city x menu_category x restaurant
+    category cell, plus every rollup of them (ALL in a dimension), computed
+    once from the menu data. `cell()` is a dict lookup.
+    """
+
+    def __init__(self, df):
+        facts = _restaurant_facts(df)
+        self.members = {dimension: set(facts[dimension].dropna()) - {"nan", ""} for dimension in DIMENSIONS}
+        self.cells = {}
+
+        for included in itertools.product((True, False), repeat=len(DIMENSIONS)):
+            keys = [dimension for dimension, keep in zip(DIMENSIONS, included) if keep]
+            # Each restaurant counts once per cell, however many menu rows it has there
+            rows = facts.drop_duplicates(["restaurant_name", "city"] + keys)
+            grouped = rows.groupby(keys) if keys else rows.groupby(np.zeros(len(rows)))
+            stats = grouped.agg(
+                restaurants=("restaurant_name", "size"), mean_price=("price", "mean"),
+                mean_rating=("rating", "mean"), total_reviews=("review_count", "sum"),
+            )
+            for values, row in zip(stats.index, stats.itertuples(index=False)):
+                values = iter(values if isinstance(values, tuple) else (values,))
+                key = tuple(next(values) if keep else ALL for keep in included)
+                self.cells[key] = self._metrics(row)
+
+    @staticmethod
+    def _metrics(row):
+        mean_price = None if np.isnan(row.mean_price) else round(float(row.mean_price), 2)
+        return {
+            "restaurants": int(row.restaurants),
+            "mean_price_tier": mean_price,
+            "typical_price": PRICE_TIERS[int(round(mean_price)) - 1] if mean_price else None,
+            "mean_rating": None if np.isnan(row.mean_rating) else round(float(row.mean_rating), 2),
+            "total_reviews": int(row.total_reviews),
+        }
+
+    def cell(self, city=ALL, menu_category=ALL, category=ALL):
+        """
+        Returns:
+            dict or None: The aggregates of the cell, None when no restaurant falls in it.
+        """
+        return self.cells.get((city, menu_category, category))
+
+    def resolve(self, term):
+        """
+        Finds the dimension of an extracted term: a restaurant category
+        ("mexican") first, then a menu category ("tacos").
+
+        Returns:
+            str or None: "category", "menu_category" or None when unknown.
+        """
+        for dimension in ("category", "menu_category"):
+            if term in self.members[dimension]:
+                return dimension
+        return None
+
+    def compare(self, entities):
+        """
+        Answers a comparative question from the extracted entities: each
+        cuisine / category term is looked up in each requested city.
+
+        Returns:
+            list: One record per (location, term) found in the cube, empty when
+            nothing matched, when none of the extracted cuisines is in the cube,
+            or when neither a city nor a cuisine was extracted.
+        """
+        locations = parse_locations(entities.get("location"))
+        cities = [city for city in locations if city in self.members["city"]]
+        if locations and not cities:
+            return []  # Only cities outside the dataset were asked for
+
+        requested = [str(value).lower().strip()
+                     for value in list(entities.get("menu_category") or []) + list(entities.get("menu_item") or [])]
+        requested = [term for term in requested if term]
+        terms = []
+        for term in requested:
+            dimension = self.resolve(term)
+            if dimension and (term, dimension) not in terms:
+                terms.append((term, dimension))
+        if requested and not terms:
+            return []  # Only cuisines outside the cube: leave the question to the graph / FAISS search
+        if not terms and not cities:
+            return []  # Neither a city nor a cuisine: a grand total answers nothing
+        if not terms:
+            terms = [(ALL, "category")]  # No cuisine: compare the cities themselves
+
+        records = []
+        for city in cities or [ALL]:
+            for term, dimension in terms:
+                cell = self.cell(city=city, **{dimension: term})
+                if cell:
+                    records.append({"location": "all cities" if city == ALL else city,
+                                    dimension: "all" if term == ALL else term, **cell})
+        return records
+
+
+@register("analytics_cube")
+def _load_analytics_cube():
+    return AnalyticsCube(get_resource("menu_data"))
@@ -1,22 +1,117 @@
 # 
 import os
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
+from chatbot.resources import register, get_resource
 
 # Load environment variables
 load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-if not GROQ_API_KEY:
-    raise ValueError("❌ API Key not found. Please set GROQ_API_KEY in your .env file.")
+
+def _chat_model(model_name):
+    from langchain_groq import ChatGroq
+
+    if not GROQ_API_KEY:
+        raise ValueError("❌ API Key not found. Please set GROQ_API_KEY in your .env file.")
+    return ChatGroq(model_name=model_name, temperature=0.7)
+
 
 # Initialize Groq LLM
-llm = ChatGroq(
-    model_name="llama-3.3-70b-versatile",
-    temperature=0.7
-)
-
-slm = ChatGroq(
-    model_name="llama3-8b-8192",
-    temperature=0.7
-)
\ No newline at end of file
+@register("llm")
+def _load_llm():
+    return _chat_model("llama-3.3-70b-versatile")
+
+
+@register("slm")
+def _load_slm():
+    return _chat_model("llama3-8b-8192")
+
+
+def __getattr__(name):
+    # `config.llm` builds the client on first access; the chatbot modules call
+    # get_resource("llm") when they run, so importing them builds no client.
+    if name in ("llm", "slm"):
+        return get_resource(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Embedding model shared by the FAISS index builder and the query path
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
+EMBEDDING_BACKEND = "fp32"  # "fp32" or "int8" (dynamically quantized, CPU); changing it re-embeds on the next build
+EMBEDDING_THREADS = None  # Torch intra-op threads for embedding (None keeps torch's default)
+
+# FAISS index built by database.py and the metadata stored alongside it
+FAISS_INDEX_PATH = "faiss_index_2.bin"
+FAISS_METADATA_PATH = "metadata_2.bin"
+FAISS_LEGACY_METADATA_PATH = "metadata_2.pkl"  # Pickled list of dicts, used until database.py writes the store
+
+# Incremental-build state: per-group content hashes / ids, and the vectors indexed by id
+FAISS_MANIFEST_PATH = "faiss_index_2.manifest.json"
+FAISS_VECTORS_PATH = "faiss_vectors_2.npy"
+
+# Optional item-level index: one compressed vector per menu item row, rolled up to its group.
+# Built with `python database.py --item-index-type pq` (or sq8); used when FAISS_SEARCH_LEVEL is "item".
+FAISS_ITEM_INDEX_PATH = "faiss_items_2.bin"
+FAISS_ITEM_PARENTS_PATH = "faiss_items_2_parents.npy"  # Group (FAISS) id of every item vector
+FAISS_ITEM_VECTORS_PATH = "faiss_item_vectors_2.npy"
+FAISS_ITEM_MANIFEST_PATH = "faiss_items_2.manifest.json"
+FAISS_SEARCH_LEVEL = "category"  # "category" or "item"
+FAISS_ITEM_CANDIDATES = 50  # Item hits rolled up into the top 10 groups
+
+# Query-time overrides for approximate indexes (None keeps the values stored at build time)
+FAISS_NPROBE = None
+FAISS_EF_SEARCH = None
+
+# Entity-filtered FAISS searches scan the stored vectors exactly when at most this many documents match
+FAISS_FILTER_EXACT_MAX = 2048
+
+# Query-embedding cache (in-memory LRU in front of an on-disk store)
+EMBEDDING_CACHE_DIR = ".cache/query_embeddings"
+EMBEDDING_CACHE_SIZE = 1024
+EMBEDDING_CACHE_DISK_SIZE = 50000  # Rows kept on disk; past it the oldest half is compacted away
+
+# Hybrid retrieval: BM25 over items / descriptions / ingredients fused with FAISS by reciprocal rank
+RETRIEVAL_MODE = "hybrid"  # "hybrid" or "vector" (FAISS only)
+BM25_CANDIDATES = 10  # BM25 hits fused with the FAISS top 10
+RRF_K = 60  # Reciprocal-rank-fusion constant
+
+# Cross-encoder rerank stage applied to the FAISS candidates
+RERANKER_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+RERANK_DOC_TEXT = "name"  # "name" (restaurant + category) or "rich" (adds items and ingredients)
+RERANK_DOC_TOKENS = 256  # Token budget for "rich" document text, applied once at load
+RERANK_MAX_CANDIDATES = 10  # At most this many FAISS candidates are scored per query
+RERANK_SKIP_MARGIN = 0.25  # Skip reranking when the top hit beats the runner-up by this relative distance gap (None: always rerank)
+RERANK_CACHE_SIZE = 4096  # (query, doc_id) scores kept in memory
+
+# Graph template subcategories are picked by nearest labeled examples (chatbot/subcategory_router.py);
+# below either threshold the SLM chooses instead
+SUBCATEGORY_ROUTER = True
+ROUTER_MIN_SIMILARITY = 0.5  # Cosine similarity of the closest example
+ROUTER_MIN_MARGIN = 0.03  # Lead over the runner-up subcategory
+
+# LLM-generated Cypher is cached as parameterized templates keyed by the question's shape
+CYPHER_CACHE_SIZE = 512
+CYPHER_CACHE_PATH = ".cache/cypher_templates.jsonl"  # None keeps the cache in memory only
+
+# Memory-map the FAISS index instead of reading it into RAM
+FAISS_MMAP = True
+
+# "neo4j": the remote knowledge graph; "memory": chatbot/memory_graph.py built from
+# STRUCTURED_DATA_DIR, which answers the QUERY_DICTIONARY templates in-process
+GRAPH_BACKEND = "neo4j"
+# Serve trending_ingredients / ingredient_trends / ingredient_use / popular_dishes from counts
+# materialized once per data load (chatbot/trending_aggregates.py) instead of the graph
+MATERIALIZED_TRENDS = True
+TRENDING_AGGREGATES_PATH = "trending_aggregates.json"
+
+# Menu dataset used by the structured (pandas) search
+MENU_DATA_PATH = "cleaned_menu_data.csv"
+CSV_SNAPSHOTS = True  # Cache parsed CSVs as memory-mapped columns next to the file (see chatbot/csv_snapshot.py)
+# "pandas": in-memory menu data; "sqlite": STRUCTURED_DB_PATH, built with `python -m chatbot.sql_store`
+STRUCTURED_BACKEND = "pandas"
+STRUCTURED_DATA_DIR = "structured_internal_data"  # CSVs written by helper_files/internal_data_transform.py
+STRUCTURED_DB_PATH = "menudata.db"
+STRUCTURED_TOP_N = 10  # Restaurants returned by the structured search, most matching menu rows first
+
+# Resources app.py loads before the first question; one that fails to load is logged and
+# retried on first use (e.g. a missing FAISS index only disables the unstructured search)
+WARMUP_RESOURCES = ["llm", "slm", "embedding_model", "faiss_index", "faiss_metadata", "menu_data", "subcategory_router"]
@@ -0,0 +1,174 @@
+import os
+import json
+import shutil
+import hashlib
+import inspect
+import numpy as np
+import pandas as pd
+from chatbot.config import CSV_SNAPSHOTS
+
+# Layout: <snapshot dir>/manifest.json plus one .npy file per numeric column, and
+# int32 codes (.npy) + distinct values (in the manifest) per text / categorical
+# column. Numeric columns and codes are memory-mapped on load; text columns are
+# rebuilt from the decoded value lists, categoricals wrap them without a copy.
+SNAPSHOT_VERSION = 1
+
+
+def snapshot_dir(csv_path, name):
+    """cleaned_menu_data.csv + "normalized" -> cleaned_menu_data.normalized.snapshot/"""
+    return f"{os.path.splitext(csv_path)[0]}.{name}.snapshot"
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _transform_hash(transform):
+    """
+    Identifies a transform by the source of the module defining it (its helpers
+    and column lists usually live there too), so editing it rebuilds the snapshot.
+
+    Returns:
+        str or None: The hash, None without a transform.
+    """
+    if transform is None:
+        return None
+    try:
+        source = inspect.getsource(inspect.getmodule(transform))
+    except (OSError, TypeError):
+        source = getattr(transform, "__qualname__", repr(transform))
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def _write_manifest(directory, manifest):
+    path = os.path.join(directory, "manifest.json")
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(manifest, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _signature(csv_path):
+    stat = os.stat(csv_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _to_python(value):
+    return None if pd.isna(value) else value.item() if isinstance(value, np.generic) else value
+
+
+def write_snapshot(df, directory, csv_path, source_hash=None, transform_hash=None):
+    """Writes `df` as memory-mappable columns, tagged with the CSV and transform it was built from."""
+    tmp_dir = f"{directory}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = []
+    for position, name in enumerate(df.columns):
+        column = df[name]
+        file_name = f"{position}.npy"
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes, values, kind = column.cat.codes.to_numpy(), column.cat.categories, "category"
+        elif pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column):
+            codes, values, kind = column.to_numpy(), None, "numeric"
+        else:  # Text: NaN gets code -1
+            codes, values, kind = *column.factorize(), "text"
+        if values is not None:
+            codes = codes.astype(np.int32)
+            values = [_to_python(value) for value in values]
+        np.save(os.path.join(tmp_dir, file_name), codes)
+        columns.append({"name": name, "kind": kind, "file": file_name, "values": values})
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "rows": len(df),
+        "source": {**_signature(csv_path), "sha256": source_hash or _file_hash(csv_path)},
+        "transform": transform_hash,
+        "columns": columns,
+    }
+    _write_manifest(tmp_dir, manifest)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_dir, directory)
+
+
+def read_snapshot(directory, manifest, writable=False):
+    """
+    Returns:
+        pd.DataFrame: The snapshot, with numeric columns backed by read-only memory maps
+        (copied into memory with `writable`).
+    """
+    data = {}
+    for column in manifest["columns"]:
+        codes = np.load(os.path.join(directory, column["file"]), mmap_mode="r", allow_pickle=False)
+        if column["kind"] == "numeric":
+            data[column["name"]] = np.array(codes) if writable else codes
+        elif column["kind"] == "category":
+            data[column["name"]] = pd.Categorical.from_codes(codes, categories=column["values"])
+        else:
+            values = np.array(column["values"] + [np.nan], dtype=object)  # Code -1 picks the NaN
+            data[column["name"]] = values[codes]
+    return pd.DataFrame(data, copy=False)
+
+
+def _valid_manifest(directory, csv_path, transform_hash=None):
+    """Returns the snapshot manifest if it still matches the CSV and transform, None otherwise."""
+    manifest_path = os.path.join(directory, "manifest.json")
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != SNAPSHOT_VERSION or manifest.get("transform") != transform_hash:
+        return None
+
+    source, signature = manifest["source"], _signature(csv_path)
+    if source["size"] == signature["size"] and source["mtime_ns"] == signature["mtime_ns"]:
+        return manifest
+    if source["size"] != signature["size"] or source["sha256"] != _file_hash(csv_path):
+        return None
+
+    # Touched or copied but unchanged: keep the snapshot and remember the new mtime
+    manifest["source"].update(signature)
+    _write_manifest(directory, manifest)
+    return manifest
+
+
+def load_csv(csv_path, transform=None, name="raw", use_snapshot=CSV_SNAPSHOTS, writable=False):
+    """
+    `pd.read_csv(csv_path)` followed by `transform`, served from a columnar
+    snapshot once one was written. The snapshot is rebuilt when the CSV's
+    size or content hash changes (an mtime change alone only triggers the
+    hash check) or when the module defining `transform` is edited. `name`
+    keeps snapshots of different transforms apart.
+
+    Numeric columns of a snapshot are read-only memory maps, so writing to
+    them in place raises; callers that modify the frame pass `writable=True`
+    to get them copied into memory.
+
+    Returns:
+        pd.DataFrame: The (transformed) CSV data.
+    """
+    if not use_snapshot:
+        df = pd.read_csv(csv_path)
+        return transform(df) if transform else df
+
+    directory = snapshot_dir(csv_path, name)
+    transform_hash = _transform_hash(transform)
+    manifest = _valid_manifest(directory, csv_path, transform_hash)
+    if manifest is not None:
+        return read_snapshot(directory, manifest, writable)
+
+    source_hash = _file_hash(csv_path)
+    df = pd.read_csv(csv_path)
+    if transform:
+        df = transform(df)
+    try:
+        write_snapshot(df, directory, csv_path, source_hash, transform_hash)
+        print(f"🔹 Wrote columnar snapshot {directory}")
+    except OSError as e:
+        print(f"⚠️ Could not write snapshot {directory}: {e}")
+    return df
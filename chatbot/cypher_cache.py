@@ -0,0 +1,238 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from chatbot.config import CYPHER_CACHE_SIZE, CYPHER_CACHE_PATH
+
+# Entities whose values become parameter slots of a cached query
+SLOT_KEYS = ("location", "menu_item", "ingredient_name", "menu_category")
+_STRING_LITERAL = re.compile(r"\"((?:[^\"\\]|\\.)*)\"|'((?:[^'\\]|\\.)*)'")
+_WORD = re.compile(r"[a-z0-9]+")
+_PLACEHOLDER = re.compile(r"<\w+>")
+
+
+def _spans(text, value):
+    """Case-insensitive, word-bounded occurrences of `value` in `text`."""
+    return [match.span() for match in re.finditer(rf"(?<!\w){re.escape(value)}(?!\w)", text)]
+
+
+def query_signature(question, entities):
+    """
+    Normalizes a question to its shape: lower-cased, punctuation dropped, and
+    every extracted entity value found in it replaced by a `<key>` placeholder
+    ("tacos in Austin?" -> "<menu_item> in <location>").
+
+    Returns:
+        tuple: (signature, slots) where slots maps "key_i" to the i-th value of that key in the question.
+    """
+    text = " ".join(str(question).lower().split())
+    candidates = sorted(
+        {(str(value).lower().strip(), key) for key in SLOT_KEYS for value in entities.get(key) or [] if str(value).strip()},
+        key=lambda candidate: -len(candidate[0]),
+    )
+    found = []  # (start, end, key, value); longer values win overlaps
+    for value, key in candidates:
+        for start, end in _spans(text, value):
+            if all(end <= other_start or start >= other_end for other_start, other_end, *_ in found):
+                found.append((start, end, key, value))
+    found.sort()
+
+    parts, slots, counts, position = [], {}, {}, 0
+    for start, end, key, value in found:
+        slot = f"{key}_{counts.get(key, 0)}"
+        counts[key] = counts.get(key, 0) + 1
+        parts.extend([" ".join(_WORD.findall(text[position:start])), f"<{key}>"])
+        slots[slot] = value
+        position = end
+    parts.append(" ".join(_WORD.findall(text[position:])))
+    return " ".join(part for part in parts if part), slots
+
+
+def _synonym_slots(entities, slots):
+    """Extracted values that are not in the question (synonyms), as "key_syn_i" slots."""
+    in_question = set(slots.values())
+    synonyms = {}
+    for key in SLOT_KEYS:
+        extra = [str(value).lower().strip() for value in entities.get(key) or []]
+        for index, value in enumerate(dict.fromkeys(value for value in extra if value and value not in in_question)):
+            synonyms[f"{key}_syn_{index}"] = value
+    return synonyms
+
+
+def _case_style(literal):
+    if literal == literal.lower():
+        return "lower"
+    return "title" if literal == literal.title() else "upper" if literal == literal.upper() else None
+
+
+def parameterize(cypher, signature, slots, synonyms):
+    """
+    Replaces the string literals of a generated query that hold an entity
+    value with `$parameters`. The query is only reusable when every slot of
+    the question was found and every literal left in it is made of words of
+    the signature itself (a synonym the LLM made up would otherwise be
+    baked into other questions' answers).
+
+    Returns:
+        tuple: (template, slot names used), or (None, None) when the query cannot be reused.
+    """
+    values = {value: slot for slot, value in {**synonyms, **slots}.items()}  # Question slots win
+    fixed_words = set(_WORD.findall(_PLACEHOLDER.sub(" ", signature)))  # "<menu_item>" is not the word "menu"
+    used = set()
+
+    def replace(match):
+        literal = match.group(1) if match.group(1) is not None else match.group(2)
+        slot = values.get(literal.lower().strip())
+        style = _case_style(literal)
+        if slot is not None and style is not None:
+            used.add(slot)
+            return f"${slot}" if style == "lower" else f"${slot}__{style}"
+        if set(_WORD.findall(literal.lower())) <= fixed_words:
+            return match.group(0)
+        raise ValueError(literal)
+
+    try:
+        template = _STRING_LITERAL.sub(replace, cypher)
+    except ValueError:
+        return None, None
+    if not set(slots) <= used:
+        return None, None
+    return template, sorted(used)
+
+
+def fill_parameters(slot_names, slots, synonyms):
+    """
+    Values for the slots of a cached template, with the `__title` / `__upper`
+    variants it references. Missing synonyms fall back to the question's
+    value of the same key.
+
+    Returns:
+        dict: The query parameters.
+    """
+    parameters = {}
+    for slot in slot_names:
+        key = slot.rsplit("_syn_", 1)[0] if "_syn_" in slot else None
+        value = synonyms.get(slot) or slots.get(slot) or slots.get(f"{key}_0", "")
+        parameters[slot] = value
+        parameters[f"{slot}__title"] = value.title()
+        parameters[f"{slot}__upper"] = value.upper()
+    return parameters
+
+
+class CypherTemplateCache:
+    """
+    Thread-safe LRU of parameterized LLM-generated Cypher, keyed by the query
+    signature and the version of the generation prompt. Entries and evictions
+    are appended to a JSON-lines file (when `path` is set) and replayed on
+    start-up; the file is rewritten with the live entries once it holds more
+    than twice `capacity` lines.
+    """
+
+    def __init__(self, prompt, capacity=CYPHER_CACHE_SIZE, path=CYPHER_CACHE_PATH):
+        self.prompt_version = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12]
+        self.capacity = capacity
+        self.path = path
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+        self.saved_ms = 0.0
+        self._file_lines = 0
+
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    self._file_lines += 1
+                    entry = json.loads(line)
+                    if entry.get("prompt_version") != self.prompt_version:
+                        continue
+                    if entry.get("evicted"):
+                        self._templates.pop(entry["signature"], None)
+                    else:
+                        self._remember(entry["signature"], entry)
+            if self._file_lines > 2 * self.capacity:
+                self._rewrite()
+
+    def _remember(self, signature, entry):
+        self._templates[signature] = entry
+        self._templates.move_to_end(signature)
+        if len(self._templates) > self.capacity:
+            self._templates.popitem(last=False)
+
+    def lookup(self, question, entities):
+        """
+        Returns:
+            tuple: (query, parameters, entry) of a cached template, or (None, None, None) on a miss.
+        """
+        signature, slots = query_signature(question, entities)
+        with self._lock:
+            entry = self._templates.get(signature)
+            if entry is None:
+                self.misses += 1
+                return None, None, None
+            self._templates.move_to_end(signature)
+            self.hits += 1
+            self.saved_ms += entry["llm_ms"]
+        return entry["template"], fill_parameters(entry["slots"], slots, _synonym_slots(entities, slots)), entry
+
+    def store(self, question, entities, cypher, llm_ms):
+        """
+        Parameterizes and caches a generated query that ran successfully.
+
+        Returns:
+            bool: Whether the query could be cached.
+        """
+        signature, slots = query_signature(question, entities)
+        template, slot_names = parameterize(cypher, signature, slots, _synonym_slots(entities, slots))
+        if template is None:
+            with self._lock:
+                self.uncacheable += 1
+            return False
+
+        entry = {"prompt_version": self.prompt_version, "signature": signature, "template": template,
+                 "slots": slot_names, "llm_ms": round(llm_ms, 1)}
+        with self._lock:
+            self._remember(signature, entry)
+            self._append(entry)
+        return True
+
+    def _append(self, entry):
+        """Appends an entry or eviction to the file. Caller holds the lock."""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._file_lines += 1
+        if self._file_lines > 2 * self.capacity:
+            self._rewrite()
+
+    def _rewrite(self):
+        """Replaces the file with the live entries (dropping evicted, displaced and old-prompt ones)."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(entry) + "\n" for entry in self._templates.values())
+        os.replace(tmp_path, self.path)
+        self._file_lines = len(self._templates)
+
+    def evict(self, signature):
+        """Drops a template whose query failed when reused, also from the file."""
+        with self._lock:
+            if self._templates.pop(signature, None) is not None:
+                self._append({"prompt_version": self.prompt_version, "signature": signature, "evicted": True})
+
+    def stats(self):
+        """Returns hit/miss counters and the LLM time saved by hits."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncacheable": self.uncacheable,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._templates),
+            "llm_ms_saved": round(self.saved_ms, 1),
+        }
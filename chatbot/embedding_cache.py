@@ -0,0 +1,289 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+from chatbot.config import EMBEDDING_CACHE_DISK_SIZE
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, so only one process should write the disk tier
+    fcntl = None
+
+DISK_FORMAT = 2  # Key lines are [row, key]
+
+
+def normalize_query(text):
+    """Normalizes a query so trivially different phrasings share one cache entry."""
+    return " ".join(str(text).lower().split())
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache for query embeddings.
+
+    - Memory tier: an LRU of the most recently used vectors.
+    - Disk tier: an append-only float32 matrix (memory-mapped on read) plus a
+      key file with one `[row, key]` line per vector. Appends hold an exclusive
+      file lock, so several processes can share the directory. Past
+      `disk_capacity` rows the newest half is kept and the files are rewritten.
+      Survives restarts.
+
+    The disk tier is wiped automatically when the embedding model name changes.
+    """
+
+    def __init__(self, embed_fn, model_name, cache_dir, capacity=1024, embed_batch_fn=None,
+                 disk_capacity=EMBEDDING_CACHE_DISK_SIZE):
+        self.embed_fn = embed_fn
+        self.embed_batch_fn = embed_batch_fn
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.capacity = capacity
+        self.disk_capacity = disk_capacity
+
+        self._memory = OrderedDict()
+        self._disk_rows = {}
+        self._disk_matrix = None
+        self._dim = None
+        self._vectors_inode = None
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._meta_path = os.path.join(cache_dir, "meta.json")
+        self._keys_path = os.path.join(cache_dir, "keys.txt")
+        self._vectors_path = os.path.join(cache_dir, "vectors.f32")
+        self._lock_path = os.path.join(cache_dir, "lock")
+
+        self._open_disk_tier()
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the disk tier, shared with other processes using the same directory."""
+        with open(self._lock_path, "a") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_meta(self):
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self):
+        tmp_path = f"{self._meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model_name": self.model_name, "dim": self._dim, "format": DISK_FORMAT}, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def _open_disk_tier(self):
+        """Loads the key index from disk, discarding it if it was built by another model."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        with self._file_lock():
+            meta = self._read_meta()
+            if not meta or meta.get("model_name") != self.model_name or meta.get("format") != DISK_FORMAT:
+                if meta and meta.get("model_name") != self.model_name:
+                    print(f"♻️ Embedding model changed ({meta.get('model_name')} -> {self.model_name}). Clearing query cache.")
+                self._reset_disk_tier()
+                return
+
+            self._dim = meta.get("dim")
+            if self._dim:
+                self._load_rows()
+
+    def _inode(self):
+        try:
+            return os.stat(self._vectors_path).st_ino
+        except OSError:
+            return None
+
+    def _load_rows(self):
+        """Reads the key index. Caller holds the file lock."""
+        # A crash mid-append leaves a partial vector row or key line: cut them off.
+        # A key whose vector never landed is skipped, a vector without a key is unused.
+        row_bytes = 4 * self._dim
+        with open(self._vectors_path, "ab") as f:
+            stored_rows = f.tell() // row_bytes
+            f.truncate(stored_rows * row_bytes)
+        rows, key_bytes = {}, 0
+        if os.path.exists(self._keys_path):
+            with open(self._keys_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    key_bytes += len(line)
+                    try:
+                        row, key = json.loads(line)
+                    except (ValueError, TypeError):
+                        continue
+                    if isinstance(row, int) and row < stored_rows:
+                        rows[key] = row
+            with open(self._keys_path, "r+b") as f:
+                f.truncate(key_bytes)
+        self._disk_rows = rows
+        self._disk_matrix = None
+        self._vectors_inode = self._inode()
+
+    def _reset_disk_tier(self):
+        for path in (self._keys_path, self._vectors_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._dim = None
+        self._write_meta()
+        self._disk_rows = {}
+        self._disk_matrix = None
+        self._vectors_inode = None
+
+    def _read_disk(self, key):
+        row = self._disk_rows.get(key)
+        if row is None:
+            return None
+        if self._disk_matrix is None or row >= self._disk_matrix.shape[0]:
+            with self._file_lock():
+                if self._inode() != self._vectors_inode:
+                    # Another process compacted the files: the rows moved
+                    self._load_rows()
+                    row = self._disk_rows.get(key)
+                    if row is None:
+                        return None
+                self._disk_matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r").reshape(-1, self._dim)
+        return np.array(self._disk_matrix[row])
+
+    def _write_disk(self, key, vector):
+        with self._file_lock():
+            if self._dim is None:
+                meta = self._read_meta() or {}
+                if meta.get("model_name") == self.model_name and meta.get("dim"):
+                    self._dim = meta["dim"]  # Another process stored the first vector
+                else:
+                    self._dim = int(vector.shape[0])
+                    self._write_meta()
+            if self._inode() != self._vectors_inode:
+                self._load_rows()
+
+            # Vector first, key second: a key line never points at a missing row.
+            # The row is where the vector lands in the file, recorded with the key.
+            with open(self._vectors_path, "ab") as f:
+                row = f.tell() // (4 * self._dim)
+                f.write(vector.astype(np.float32).tobytes())
+            with open(self._keys_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps([row, key]) + "\n")
+            self._disk_rows[key] = row
+            self._vectors_inode = self._inode()
+            if row + 1 > self.disk_capacity:
+                self._compact()
+
+    def _compact(self):
+        """Rewrites the disk tier with its newest half. Caller holds the file lock."""
+        keep = sorted(self._disk_rows.items(), key=lambda item: item[1])[-(self.disk_capacity // 2):]
+        matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r").reshape(-1, self._dim)
+        vectors = np.asarray(matrix[[row for _, row in keep]], dtype=np.float32)
+        del matrix
+
+        with open(f"{self._vectors_path}.tmp", "wb") as f:
+            f.write(vectors.tobytes())
+        with open(f"{self._keys_path}.tmp", "w", encoding="utf-8") as f:
+            f.writelines(json.dumps([row, key]) + "\n" for row, (key, _) in enumerate(keep))
+        # Empty the key file first: a crash in between then loses the cache instead
+        # of pairing the new rows with the old keys
+        open(self._keys_path, "w").close()
+        os.replace(f"{self._vectors_path}.tmp", self._vectors_path)
+        os.replace(f"{self._keys_path}.tmp", self._keys_path)
+
+        self._disk_rows = {key: row for row, (key, _) in enumerate(keep)}
+        self._disk_matrix = None
+        self._vectors_inode = self._inode()
+        print(f"🔹 Compacted the query embedding cache to {len(keep)} rows")
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key):
+        """Returns a cached vector from either tier, or None. Caller holds the lock."""
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return vector
+
+        vector = self._read_disk(key)
+        if vector is not None:
+            self.disk_hits += 1
+            self._remember(key, vector)
+        return vector
+
+    def _store(self, key, vector):
+        """Records a freshly computed vector in both tiers. Caller holds the lock."""
+        self.misses += 1
+        if key not in self._disk_rows:
+            self._write_disk(key, vector)
+        self._remember(key, vector)
+
+    def embed(self, text):
+        """Returns the float32 embedding for `text`, computing it only on a cache miss."""
+        key = normalize_query(text)
+
+        with self._lock:
+            vector = self._lookup(key)
+        if vector is not None:
+            return vector
+
+        vector = np.asarray(self.embed_fn(key), dtype=np.float32)
+
+        with self._lock:
+            self._store(key, vector)
+        return vector
+
+    def embed_many(self, texts):
+        """
+        Returns a (len(texts), dim) float32 matrix. All cache misses are embedded
+        together in one `embed_batch_fn` call (one forward pass).
+        """
+        keys = [normalize_query(text) for text in texts]
+        vectors = {}
+
+        with self._lock:
+            for key in keys:
+                if key not in vectors:
+                    vector = self._lookup(key)
+                    if vector is not None:
+                        vectors[key] = vector
+
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if missing:
+            if self.embed_batch_fn is not None:
+                computed = self.embed_batch_fn(missing)
+            else:
+                computed = [self.embed_fn(key) for key in missing]
+
+            with self._lock:
+                for key, vector in zip(missing, computed):
+                    vectors[key] = np.asarray(vector, dtype=np.float32)
+                    self._store(key, vectors[key])
+
+        return np.stack([vectors[key] for key in keys])
+
+    def stats(self):
+        """Returns hit/miss counters for both tiers."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self._disk_rows),
+        }
@@ -0,0 +1,70 @@
+from chatbot.config import EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND, EMBEDDING_THREADS
+
+# "fp32": the reference sentence-transformers model; "int8": the same weights with
+# Linear layers dynamically quantized to int8, for GPU-less servers
+EMBEDDING_BACKENDS = ("fp32", "int8")
+
+
+def embedding_fingerprint(backend=EMBEDDING_BACKEND):
+    """
+    Identifies the vector space a backend produces. Stored with the index and the
+    query cache, so switching backends re-embeds the corpus on the next build.
+    The fp32 fingerprint is the bare model name, which keeps existing builds valid.
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}'. Choose one of {EMBEDDING_BACKENDS}.")
+    return EMBEDDING_MODEL_NAME if backend == "fp32" else f"{EMBEDDING_MODEL_NAME}#{backend}"
+
+
+def backend_of(fingerprint):
+    """
+    Returns:
+        str or None: The backend whose vectors carry `fingerprint`, None for another model.
+    """
+    for backend in EMBEDDING_BACKENDS:
+        if embedding_fingerprint(backend) == fingerprint:
+            return backend
+    return None
+
+
+class QuantizedEmbeddings:
+    """
+    CPU-only sentence-transformer with int8 dynamically quantized Linear layers.
+    Exposes the `embed_query` / `embed_documents` interface of HuggingFaceEmbeddings.
+    """
+
+    def __init__(self, model_name=EMBEDDING_MODEL_NAME, batch_size=32):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(model_name, device="cpu")
+        self.model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.batch_size = batch_size
+
+    def embed_documents(self, texts):
+        return self.model.encode(list(texts), batch_size=self.batch_size, convert_to_numpy=True).tolist()
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def make_embedding_model(backend=EMBEDDING_BACKEND, num_threads=EMBEDDING_THREADS):
+    """
+    Loads the embedding model of the requested backend.
+    `num_threads` caps the intra-op threads torch uses (None keeps its default).
+
+    Returns:
+        object: A model with `embed_query` and `embed_documents`.
+    """
+    embedding_fingerprint(backend)  # Validates the backend name
+
+    if num_threads:
+        import torch
+        torch.set_num_threads(num_threads)
+
+    if backend == "int8":
+        return QuantizedEmbeddings(EMBEDDING_MODEL_NAME)
+
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
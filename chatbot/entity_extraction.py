@@ -1,6 +1,6 @@
 import json
-from chatbot.config import llm
 from chatbot.state import State
+from chatbot.resources import get_resource
 from langchain.schema.runnable import RunnableLambda
 from langchain_core.prompts import ChatPromptTemplate
 
@@ -46,7 +46,7 @@ entity_extraction_prompt = ChatPromptTemplate.from_messages([
 ])
 
 # **🔍 Step 2: Define LLM Chain for Entity Extraction**
-extract_entities_chain = entity_extraction_prompt | RunnableLambda(llm.invoke)
+extract_entities_chain = entity_extraction_prompt | RunnableLambda(lambda prompt: get_resource("llm").invoke(prompt))
 
 def validate_json(response):
     """
@@ -0,0 +1,148 @@
+import re
+
+# Price terms the entity extractor returns, mapped to the "$".."$$$$" tiers of the dataset
+PRICE_TIERS = ("$", "$$", "$$$", "$$$$")
+PRICE_TERMS = {
+    "cheap": {"$"}, "inexpensive": {"$"}, "budget": {"$"}, "low-cost": {"$"}, "low cost": {"$"},
+    "affordable": {"$", "$$"}, "reasonable": {"$", "$$"}, "value": {"$", "$$"},
+    "moderate": {"$$"}, "mid-range": {"$$"}, "midrange": {"$$"}, "mid range": {"$$"},
+    "expensive": {"$$$", "$$$$"}, "pricey": {"$$$", "$$$$"}, "upscale": {"$$$", "$$$$"},
+    "high-end": {"$$$", "$$$$"}, "high end": {"$$$", "$$$$"}, "fine dining": {"$$$", "$$$$"},
+    "luxury": {"$$$$"}, "splurge": {"$$$$"},
+    "not expensive": {"$", "$$"}, "not too expensive": {"$", "$$"}, "not pricey": {"$", "$$"},
+    "not cheap": {"$$", "$$$", "$$$$"},
+}
+
+# Rating words without a number, mapped to a minimum star rating
+RATING_TERMS = {
+    "top rated": 4.5, "top-rated": 4.5, "best rated": 4.5, "best-rated": 4.5, "excellent": 4.5,
+    "highly rated": 4.0, "highly-rated": 4.0, "well rated": 4.0, "well-rated": 4.0, "good": 4.0,
+}
+# Review words without a number, mapped to a minimum review count
+REVIEW_TERMS = {
+    "most reviewed": 1000, "most-reviewed": 1000, "very popular": 1000,
+    "popular": 500, "well reviewed": 500, "well-reviewed": 500, "well known": 500, "well-known": 500,
+}
+
+# "under $$$", "$$ or less", "at least $$", "$$-$$$": tiers relative to a bound
+_TIER = r"(\${1,4})(?!\$)"
+_PRICE_BOUNDS = [
+    (re.compile(rf"(?:under|below|less than|cheaper than)\s*{_TIER}"), lambda ordinal, bound: ordinal < bound),
+    (re.compile(rf"(?:at most|up to|max(?:imum)?)\s*{_TIER}|{_TIER}\s*or (?:less|lower|cheaper|under)"),
+     lambda ordinal, bound: ordinal <= bound),
+    (re.compile(rf"(?:over|above|more than|pricier than)\s*{_TIER}"), lambda ordinal, bound: ordinal > bound),
+    (re.compile(rf"(?:at least|min(?:imum)?)\s*{_TIER}|{_TIER}\s*(?:\+|or (?:more|higher|above))"),
+     lambda ordinal, bound: ordinal >= bound),
+]
+_PRICE_RANGE = re.compile(rf"{_TIER}\s*(?:-|to)\s*{_TIER}")
+_NUMBER = r"(\d+(?:\.\d+)?)"
+_MIN_PATTERNS = [
+    re.compile(rf"(?:above|over|at least|more than|greater than|>=?|min(?:imum)?)\s*{_NUMBER}"),
+    re.compile(rf"{_NUMBER}\s*(?:\+|stars? and (?:up|above)|or (?:more|higher|above))"),
+]
+_MAX_PATTERNS = [
+    re.compile(rf"(?:below|under|at most|less than|lower than|<=?|max(?:imum)?)\s*{_NUMBER}"),
+    re.compile(rf"{_NUMBER}\s*(?:stars? )?or (?:less|lower|below)"),
+]
+_BARE_NUMBER = re.compile(_NUMBER)
+
+
+def _term_word(term, words):
+    """
+    The longest of `words` found in `term` on word boundaries ("inexpensive"
+    is not "expensive", "not expensive" wins over "expensive").
+
+    Returns:
+        str or None: The matching word, None when there is none.
+    """
+    for word in sorted(words, key=len, reverse=True):
+        if re.search(rf"(?<!\w){re.escape(word)}(?!\w)", term):
+            return word
+    return None
+
+
+def parse_locations(values):
+    """Lower-cased location synonyms; an empty list means no location constraint."""
+    return [str(value).lower().strip() for value in values or [] if str(value).strip()]
+
+
+def parse_price_tiers(values):
+    """
+    Maps price terms ("cheap", "$$", "under $$$", "$$-$$$", "fine dining") to the allowed price tiers.
+
+    Returns:
+        set or None: Allowed tiers, or None when no term is recognised.
+    """
+    tiers = set()
+    for value in values or []:
+        term = str(value).lower().strip()
+        if term in PRICE_TIERS:
+            tiers.add(term)
+        for pattern, allowed in _PRICE_BOUNDS:
+            for match in pattern.finditer(term):
+                bound = len(match.group(match.lastindex))  # The one tier group that matched
+                tiers |= {tier for tier in PRICE_TIERS if allowed(len(tier), bound)}
+        for low, high in _PRICE_RANGE.findall(term):
+            tiers |= {tier for tier in PRICE_TIERS if len(low) <= len(tier) <= len(high)}
+        word = _term_word(term, PRICE_TERMS)
+        if word:
+            tiers |= PRICE_TERMS[word]
+    return tiers or None
+
+
+def parse_numeric_range(values, words=None):
+    """
+    Parses terms like "4+ stars", "above 4.5", "under 100" or "top rated" into bounds.
+    A bare number ("4 stars") is read as a minimum.
+
+    Returns:
+        tuple or None: (minimum, maximum), either of which may be None; None when nothing is recognised.
+    """
+    low = high = None
+    for value in values or []:
+        term = str(value).lower().strip()
+        matched = False
+        for pattern in _MIN_PATTERNS:
+            match = pattern.search(term)
+            if match:
+                low = max(low if low is not None else float("-inf"), float(match.group(1)))
+                matched = True
+        for pattern in _MAX_PATTERNS:
+            match = pattern.search(term)
+            if match:
+                high = min(high if high is not None else float("inf"), float(match.group(1)))
+                matched = True
+        bare = _BARE_NUMBER.search(term)
+        if bare and not matched:
+            low = max(low if low is not None else float("-inf"), float(bare.group(1)))
+        word = _term_word(term, words or {})
+        if word:
+            low = max(low if low is not None else float("-inf"), words[word])
+    if low is None and high is None:
+        return None
+    return low, high
+
+
+def parse_entity_filters(entities):
+    """
+    Turns the extracted entities into metadata constraints shared by the search backends.
+
+    Returns:
+        dict: Only the recognised constraints among "location" (list of names),
+        "price" (set of tiers), "rating" and "review_count" ((min, max) tuples).
+    """
+    entities = entities or {}
+    filters = {}
+    locations = parse_locations(entities.get("location"))
+    if locations:
+        filters["location"] = locations
+    price = parse_price_tiers(entities.get("price"))
+    if price:
+        filters["price"] = price
+    rating = parse_numeric_range(entities.get("rating"), RATING_TERMS)
+    if rating:
+        filters["rating"] = rating
+    review_count = parse_numeric_range(entities.get("review_count"), REVIEW_TERMS)
+    if review_count:
+        filters["review_count"] = review_count
+    return filters
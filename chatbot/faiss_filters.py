@@ -0,0 +1,154 @@
+import math
+import faiss
+import numpy as np
+from chatbot.faiss_index import selector_search_params
+
+
+def split_address(address):
+    """Recovers (city, state) from the "address1, city, state, country - zip" metadata string."""
+    parts = str(address).rsplit(", ", 3)
+    if len(parts) < 4:
+        return None, None
+    return parts[1], parts[2]
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+class MetadataFilterIndex:
+    """
+    Per-attribute bitmaps over the FAISS ids, built once from the metadata.
+
+    `mask(filters)` combines them into one boolean array (OR within an
+    attribute, AND across attributes) that restricts the vector search.
+    """
+
+    def __init__(self, metadata_list):
+        self.size = len(metadata_list)
+        self.valid = np.zeros(self.size, dtype=bool)
+        self.ratings = np.full(self.size, np.nan)
+        self.locations = {}
+        self.prices = {}
+
+        for faiss_id, doc in enumerate(metadata_list):
+            if doc is None:  # Id of a group removed by an incremental build
+                continue
+            self.valid[faiss_id] = True
+
+            city, state = doc.get("city"), doc.get("state")
+            if _is_missing(city):
+                city, state = split_address(doc.get("address"))
+            for name in {city, state, f"{city}, {state}"} - {None}:
+                self._bitmap(self.locations, str(name).lower().strip())[faiss_id] = True
+
+            if not _is_missing(doc.get("price")):
+                self._bitmap(self.prices, str(doc["price"]).strip())[faiss_id] = True
+            if not _is_missing(doc.get("rating")):
+                self.ratings[faiss_id] = float(doc["rating"])
+
+    def _bitmap(self, bitmaps, value):
+        if value not in bitmaps:
+            bitmaps[value] = np.zeros(self.size, dtype=bool)
+        return bitmaps[value]
+
+    def _any_of(self, bitmaps, values):
+        mask = np.zeros(self.size, dtype=bool)
+        for value in values:
+            if value in bitmaps:
+                mask |= bitmaps[value]
+        return mask
+
+    def _known(self, bitmaps, attribute, values):
+        """The filter values some document has; the others are logged and ignored."""
+        known = [value for value in values if value in bitmaps]
+        unknown = [value for value in values if value not in bitmaps]
+        if unknown:
+            print(f"⚠️ No document has {attribute} {unknown}, ignoring {'them' if len(unknown) > 1 else 'it'}")
+        return known
+
+    def mask(self, filters):
+        """
+        Values that match no document ("bay area", "LA") are ignored rather
+        than excluding everything, and filters that together leave no document
+        fall back to the unfiltered search, like a search without entities.
+
+        Returns:
+            np.ndarray or None: Boolean mask of the FAISS ids that satisfy `filters`, None when unconstrained.
+        """
+        if not filters:
+            return None
+
+        mask = self.valid.copy()
+        constrained = "rating" in filters
+        for attribute, bitmaps in (("location", self.locations), ("price", self.prices)):
+            values = self._known(bitmaps, attribute, filters.get(attribute) or [])
+            if values:
+                mask &= self._any_of(bitmaps, values)
+                constrained = True
+        if not constrained:
+            return None
+        if "rating" in filters:
+            low, high = filters["rating"]
+            with np.errstate(invalid="ignore"):
+                if low is not None:
+                    mask &= self.ratings >= low
+                if high is not None:
+                    mask &= self.ratings <= high
+        if not mask.any():
+            print(f"⚠️ No document matches {filters}, searching without filters")
+            return None
+        return mask
+
+
+def filtered_search(index, query_matrix, mask, k, vectors=None, exact_max=2048):
+    """
+    Searches only the FAISS ids allowed by `mask`.
+
+    Small subsets are scanned exactly from the stored vectors, which is both
+    faster and exact; larger ones go through the index with an ID selector,
+    so filtering happens during the scan instead of after a fixed top k.
+
+    Returns:
+        tuple: (distances, indices) shaped like `index.search`, padded with -1.
+    """
+    num_queries = len(query_matrix)
+    distances = np.full((num_queries, k), np.inf, dtype=np.float32)
+    indices = np.full((num_queries, k), -1, dtype=np.int64)
+
+    allowed_ids = np.flatnonzero(mask)
+    if len(allowed_ids) == 0:
+        return distances, indices
+
+    if vectors is not None and len(allowed_ids) <= exact_max and len(vectors) >= len(mask):
+        subset = np.ascontiguousarray(vectors[allowed_ids], dtype=np.float32)
+        top_k = min(k, len(allowed_ids))
+        subset_distances, positions = faiss.knn(np.ascontiguousarray(query_matrix, dtype=np.float32), subset, top_k)
+        distances[:, :top_k] = subset_distances
+        indices[:, :top_k] = np.where(positions >= 0, allowed_ids[positions], -1)
+        return distances, indices
+
+    bitmap = np.packbits(mask, bitorder="little")
+    selector = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap))
+    try:
+        return index.search(query_matrix, k, params=selector_search_params(index, selector))
+    except RuntimeError:  # Layouts without selector support (IndexPQ)
+        return _post_filtered_search(index, query_matrix, mask, k, distances, indices)
+
+
+def _post_filtered_search(index, query_matrix, mask, k, distances, indices):
+    """Over-fetches neighbours and drops disallowed ids, widening the search until `k` remain or all were seen."""
+    fetch = min(index.ntotal, 2 * k * max(1, len(mask) // max(int(mask.sum()), 1)))
+    while True:
+        fetched_distances, fetched_indices = index.search(query_matrix, fetch)
+        complete = True
+        for row, (dist_row, id_row) in enumerate(zip(fetched_distances, fetched_indices)):
+            keep = (id_row >= 0) & (id_row < len(mask))
+            keep[keep] = mask[id_row[keep]]
+            kept = np.flatnonzero(keep)[:k]
+            distances[row, :len(kept)] = dist_row[kept]
+            indices[row, :len(kept)] = id_row[kept]
+            complete &= len(kept) == k
+        if complete or fetch >= index.ntotal:
+            return distances, indices
+        fetch = min(index.ntotal, fetch * 4)
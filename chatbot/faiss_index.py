@@ -0,0 +1,202 @@
+import os
+import json
+import math
+import faiss
+import numpy as np
+
+# Supported FAISS index layouts ("pq" / "sq8" are exhaustive scans over compressed codes)
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw", "pq", "sq8")
+
+# Build-time defaults; nprobe / ef_search are query-time knobs stored with the index
+DEFAULT_INDEX_PARAMS = {
+    "nlist": None,          # IVF cells; None picks ~4 * sqrt(n)
+    "nprobe": 8,            # IVF cells visited per query
+    "pq_m": 16,             # PQ sub-quantizers (must divide the embedding dimension)
+    "pq_nbits": 8,          # Bits per PQ code
+    "hnsw_m": 32,           # HNSW graph degree
+    "ef_construction": 40,  # HNSW build-time beam width
+    "ef_search": 64,        # HNSW query-time beam width
+    "transform": None,      # "pca" or "opq": dimensionality reduction learned at build time
+    "transform_dim": None,  # Output dimension of the transform
+}
+
+
+def settings_path(index_path):
+    """Returns the JSON file stored next to an index (faiss_index_2.bin -> faiss_index_2.json)."""
+    return os.path.splitext(index_path)[0] + ".json"
+
+
+def _choose_nlist(num_vectors, nlist):
+    """Keeps nlist trainable: FAISS wants roughly 39 training points per centroid."""
+    if nlist is None:
+        nlist = int(4 * math.sqrt(num_vectors))
+    return max(1, min(nlist, num_vectors // 39))
+
+
+def _train_transform(vectors, settings):
+    """Learns the PCA / OPQ matrix that maps vectors to `transform_dim` dimensions."""
+    dim, target_dim = vectors.shape[1], settings["transform_dim"]
+    if not target_dim or not 0 < target_dim <= dim:
+        raise ValueError(f"transform_dim must be between 1 and the embedding dimension {dim}, got {target_dim}.")
+
+    if settings["transform"] == "pca":
+        transform = faiss.PCAMatrix(dim, target_dim)
+    elif settings["transform"] == "opq":
+        if target_dim % settings["pq_m"] != 0:
+            raise ValueError(f"pq_m={settings['pq_m']} must divide transform_dim {target_dim} for OPQ.")
+        transform = faiss.OPQMatrix(dim, settings["pq_m"], target_dim)
+    else:
+        raise ValueError(f"Unknown transform '{settings['transform']}'. Choose 'pca' or 'opq'.")
+    transform.train(vectors)
+    return transform
+
+
+def build_index(vectors, index_type="flat", ids=None, **params):
+    """
+    Builds and fills a FAISS index of the requested type.
+    When `ids` are given the index is wrapped in an IndexIDMap2 so searches
+    return those ids and single entries can later be removed or replaced.
+    With a `transform`, the learned PCA / OPQ matrix is stored inside the
+    index (IndexPreTransform), so query vectors are reduced the same way.
+
+    Returns:
+        tuple: (faiss.Index, dict of the effective build/search parameters)
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}'. Choose one of {INDEX_TYPES}.")
+
+    settings = {**DEFAULT_INDEX_PARAMS, **{k: v for k, v in params.items() if v is not None}}
+    num_vectors, dim = vectors.shape
+
+    # Sub-indexes are built and trained in the reduced space
+    transform = None
+    train_vectors = vectors
+    if settings["transform"]:
+        transform = _train_transform(vectors, settings)
+        train_vectors = transform.apply(vectors)
+        dim = transform.d_out
+
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dim)
+
+    elif index_type in ("ivf_flat", "ivf_pq"):
+        settings["nlist"] = _choose_nlist(num_vectors, settings["nlist"])
+        quantizer = faiss.IndexFlatL2(dim)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, settings["nlist"])
+        else:
+            if dim % settings["pq_m"] != 0:
+                raise ValueError(f"pq_m={settings['pq_m']} must divide the embedding dimension {dim}.")
+            index = faiss.IndexIVFPQ(quantizer, dim, settings["nlist"], settings["pq_m"], settings["pq_nbits"])
+        index.train(train_vectors)
+
+    elif index_type == "pq":
+        if dim % settings["pq_m"] != 0:
+            raise ValueError(f"pq_m={settings['pq_m']} must divide the embedding dimension {dim}.")
+        index = faiss.IndexPQ(dim, settings["pq_m"], settings["pq_nbits"])
+        index.train(train_vectors)
+
+    elif index_type == "sq8":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit)
+        index.train(train_vectors)
+
+    else:
+        index = faiss.IndexHNSWFlat(dim, settings["hnsw_m"])
+        index.hnsw.efConstruction = settings["ef_construction"]
+
+    if transform is not None:
+        index = faiss.IndexPreTransform(transform, index)
+
+    if ids is None:
+        index.add(vectors)
+    else:
+        index = faiss.IndexIDMap2(index)
+        index.add_with_ids(vectors, np.asarray(ids, dtype=np.int64))
+
+    apply_search_params(index, settings)
+    return index, settings
+
+
+def apply_search_params(index, settings):
+    """Applies the query-time knobs (nprobe for IVF, efSearch for HNSW) that match the index."""
+    parameter_space = faiss.ParameterSpace()
+    if faiss.try_extract_index_ivf(index) is not None:
+        if settings.get("nprobe"):
+            parameter_space.set_index_parameter(index, "nprobe", int(settings["nprobe"]))
+    elif isinstance(_base_index(index), faiss.IndexHNSW):
+        if settings.get("ef_search"):
+            parameter_space.set_index_parameter(index, "efSearch", int(settings["ef_search"]))
+
+
+def selector_search_params(index, selector):
+    """
+    SearchParameters restricting a search to `selector`.
+    Per-call parameters replace the index's own nprobe / efSearch, so those are carried over.
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+    base = _base_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=base.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+def _base_index(index):
+    """Unwraps ID-map / pre-transform wrappers to reach the index doing the actual search."""
+    index = faiss.downcast_index(index)
+    while isinstance(getattr(index, "index", None), faiss.Index):
+        index = faiss.downcast_index(index.index)
+    return index
+
+
+def atomic_write(path, write_fn):
+    """Calls `write_fn` on a temporary path next to `path`, then renames it into place."""
+    tmp_path = f"{path}.tmp"
+    write_fn(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def save_index(index, index_path, index_type, settings, **extra):
+    """Atomically writes the index and a JSON sidecar recording how it was built."""
+    def write_settings(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**settings, **extra, "index_type": index_type, "ntotal": index.ntotal, "dim": index.d}, f, indent=2)
+
+    atomic_write(index_path, lambda path: faiss.write_index(index, path))
+    atomic_write(settings_path(index_path), write_settings)
+
+
+def load_index_settings(index_path):
+    """Reads the sidecar of an index; indexes built before it existed are flat."""
+    path = settings_path(index_path)
+    if not os.path.exists(path):
+        return {"index_type": "flat"}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_index(index_path, nprobe=None, ef_search=None, mmap=False):
+    """
+    Reads an index from disk and applies its query-time parameters.
+    Explicit `nprobe` / `ef_search` override the values stored at build time.
+    With `mmap`, vector storage is memory-mapped so processes share the pages.
+
+    Returns:
+        tuple: (faiss.Index, dict of index settings)
+    """
+    index = None
+    if mmap:
+        try:
+            index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError as e:
+            print(f"⚠️ Could not memory-map {index_path} ({e}). Reading it into memory instead.")
+    if index is None:
+        index = faiss.read_index(index_path)
+    settings = load_index_settings(index_path)
+    if nprobe is not None:
+        settings["nprobe"] = nprobe
+    if ef_search is not None:
+        settings["ef_search"] = ef_search
+    apply_search_params(index, settings)
+    return index, settings
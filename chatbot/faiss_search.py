@@ -1,43 +1,217 @@
-import faiss
-import pickle
+import os
 import numpy as np
-from langchain_huggingface import HuggingFaceEmbeddings
-from sentence_transformers import CrossEncoder  # Import cross-encoder model
 from chatbot.state import State
+from chatbot.config import (
+    EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND, EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_DISK_SIZE,
+    FAISS_INDEX_PATH, FAISS_METADATA_PATH, FAISS_LEGACY_METADATA_PATH, FAISS_NPROBE, FAISS_EF_SEARCH, FAISS_MMAP,
+    FAISS_VECTORS_PATH, FAISS_FILTER_EXACT_MAX, RETRIEVAL_MODE, BM25_CANDIDATES, RRF_K,
+    FAISS_SEARCH_LEVEL, FAISS_ITEM_INDEX_PATH, FAISS_ITEM_PARENTS_PATH, FAISS_ITEM_CANDIDATES
+)
+from chatbot.embedding_cache import EmbeddingCache
+from chatbot.embeddings import backend_of, embedding_fingerprint, make_embedding_model
+from chatbot.entity_filters import parse_entity_filters
+from chatbot.lexical_search import reciprocal_rank_fusion
+from chatbot.reranker import rerank_batch
+from chatbot.resources import register, get_resource
 
-# Load FAISS index and metadata
-faiss_index = faiss.read_index("faiss_index_2.bin")
-with open("metadata_2.pkl", "rb") as f:
-    metadata_list = pickle.load(f)
 
-# Load embedding model for FAISS search
-embedding_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-mpnet-base-v2")
+# Backend queries are embedded with: the one the FAISS index was built with, so a new
+# EMBEDDING_BACKEND only takes effect once `python database.py` has re-embedded the corpus
+@register("query_embedding_backend")
+def _load_query_embedding_backend():
+    from chatbot.faiss_index import load_index_settings
 
-# Load cross-encoder model for reranking
-reranker = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
+    if not os.path.exists(FAISS_INDEX_PATH):
+        return EMBEDDING_BACKEND
+    built_with = load_index_settings(FAISS_INDEX_PATH).get("embedding_model", EMBEDDING_MODEL_NAME)
+    backend = backend_of(built_with)
+    if backend is None:
+        raise RuntimeError(f"{FAISS_INDEX_PATH} was embedded with {built_with}, not {EMBEDDING_MODEL_NAME}. "
+                           f"Run `python database.py` to re-embed it.")
+    if backend != EMBEDDING_BACKEND:
+        print(f"⚠️ {FAISS_INDEX_PATH} was embedded with the {backend} backend. Queries use it too "
+              f"until `python database.py` re-embeds the corpus with {EMBEDDING_BACKEND}.")
+    return backend
 
-def search_faiss(state: State) -> State:
-    """Performs FAISS-based similarity search and applies reranking."""
-    
-    # Generate query embedding
-    query_vector = np.array([embedding_model.embed_query(state["input"])], dtype=np.float32)
-    
-    # Search FAISS index for nearest neighbors
-    distances, indices = faiss_index.search(query_vector, k=10)  # Retrieve top 10 candidates
 
-    # Retrieve metadata for top results
-    retrieved_docs = [metadata_list[idx] for idx in indices[0] if idx != -1]
+# Load FAISS index (flat, IVF or HNSW as recorded next to it)
+@register("faiss_index")
+def _load_faiss_index():
+    from chatbot.faiss_index import load_index
+
+    get_resource("query_embedding_backend")  # Refuses an index embedded with another model
+    faiss_index, _ = load_index(FAISS_INDEX_PATH, nprobe=FAISS_NPROBE, ef_search=FAISS_EF_SEARCH, mmap=FAISS_MMAP)
+    return faiss_index
+
+
+# Memory-mapped columnar store: only the rows FAISS returns are ever decoded
+@register("faiss_metadata")
+def _load_faiss_metadata():
+    from chatbot.metadata_store import load_metadata
+
+    return load_metadata(FAISS_METADATA_PATH if os.path.exists(FAISS_METADATA_PATH) else FAISS_LEGACY_METADATA_PATH)
+
+
+# Item-level index (one compressed vector per menu item) and the group id of each item; None until built
+@register("faiss_item_index")
+def _load_faiss_item_index():
+    from chatbot.faiss_index import load_index
+
+    if not os.path.exists(FAISS_ITEM_INDEX_PATH):
+        return None
+    item_index, _ = load_index(FAISS_ITEM_INDEX_PATH, mmap=FAISS_MMAP)
+    return item_index
+
+
+@register("faiss_item_parents")
+def _load_faiss_item_parents():
+    return np.load(FAISS_ITEM_PARENTS_PATH, mmap_mode="r") if os.path.exists(FAISS_ITEM_PARENTS_PATH) else None
+
+
+# Per-attribute bitmaps (location, price, rating) over the FAISS ids
+@register("faiss_filters")
+def _load_faiss_filters():
+    from chatbot.faiss_filters import MetadataFilterIndex
+
+    return MetadataFilterIndex(get_resource("faiss_metadata"))
+
+
+# Vectors by FAISS id, written by database.py; used for exact search over small filtered subsets
+@register("faiss_vectors")
+def _load_faiss_vectors():
+    return np.load(FAISS_VECTORS_PATH, mmap_mode="r") if os.path.exists(FAISS_VECTORS_PATH) else None
+
+
+# BM25 over the menu items, descriptions and ingredients of each FAISS document
+@register("bm25_index")
+def _load_bm25_index():
+    from chatbot.lexical_search import BM25Index
+
+    return BM25Index.from_metadata(get_resource("faiss_metadata"))
+
+
+# Load embedding model for FAISS search (fp32 or int8 backend, the one the index was built with)
+@register("embedding_model")
+def _load_embedding_model():
+    return make_embedding_model(get_resource("query_embedding_backend"))
 
-    # Apply cross-encoder reranking
-    query_text = state["input"]
-    reranker_inputs = [(query_text, doc["restaurant_name"] + " " + doc["menu_category"]) for doc in retrieved_docs]
-    
-    reranker_scores = reranker.predict(reranker_inputs)
 
-    # Sort retrieved docs by reranker score (higher is better)
-    sorted_results = sorted(zip(retrieved_docs, reranker_scores), key=lambda x: x[1], reverse=True)
+# Cache query embeddings so repeated questions skip the model entirely.
+# The model itself is only loaded on the first cache miss.
+@register("query_embedding_cache")
+def _load_query_embedding_cache():
+    return EmbeddingCache(
+        lambda text: get_resource("embedding_model").embed_query(text),
+        embedding_fingerprint(get_resource("query_embedding_backend")), EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_SIZE,
+        embed_batch_fn=lambda texts: get_resource("embedding_model").embed_documents(texts),
+        disk_capacity=EMBEDDING_CACHE_DISK_SIZE
+    )
 
-    # Keep top 5 reranked results
-    state["faiss_results"] = [doc for doc, _ in sorted_results[:5]]
 
+def rollup_items(item_distances, item_indices, parents, k=10):
+    """
+    Rolls item hits up to their restaurant-category groups, scoring each group
+    by its closest item.
+
+    Returns:
+        tuple: (distances, indices) of the best `k` groups per query, shaped like `index.search`.
+    """
+    distances = np.full((len(item_indices), k), np.inf, dtype=np.float32)
+    indices = np.full((len(item_indices), k), -1, dtype=np.int64)
+    for row, (dist_row, item_row) in enumerate(zip(item_distances, item_indices)):
+        seen = []
+        for dist, item_id in zip(dist_row, item_row):
+            if item_id == -1:
+                continue
+            group_id = int(parents[item_id])
+            if group_id not in seen:  # Hits are sorted, so the first item of a group is its closest
+                distances[row, len(seen)] = dist
+                indices[row, len(seen)] = group_id
+                seen.append(group_id)
+                if len(seen) == k:
+                    break
+    return distances, indices
+
+
+def search_items(query_matrix, mask=None, k=10):
+    """Searches the item-level index (restricted to items of groups in `mask`) and rolls hits up to groups."""
+    from chatbot.faiss_filters import filtered_search
+
+    item_index = get_resource("faiss_item_index")
+    parents = get_resource("faiss_item_parents")
+    if item_index is None or parents is None:
+        raise FileNotFoundError(f"{FAISS_ITEM_INDEX_PATH} not found. Build it with `python database.py --item-index-type pq`.")
+    if mask is None:
+        item_distances, item_indices = item_index.search(query_matrix, FAISS_ITEM_CANDIDATES)
+    else:
+        item_distances, item_indices = filtered_search(item_index, query_matrix, mask[parents], FAISS_ITEM_CANDIDATES)
+    return rollup_items(item_distances, item_indices, parents, k)
+
+
+def search_faiss_batch(queries, filters=None, return_rerank_info=False):
+    """
+    Performs FAISS-based similarity search and reranking for several queries at once.
+
+    All queries are embedded in one forward pass, searched with a single
+    `faiss_index.search` call, and reranked by `rerank_batch`, which scores
+    every uncached (query, doc) pair with one `reranker.predict` call.
+    `filters` (see `parse_entity_filters`) restrict the search to matching
+    documents before the scan rather than after it. In "hybrid" retrieval
+    mode, BM25 matches are fused with the FAISS ranking by reciprocal rank.
+
+    Returns:
+        list: The top 5 reranked metadata dicts for each query, in input order.
+        With `return_rerank_info`, a (results, rerank infos) tuple instead.
+    """
+    if not queries:
+        return ([], []) if return_rerank_info else []
+
+    # Generate query embeddings
+    query_matrix = get_resource("query_embedding_cache").embed_many(queries)
+
+    # Search FAISS index for nearest neighbors, restricted to the documents matching the filters
+    mask = get_resource("faiss_filters").mask(filters) if filters else None
+    if mask is not None:
+        print(f"🔎 Filters {filters} keep {int(mask.sum())} of {len(mask)} documents")
+
+    if FAISS_SEARCH_LEVEL == "item":
+        distances, indices = search_items(query_matrix, mask, k=10)
+    elif mask is None:
+        distances, indices = get_resource("faiss_index").search(query_matrix, k=10)  # Retrieve top 10 candidates per query
+    else:
+        from chatbot.faiss_filters import filtered_search
+
+        distances, indices = filtered_search(
+            get_resource("faiss_index"), query_matrix, mask, k=10,
+            vectors=get_resource("faiss_vectors"), exact_max=FAISS_FILTER_EXACT_MAX
+        )
+
+    candidate_ids = [[int(idx) for idx in row if idx != -1] for row in indices]
+    candidate_distances = [[float(dist) for dist, idx in zip(dist_row, row) if idx != -1] for dist_row, row in zip(distances, indices)]
+
+    # Fuse exact-token (BM25) matches into the candidates; FAISS distances then no longer apply
+    if RETRIEVAL_MODE == "hybrid":
+        bm25_index = get_resource("bm25_index")
+        for position, query_text in enumerate(queries):
+            lexical_ids, _ = bm25_index.search(query_text, k=BM25_CANDIDATES, mask=mask)
+            if len(lexical_ids):
+                candidate_ids[position] = reciprocal_rank_fusion([candidate_ids[position], lexical_ids], k=RRF_K, limit=10)
+                candidate_distances[position] = None
+
+    # Apply cross-encoder reranking (cached, budgeted, skipped when FAISS is decisive)
+    ranked_ids, rerank_infos = rerank_batch(queries, candidate_ids, candidate_distances, top_n=5)
+
+    # Retrieve metadata for top results
+    metadata_list = get_resource("faiss_metadata")
+    results = [[metadata_list[idx] for idx in ids] for ids in ranked_ids]
+
+    return (results, rerank_infos) if return_rerank_info else results
+
+
+def search_faiss(state: State) -> State:
+    """Performs FAISS-based similarity search, filtered by the extracted entities, and applies reranking."""
+    filters = parse_entity_filters(state.get("entities"))
+    results, rerank_infos = search_faiss_batch([state["input"]], filters=filters, return_rerank_info=True)
+    state["faiss_results"] = results[0]
+    state["rerank_info"] = rerank_infos[0]
     return state
@@ -3,7 +3,7 @@ import wikipedia
 from bs4 import BeautifulSoup
 from googlesearch import search
 from chatbot.state import State
-from chatbot.config import slm
+from chatbot.resources import get_resource
 
 
 def fetch_page_content(url):
@@ -78,7 +78,7 @@ def google_search(state: State) -> State:
         """
 
         # Generate summary using LLM
-        structured_summary += slm.invoke(summary_prompt[:6000]).content.strip()
+        structured_summary += get_resource("slm").invoke(summary_prompt[:6000]).content.strip()
 
     # Store results in state
     state["google_results"] = {
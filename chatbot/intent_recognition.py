@@ -1,6 +1,6 @@
 import re
-from chatbot.config import slm  # Use smaller LLM for intent extraction
 from chatbot.state import State
+from chatbot.resources import get_resource
 
 def detect_intent(state: State) -> State:
     """Uses LLM to identify user intent and updates state."""
@@ -34,7 +34,7 @@ def detect_intent(state: State) -> State:
     **Task:** Identify the best-matching category from the list above. Return only the category name.
     """
     
-    llm_response = slm.invoke(intent_prompt).content.strip().lower()
+    llm_response = get_resource("slm").invoke(intent_prompt).content.strip().lower()
     
     # Extract category name using regex (in case LLM outputs extra text)
     match = re.search(r"(ingredient discovery|trending insights|historical context|comparative analysis|menu innovation)", llm_response)
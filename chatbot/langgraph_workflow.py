@@ -7,8 +7,8 @@ from chatbot.google_search import google_search
 from chatbot.llm_graph_search import query_knowledge_graph
 from chatbot.response_generator import generate_response
 from chatbot.state import State
+from chatbot.resources import get_resource
 import pandas as pd
-from chatbot.config import llm
 
 def introduce_chatbot(state):
     """Generate an introduction when a user greets or says something generic."""
@@ -66,7 +66,7 @@ def refine_final_response(state):
     Now, synthesize them into a single refined response that is well-structured, professional, and compelling.
 
     """
-    structured_response = llm.invoke(prompt[:6000]).content.strip()
+    structured_response = get_resource("llm").invoke(prompt[:6000]).content.strip()
     state["response"] = structured_response
     return state
 
@@ -104,7 +104,7 @@ graph.add_conditional_edges(
         "ingredient_discovery": "structured_search",
         "trending_insights": "llm_graph_search",
         "historical_context": "google_search",
-        "comparative_analysis": "faiss_search",
+        "comparative_analysis": "structured_search",  # Analytics cube; FAISS search when nothing matches
         "menu_innovation": "faiss_search",
         "fallback": "introduce_chatbot"  # Send to introduction instead of Google Search
     }
@@ -113,10 +113,12 @@ graph.add_conditional_edges(
 # **Handling Structured Search Results**
 graph.add_conditional_edges(
     "structured_search",
-    lambda state: "Found" if state.get("structured_results") else "Not Found",
+    lambda state: "Found" if state.get("structured_results") else
+        "Comparative Not Found" if state.get("intent") == "comparative_analysis" else "Not Found",
     {
         "Found": "generate_structured_response",
-        "Not Found": "llm_graph_search"
+        "Not Found": "llm_graph_search",
+        "Comparative Not Found": "faiss_search"  # Cube misses skip the LLM Cypher step, as before the cube
     }
 )
 
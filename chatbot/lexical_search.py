@@ -0,0 +1,107 @@
+import re
+import math
+from collections import Counter, defaultdict
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Question words that would otherwise match nearly every menu description
+QUERY_STOPWORDS = {
+    "a", "an", "and", "are", "at", "best", "can", "do", "does", "find", "for", "get", "good", "i",
+    "in", "is", "me", "near", "of", "on", "or", "serve", "serves", "that", "the", "to", "what",
+    "where", "which", "who", "with", "you",
+}
+
+
+def tokenize(text):
+    """Lower-cased alphanumeric tokens; "Tres Leches" -> ["tres", "leches"]."""
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def _text_values(value):
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value if isinstance(item, str)]
+    return [value] if isinstance(value, str) else []
+
+
+def document_tokens(doc):
+    """Tokens of the menu items, descriptions and ingredients of one FAISS document."""
+    tokens = []
+    for field in ("menu_items", "menu_descriptions", "ingredients"):
+        for text in _text_values(doc.get(field)):
+            tokens.extend(tokenize(text))
+    return tokens
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the FAISS documents (one per restaurant / menu category).
+
+    Postings store each document's precomputed BM25 weight for a term, so a
+    query is a handful of numpy scatter-adds over one score array.
+    Document ids are FAISS ids, which lets the rankings be fused directly.
+    """
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        """`documents` is a list of token lists indexed by FAISS id (None for unused ids)."""
+        self.size = len(documents)
+        lengths = np.array([len(tokens) if tokens else 0 for tokens in documents], dtype=np.float32)
+        average_length = max(float(lengths[lengths > 0].mean()) if (lengths > 0).any() else 1.0, 1.0)
+        num_documents = int((lengths > 0).sum())
+
+        postings = defaultdict(lambda: ([], []))
+        for doc_id, tokens in enumerate(documents):
+            for term, frequency in Counter(tokens or []).items():
+                doc_ids, frequencies = postings[term]
+                doc_ids.append(doc_id)
+                frequencies.append(frequency)
+
+        self.postings = {}
+        for term, (doc_ids, frequencies) in postings.items():
+            doc_ids = np.array(doc_ids, dtype=np.int64)
+            frequencies = np.array(frequencies, dtype=np.float32)
+            idf = math.log(1 + (num_documents - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            norm = k1 * (1 - b + b * lengths[doc_ids] / average_length)
+            self.postings[term] = (doc_ids, (idf * frequencies * (k1 + 1) / (frequencies + norm)).astype(np.float32))
+
+    @classmethod
+    def from_metadata(cls, metadata_list, **params):
+        return cls([None if doc is None else document_tokens(doc) for doc in metadata_list], **params)
+
+    def search(self, query, k=10, mask=None):
+        """
+        Returns:
+            tuple: (FAISS ids, BM25 scores) of the best `k` matching documents, best first.
+            Documents outside `mask` (if given) are never returned.
+        """
+        terms = [term for term in set(tokenize(query)) - QUERY_STOPWORDS if term in self.postings]
+        if not terms:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in terms:
+            doc_ids, weights = self.postings[term]
+            scores[doc_ids] += weights
+        if mask is not None:
+            scores[~mask] = 0
+
+        matching = np.flatnonzero(scores)
+        if len(matching) > k:
+            matching = matching[np.argpartition(-scores[matching], k - 1)[:k]]
+        order = np.argsort(-scores[matching], kind="stable")
+        return matching[order], scores[matching[order]]
+
+
+def reciprocal_rank_fusion(rankings, k=60, limit=None):
+    """
+    Fuses several ranked id lists: each id scores sum(1 / (k + rank)) over the lists it appears in.
+
+    Returns:
+        list: Ids ordered by fused score (ties keep first-seen order).
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[int(doc_id)] = scores.get(int(doc_id), 0.0) + 1.0 / (k + rank)
+    fused = sorted(scores, key=scores.get, reverse=True)
+    return fused[:limit] if limit is not None else fused
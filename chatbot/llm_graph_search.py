@@ -1,9 +1,13 @@
 from typing_extensions import TypedDict
-from py2neo import Graph
-from chatbot.config import llm
+from chatbot.config import MATERIALIZED_TRENDS
+from chatbot.resources import register, get_resource
+from chatbot.trending_aggregates import match_template
+from chatbot.structured_graph_search import query_parameters
+from chatbot.cypher_cache import CypherTemplateCache
 from langchain.schema.runnable import RunnableLambda
 from dotenv import load_dotenv
 import os
+import time
 
 # Load environment variables
 load_dotenv()
@@ -18,13 +22,19 @@ class State(TypedDict):
     google_results: list
     graph_results: list
     llm_made_graph_results: list
+    cypher_cache_info: dict
     response: str
 
-# Connect to Neo4j Database
+# Connect to Neo4j Database (on first query)
 neo4j_url = os.getenv("NEO4J_URL")
 neo4j_user = os.getenv("NEO4J_USER")
 neo4j_password = os.getenv("NEO4J_PASSWORD")
-graph = Graph(neo4j_url, auth=(neo4j_user, neo4j_password))
+
+@register("neo4j_graph")
+def _connect_graph():
+    from py2neo import Graph
+
+    return Graph(neo4j_url, auth=(neo4j_user, neo4j_password))
 
 # Define LLM Prompt for Generating Cypher Queries
 query_generation_prompt = """
@@ -131,9 +141,15 @@ LIMIT 10;
 
 
 
+# Parameterized templates of earlier generated queries, reused for questions of the same shape
+@register("cypher_cache")
+def _load_cypher_cache():
+    return CypherTemplateCache(query_generation_prompt)
+
+
 # LLM-based Cypher Query Generator
 generate_cypher_query = RunnableLambda(lambda state: 
-    llm.invoke(f"{query_generation_prompt}\nUser Query: {state}").content.strip())
+    get_resource("llm").invoke(f"{query_generation_prompt}\nUser Query: {state}").content.strip())
 
 def query_knowledge_graph(state: State) -> State:
     """
@@ -141,20 +157,49 @@ def query_knowledge_graph(state: State) -> State:
     """
     user_input = state["input"]
 
-    # Step 1: LLM generates Cypher query
+    # Step 0: Ingredient / dish counts come from the materialized trending aggregates
+    if MATERIALIZED_TRENDS and state.get("intent") in ("trending_insights", "menu_innovation"):
+        parameters = query_parameters(state.get("entities") or {})
+        subcategory = match_template(user_input, parameters)
+        if subcategory:
+            results = get_resource("trending_aggregates").run(subcategory, parameters)
+            print(f"\n🔹 Answered '{subcategory}' from the trending aggregates ({len(results)} records)")
+            if results:
+                state["llm_made_graph_results"] = results
+                return state
+
+    # Step 1: Reuse the template of an earlier question with the same shape
+    entities = state.get("entities") or {}
+    cache = get_resource("cypher_cache")
+    template, parameters, entry = cache.lookup(user_input, entities)
+    if template is not None:
+        print(f"\n🔹 Cypher template cache hit ({entry['signature']}), skipping the LLM:", template)
+        try:
+            state["llm_made_graph_results"] = get_resource("neo4j_graph").run(template, parameters).data()
+            state["cypher_cache_info"] = {"hit": True, "signature": entry["signature"], "llm_ms_saved": entry["llm_ms"]}
+            return state
+        except Exception as e:
+            print(f"❌ Cached Cypher template failed ({e}), generating a new query")
+            cache.evict(entry["signature"])
+
+    # Step 2: LLM generates Cypher query
+    start = time.perf_counter()
     cypher_query = generate_cypher_query.invoke(user_input).replace("```cypher", "").replace("```", "").strip()
+    llm_ms = (time.perf_counter() - start) * 1000
     print("\n🔍 Generated Cypher Query:", cypher_query)
+    state["cypher_cache_info"] = {"hit": False, "llm_ms": round(llm_ms, 1), "cached": False}
 
-
-    # Step 2: Check if a valid query was generated
+    # Step 3: Check if a valid query was generated
     if cypher_query == "NO_QUERY":
         state["llm_made_graph_results"] = []
         return state
 
-    # Step 3: Execute the query in Neo4j
+    # Step 4: Execute the query in Neo4j; queries that returned results are cached as templates
     try:
-        results = graph.run(cypher_query).data()
+        results = get_resource("neo4j_graph").run(cypher_query).data()
         state["llm_made_graph_results"] = results
+        if results:
+            state["cypher_cache_info"]["cached"] = cache.store(user_input, entities, cypher_query, llm_ms)
     except Exception as e:
         print(f"❌ Neo4j Query Failed: {e}")
         state["llm_made_graph_results"] = []
@@ -0,0 +1,257 @@
+import re
+import numpy as np
+import pandas as pd
+from chatbot.config import STRUCTURED_DATA_DIR, MENU_DATA_PATH
+from chatbot.resources import register
+from chatbot.sql_store import read_tables
+from chatbot.token_index import TrigramIndex
+
+
+def _csr(parents, num_parents):
+    """
+    Compressed adjacency from a child -> parent array.
+
+    Returns:
+        tuple: (indptr, children) where children[indptr[p]:indptr[p + 1]] are the children of p.
+    """
+    children = np.argsort(parents, kind="stable").astype(np.int32)
+    indptr = np.zeros(num_parents + 1, dtype=np.int64)
+    np.cumsum(np.bincount(parents, minlength=num_parents), out=indptr[1:])
+    return indptr, children
+
+
+def _lower(values):
+    return np.array([str(value).lower().strip() if not pd.isna(value) else "" for value in values], dtype=object)
+
+
+def _lookup(names):
+    """Lower-cased name -> ids carrying it."""
+    ids = {}
+    for position, name in enumerate(names):
+        ids.setdefault(name, []).append(position)
+    return {name: np.array(positions, dtype=np.int32) for name, positions in ids.items()}
+
+
+class GraphResult:
+    """The part of py2neo's Cursor the chatbot uses."""
+
+    def __init__(self, records):
+        self.records = records
+
+    def data(self):
+        return self.records
+
+
+class MemoryGraph:
+    """
+    In-process stand-in for the Neo4j graph, built from structured_internal_data:
+    Restaurant -SERVES-> MenuCategory -HAS_ITEM-> MenuItem -CONTAINS-> Ingredient,
+    stored as integer parent arrays plus CSR adjacency in both directions.
+
+    `run(query, parameters)` answers the templates of QUERY_DICTIONARY natively
+    (matched by their text) and returns an object with `.data()` like py2neo.
+    """
+
+    def __init__(self, tables):
+        restaurants, menus, items, ingredients = (
+            tables[name] for name in ("restaurants", "menus", "menu_items", "ingredients")
+        )
+        restaurant_ids = pd.Index(restaurants["restaurant_id"])
+        menus = menus[restaurant_ids.get_indexer(menus["restaurant_id"]) >= 0].reset_index(drop=True)
+        menu_ids = pd.Index(menus["menu_id"])
+        items = items[menu_ids.get_indexer(items["menu_id"]) >= 0].reset_index(drop=True)
+        item_ids = pd.Index(items["item_id"])
+        ingredients = ingredients[item_ids.get_indexer(ingredients["item_id"]) >= 0]
+
+        # Nodes
+        self.restaurant_name = restaurants["restaurant_name"].to_numpy(dtype=object)
+        self.restaurant_city = restaurants["city"].to_numpy(dtype=object)
+        self.restaurant_rating = pd.to_numeric(restaurants["rating"], errors="coerce").to_numpy(dtype=float)
+        self.restaurant_reviews = pd.to_numeric(restaurants["review_count"], errors="coerce").to_numpy(dtype=float)
+        self.menu_name = menus["menu_category"].to_numpy(dtype=object)
+        self.item_name = items["menu_item"].to_numpy(dtype=object)
+        ingredient_codes, self.ingredient_name = pd.factorize(ingredients["ingredient_name"].str.strip())
+        self.ingredient_name = np.asarray(self.ingredient_name, dtype=object)
+
+        # Edges: child -> parent arrays and CSR adjacency
+        self.menu_restaurant = restaurant_ids.get_indexer(menus["restaurant_id"]).astype(np.int32)
+        self.item_menu = menu_ids.get_indexer(items["menu_id"]).astype(np.int32)
+        self.item_restaurant = self.menu_restaurant[self.item_menu]
+        edge_item = item_ids.get_indexer(ingredients["item_id"]).astype(np.int32)
+        edge_ingredient = ingredient_codes.astype(np.int32)
+        self.restaurant_menus = _csr(self.menu_restaurant, len(self.restaurant_name))
+        self.menu_items = _csr(self.item_menu, len(self.menu_name))
+        indptr, edges = _csr(edge_ingredient, len(self.ingredient_name))
+        self.ingredient_items = (indptr, edge_item[edges])
+        indptr, edges = _csr(edge_item, len(self.item_name))
+        self.item_ingredients = (indptr, edge_ingredient[edges])
+
+        # Lookups for the toLower(x) IN $list predicates
+        self.city_restaurants = _lookup(_lower(self.restaurant_city))
+        self.menu_by_name = _lookup(_lower(self.menu_name))
+        self.item_by_name = _lookup(_lower(self.item_name))
+        self.ingredient_by_name = _lookup(_lower(self.ingredient_name))
+
+        # Substring indexes for the apoc.text.containsAll predicates
+        self.item_text = TrigramIndex(pd.DataFrame({"name": _lower(self.item_name)}))
+        self.item_description = TrigramIndex(pd.DataFrame({"description": _lower(items["menu_description"])}))
+        self.menu_text = TrigramIndex(pd.DataFrame({"name": _lower(self.menu_name)}))
+        self.ingredient_text = TrigramIndex(pd.DataFrame({"name": _lower(self.ingredient_name)}))
+
+        # Ingredient usage and dish appearances never change: count them once
+        self.ingredient_usage = np.diff(self.ingredient_items[0])
+        dish_codes, self.dish_names = pd.factorize(pd.Series(self.item_name))
+        self.dish_appearances = np.bincount(dish_codes[dish_codes >= 0], minlength=len(self.dish_names))
+        self.ingredient_order = np.argsort(-self.ingredient_usage, kind="stable")
+        self.dish_order = np.argsort(-self.dish_appearances, kind="stable")
+
+        from chatbot.structured_graph_search import QUERY_DICTIONARY
+
+        self.handlers = {
+            query: getattr(self, name) for queries in QUERY_DICTIONARY.values() for name, query in queries.items()
+        }
+
+    @classmethod
+    def from_csvs(cls, data_dir=STRUCTURED_DATA_DIR, menu_data_path=MENU_DATA_PATH):
+        return cls(read_tables(data_dir, menu_data_path, normalize=False))
+
+    def run(self, query, parameters=None, **kwparameters):
+        """
+        Returns:
+            GraphResult: The records of a QUERY_DICTIONARY template.
+        """
+        handler = self.handlers.get(query)
+        if handler is None:
+            raise ValueError("MemoryGraph only answers the QUERY_DICTIONARY templates.")
+        parameters = {**(parameters or {}), **kwparameters}
+        return GraphResult(handler(**{name: [str(value).lower().strip() for value in values]
+                                      for name, values in parameters.items()}))
+
+    # ---- helpers -------------------------------------------------------------
+
+    @staticmethod
+    def _ids(lookup, names):
+        found = [lookup[name] for name in names if name in lookup]
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int32)
+
+    def _restaurant_mask(self, locations):
+        mask = np.zeros(len(self.restaurant_name), dtype=bool)
+        mask[self._ids(self.city_restaurants, locations)] = True
+        return mask
+
+    @staticmethod
+    def _ranked(restaurant_ids, key):
+        """Restaurant ids sorted by `key` (rating, reviews) descending, missing values last."""
+        values = np.nan_to_num(key[restaurant_ids], nan=-np.inf)
+        return restaurant_ids[np.argsort(-values, kind="stable")]
+
+    @staticmethod
+    def _contains_all(index, terms):
+        """Rows of `index` containing every term; an empty list matches nothing (not vacuously everything)."""
+        if not terms:
+            return np.zeros(index.num_rows, dtype=bool)
+        mask = np.ones(index.num_rows, dtype=bool)
+        for term in terms:
+            mask &= index.match(re.escape(term))
+        return mask
+
+    @staticmethod
+    def _top_counts(names, counts, name_key, count_key, limit, keep=None, order=None):
+        """The `limit` largest counts (among `keep`); `order` is a precomputed descending order of all counts."""
+        if order is None:
+            order = np.flatnonzero(counts if keep is None else counts * keep)
+            order = order[np.argsort(-counts[order], kind="stable")]
+        return [{name_key: names[i], count_key: int(counts[i])} for i in order[:limit]]
+
+    # ---- ingredient_discovery ------------------------------------------------
+
+    def restaurant_search_based_on_cuisine_in_cities(self, menu_categories=(), locations=(), **_):
+        menus = self._ids(self.menu_by_name, menu_categories)
+        menus = menus[self._restaurant_mask(locations)[self.menu_restaurant[menus]]]
+        cuisines = {}
+        for menu in menus:
+            cuisines.setdefault(int(self.menu_restaurant[menu]), []).append(self.menu_name[menu])
+        ranked = self._ranked(np.array(sorted(cuisines), dtype=np.int64), self.restaurant_rating)[:15]
+        return [{"restaurant": self.restaurant_name[r], "city": self.restaurant_city[r], "cuisine": cuisines[r]}
+                for r in ranked]
+
+    def restaurant_search_based_on_ingredient(self, menu_items=(), ingredients=(), menu_categories=(), **_):
+        matched = self._contains_all(self.item_text, menu_items) | self._contains_all(self.item_description, ingredients)
+        matched |= self._contains_all(self.menu_text, menu_categories)[self.item_menu]
+        ingredient_ids = np.flatnonzero(self._contains_all(self.ingredient_text, ingredients))
+        indptr, item_ids = self.ingredient_items
+        for ingredient in ingredient_ids:
+            matched[item_ids[indptr[ingredient]:indptr[ingredient + 1]]] = True
+
+        items = {}
+        for item in np.flatnonzero(matched):
+            names = items.setdefault(int(self.item_restaurant[item]), [])
+            if self.item_name[item] not in names:
+                names.append(self.item_name[item])
+        ranked = self._ranked(np.array(sorted(items), dtype=np.int64), self.restaurant_rating)[:15]
+        return [{"restaurant": self.restaurant_name[r], "matched_items": items[r]} for r in ranked]
+
+    def dish_search_in_city(self, menu_items=(), locations=(), **_):
+        items = self._ids(self.item_by_name, menu_items)
+        items = items[self._restaurant_mask(locations)[self.item_restaurant[items]]]
+        dishes = {}
+        for item in items:
+            dishes.setdefault(int(self.item_restaurant[item]), []).append(self.item_name[item])
+        ranked = self._ranked(np.array(sorted(dishes), dtype=np.int64), self.restaurant_rating)[:15]
+        return [{"restaurant": self.restaurant_name[r], "dishes": dishes[r]} for r in ranked]
+
+    # ---- menu_innovation -----------------------------------------------------
+
+    def ingredient_use(self, ingredients=(), **_):
+        keep = np.zeros(len(self.ingredient_name), dtype=bool)
+        keep[self._ids(self.ingredient_by_name, ingredients)] = True
+        return self._top_counts(self.ingredient_name, self.ingredient_usage, "ingredient", "mentions", 15, keep)
+
+    def trending_ingredients(self, **_):
+        return self._top_counts(self.ingredient_name, self.ingredient_usage, "ingredient", "usage_count", 15,
+                                order=self.ingredient_order)
+
+    # ---- trending_insights ---------------------------------------------------
+
+    def popular_dishes(self, **_):
+        return self._top_counts(self.dish_names, self.dish_appearances, "dish", "appearances", 15, order=self.dish_order)
+
+    def ingredient_trends(self, **_):
+        return self._top_counts(self.ingredient_name, self.ingredient_usage, "ingredient", "mentions", 15,
+                                order=self.ingredient_order)
+
+    def _menus_in_cities(self, menu_categories, locations):
+        menus = self._ids(self.menu_by_name, menu_categories)
+        return menus[self._restaurant_mask(locations)[self.menu_restaurant[menus]]]
+
+    def price_comparison(self, menu_categories=(), locations=(), **_):
+        # Menu items carry no price in this dataset, so AVG(mi.price) is null as in Neo4j
+        indptr, _ = self.menu_items
+        groups = {}
+        for menu in self._menus_in_cities(menu_categories, locations):
+            if indptr[menu + 1] > indptr[menu]:  # MATCH needs at least one HAS_ITEM edge
+                groups[self.menu_name[menu], self.restaurant_city[self.menu_restaurant[menu]]] = None
+        return [{"cuisine": cuisine, "city": city, "avg_price": None} for cuisine, city in list(groups)[:10]]
+
+    def cuisine_popularity_comparison(self, menu_categories=(), locations=(), **_):
+        counts = {}
+        for menu in self._menus_in_cities(menu_categories, locations):
+            key = (self.menu_name[menu], self.restaurant_city[self.menu_restaurant[menu]])
+            counts[key] = counts.get(key, 0) + 1
+        ranked = sorted(counts.items(), key=lambda item: -item[1])[:10]
+        return [{"cuisine": cuisine, "city": city, "restaurant_count": count} for (cuisine, city), count in ranked]
+
+    # ---- reviews_analysis ----------------------------------------------------
+
+    def top_rated_restaurants(self, locations=(), **_):
+        ranked = self._ranked(np.flatnonzero(self._restaurant_mask(locations)), self.restaurant_rating)[:10]
+        return [{"restaurant": self.restaurant_name[r], "rating": float(self.restaurant_rating[r])} for r in ranked]
+
+    def most_reviewed_restaurants(self, locations=(), **_):
+        ranked = self._ranked(np.flatnonzero(self._restaurant_mask(locations)), self.restaurant_reviews)[:10]
+        return [{"restaurant": self.restaurant_name[r], "reviews": float(self.restaurant_reviews[r])} for r in ranked]
+
+
+@register("memory_graph")
+def _load_memory_graph():
+    return MemoryGraph.from_csvs()
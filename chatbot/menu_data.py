@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+from chatbot.config import MENU_DATA_PATH
+from chatbot.resources import register, get_resource
+from chatbot.csv_snapshot import load_csv
+
+# Few distinct values repeated over many rows: stored as pandas categoricals
+CATEGORICAL_COLUMNS = ("restaurant_name", "city", "state", "price")
+NUMERIC_COLUMNS = ("rating", "review_count")
+
+
+def _is_text(column):
+    return pd.api.types.is_object_dtype(column) or pd.api.types.is_string_dtype(column)
+
+
+def normalize_text_columns(df):
+    """Lower-cases and strips every text column (NaN becomes "nan"), as the filters expect."""
+    return df.apply(lambda x: x.fillna("nan").astype(str).str.lower().str.strip() if _is_text(x) else x)
+
+
+def load_menu_data(path=MENU_DATA_PATH):
+    """
+    Reads the menu dataset and normalizes it once: text columns are lower-cased
+    and stripped, low-cardinality columns become categoricals and rating /
+    review_count are kept numeric. Later starts read the result from a
+    columnar snapshot instead of re-parsing the CSV.
+
+    Returns:
+        pd.DataFrame: The normalized menu data.
+    """
+    return load_csv(path, transform=normalize_menu_data, name="normalized")
+
+
+def normalize_menu_data(df):
+    """Normalized text, numeric rating / review_count and categoricals (what load_menu_data serves)."""
+    df = normalize_text_columns(df)
+    for name in NUMERIC_COLUMNS:
+        df[name] = pd.to_numeric(df[name], errors="coerce")
+    for name in CATEGORICAL_COLUMNS:
+        df[name] = df[name].astype("category")
+    return df
+
+
+# The single normalized copy shared by every request; consumers select rows from it and never modify it
+@register("menu_data")
+def _load_menu_data():
+    return load_menu_data()
+
+
+
+class ColumnFilterIndex:
+    """
+    Row indexes for the numeric entity filters, built once: rating and
+    review_count are kept sorted (a range is two binary searches) and each
+    price tier has a precomputed row bitmap.
+
+    `mask(filters)` takes the output of `parse_entity_filters` and returns
+    one boolean array over the rows (AND across attributes).
+    """
+
+    def __init__(self, df):
+        self.num_rows = len(df)
+        self.sorted = {}
+        for name in NUMERIC_COLUMNS:
+            values = pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=float)
+            order = np.argsort(values, kind="stable")  # NaN sorts last and is never in a range
+            order = order[~np.isnan(values[order])]
+            self.sorted[name] = (values[order], order)
+        prices = df["price"].astype(str).str.strip().to_numpy()
+        self.price_tiers = {tier: prices == tier for tier in np.unique(prices)}
+
+    def _range(self, name, low, high):
+        values, order = self.sorted[name]
+        start = 0 if low is None else np.searchsorted(values, low, side="left")
+        stop = len(values) if high is None else np.searchsorted(values, high, side="right")
+        mask = np.zeros(self.num_rows, dtype=bool)
+        mask[order[start:stop]] = True
+        return mask
+
+    def mask(self, filters):
+        """
+        Returns:
+            np.ndarray or None: Boolean mask of the rows within the price / rating / review_count
+            filters, None when none of them is set.
+        """
+        mask = None
+        if filters.get("price"):
+            mask = np.zeros(self.num_rows, dtype=bool)
+            for tier in filters["price"]:
+                if tier in self.price_tiers:
+                    mask |= self.price_tiers[tier]
+        for name in NUMERIC_COLUMNS:
+            if filters.get(name):
+                in_range = self._range(name, *filters[name])
+                mask = in_range if mask is None else mask & in_range
+        return mask
+
+
+@register("menu_filter_index")
+def _load_menu_filter_index():
+    return ColumnFilterIndex(get_resource("menu_data"))
+
+
+def _distinct(values):
+    return sorted(set(values) - {"nan"})
+
+
+def build_restaurant_summary(df):
+    """
+    One row per restaurant, in the order of the restaurant_name categories:
+    deduplicated menu and restaurant categories, the first location, price tiers,
+    and the mean rating / total reviews over its distinct locations
+    (review_count repeats on every menu row of a location).
+
+    Returns:
+        pd.DataFrame: The summary table indexed by restaurant_name.
+    """
+    list_columns = ["menu_category", "categories", "price"]
+    names = df["restaurant_name"]
+    lists = pd.DataFrame({name: df[name].astype(object) for name in list_columns}).groupby(names, observed=True).agg(_distinct)
+    location = df[["restaurant_name", "address1", "city", "zip_code", "country", "state"]].astype(
+        {"city": object, "state": object}).groupby("restaurant_name", observed=True).first()
+
+    locations = df.drop_duplicates(["restaurant_name", "address1"]).groupby("restaurant_name", observed=True)
+    scores = pd.DataFrame({"rating": locations["rating"].mean(), "review_count": locations["review_count"].sum()})
+
+    summary = lists.join(location).join(scores)
+    return summary.reindex(names.cat.categories).rename_axis("restaurant_name")[
+        ["menu_category", "categories", "address1", "city", "zip_code",
+         "country", "state", "rating", "review_count", "price"]]
+
+
+@register("restaurant_summary")
+def _load_restaurant_summary():
+    return build_restaurant_summary(get_resource("menu_data"))
+
+
+# Fields of the matching menu rows attached to each top_restaurants record
+MATCHED_COLUMNS = {
+    "menu_item": "matched_items",
+    "menu_description": "matched_descriptions",
+    "ingredient_name": "matched_ingredients",
+}
+
+
+def top_restaurants(rows, summary, top_n):
+    """
+    Ranks the restaurants of the matching menu `rows` by how many rows matched
+    (then by rating) and slices their precomputed summaries.
+
+    Returns:
+        list: Up to `top_n` summary records, each with the items, descriptions
+        and ingredients of its matching rows.
+    """
+    positions = summary.index.get_indexer(rows["restaurant_name"].astype(object))
+    found = positions >= 0
+    positions = positions[found]
+    if len(positions) == 0:
+        return []
+
+    counts = np.bincount(positions, minlength=len(summary))
+    candidates = np.flatnonzero(counts)
+    ratings = np.nan_to_num(summary["rating"].to_numpy(dtype=float)[candidates], nan=-1.0)
+    top = candidates[np.lexsort((-ratings, -counts[candidates]))[:top_n]]
+
+    matched = {column: rows[column].astype(object).to_numpy()[found] for column in MATCHED_COLUMNS}
+    records = summary.iloc[top].reset_index().to_dict(orient="records")
+    for record, position in zip(records, top):
+        selected = positions == position
+        for column, key in MATCHED_COLUMNS.items():
+            record[key] = _distinct(matched[column][selected])
+    return records
@@ -0,0 +1,217 @@
+import sys
+import json
+import math
+import mmap
+import pickle
+import numpy as np
+
+# File layout: MAGIC | uint64 header length | JSON header | 64-byte aligned sections.
+# Each column is stored on its own (offsets + UTF-8 string heap, or a float64
+# array), so reading one row touches a few pages instead of unpickling everything.
+MAGIC = b"DBMETA01"
+ALIGN = 64
+
+
+def _is_null(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _column_kind(values):
+    """Picks the narrowest encoding that round-trips every value of a column."""
+    has_list = has_str = has_number = has_other = False
+    for value in values:
+        if _is_null(value):
+            continue
+        if isinstance(value, (list, tuple)):
+            has_list = True
+            has_other |= any(not (_is_null(item) or isinstance(item, str)) for item in value)
+        elif isinstance(value, str):
+            has_str = True
+        elif isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool):
+            has_number = True
+        else:
+            has_other = True
+
+    if has_other or has_list + has_str + has_number > 1:
+        return "json"
+    if has_list:
+        return "str_list"
+    if has_str:
+        return "str"
+    return "float"
+
+
+def _encode_strings(strings):
+    """Returns (int64 offsets, uint8 heap, bool nulls) for a list of optional strings."""
+    encoded = [b"" if _is_null(text) else text.encode("utf-8") for text in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(chunk) for chunk in encoded], out=offsets[1:])
+    heap = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    nulls = np.array([_is_null(text) for text in strings], dtype=bool)
+    return offsets, heap, nulls
+
+
+def write_store(metadata_list, path):
+    """
+    Writes a list of metadata dicts (None for unused ids) as a columnar store.
+    Row `i` of the store is entry `i` of the list, i.e. the FAISS id.
+    """
+    num_rows = len(metadata_list)
+    valid = np.array([metadata is not None for metadata in metadata_list], dtype=bool)
+
+    column_names = []
+    for metadata in metadata_list:
+        for name in metadata or {}:
+            if name not in column_names:
+                column_names.append(name)
+
+    sections = [("valid", valid)]
+    columns = {}
+    for name in column_names:
+        values = [metadata.get(name) if metadata is not None else None for metadata in metadata_list]
+        kind = _column_kind(values)
+
+        if kind == "float":
+            data = np.array([math.nan if _is_null(value) else float(value) for value in values], dtype=np.float64)
+            parts = {"values": data}
+        elif kind == "str":
+            offsets, heap, nulls = _encode_strings(values)
+            parts = {"offsets": offsets, "heap": heap, "nulls": nulls}
+        elif kind == "str_list":
+            lengths = [0 if _is_null(value) else len(value) for value in values]
+            row_offsets = np.zeros(num_rows + 1, dtype=np.int64)
+            np.cumsum(lengths, out=row_offsets[1:])
+            items = [item for value in values if not _is_null(value) for item in value]
+            offsets, heap, nulls = _encode_strings(items)
+            parts = {"row_offsets": row_offsets, "offsets": offsets, "heap": heap, "nulls": nulls}
+        else:
+            offsets, heap, nulls = _encode_strings([None if _is_null(value) else json.dumps(value) for value in values])
+            parts = {"offsets": offsets, "heap": heap, "nulls": nulls}
+
+        columns[name] = {"kind": kind, "sections": {}}
+        for part, array in parts.items():
+            columns[name]["sections"][part] = len(sections)
+            sections.append((f"{name}.{part}", array))
+
+    # Lay out sections after the header, each aligned so views need no copy.
+    # Section offsets depend on the header size, so repeat until it stops growing.
+    header = {"num_rows": num_rows, "columns": columns, "sections": []}
+    header_length = 0
+    while True:
+        position = len(MAGIC) + 8 + header_length
+        header["sections"] = []
+        for _, array in sections:
+            position = -(-position // ALIGN) * ALIGN
+            header["sections"].append([position, array.dtype.str, int(array.size)])
+            position += array.nbytes
+        header_bytes = json.dumps(header).encode("utf-8")
+        if len(header_bytes) <= header_length:
+            header_bytes += b" " * (header_length - len(header_bytes))
+            break
+        header_length = -(-(len(MAGIC) + 8 + len(header_bytes)) // ALIGN) * ALIGN - len(MAGIC) - 8
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header_bytes)).tobytes())
+        f.write(header_bytes)
+        for (start, _, _), (_, array) in zip(header["sections"], sections):
+            f.write(b"\0" * (start - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+
+
+class MetadataStore:
+    """
+    Read-only, memory-mapped view of a store written by `write_store`.
+
+    Behaves like the list of metadata dicts it was built from: `store[faiss_id]`
+    decodes just that row, `len(store)` and iteration work as before. Pages are
+    shared by every process mapping the same file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a metadata store.")
+
+        header_start = len(MAGIC) + 8
+        header_length = int(np.frombuffer(self._mmap, dtype=np.uint64, count=1, offset=len(MAGIC))[0])
+        header = json.loads(self._mmap[header_start:header_start + header_length])
+
+        self.num_rows = header["num_rows"]
+        self.columns = {name: spec["kind"] for name, spec in header["columns"].items()}
+        sections = header["sections"]
+        self._valid = self._view(*sections[0])
+        self._parts = {}
+        for name, spec in header["columns"].items():
+            parts = {part: self._view(*sections[index]) for part, index in spec["sections"].items() if part != "heap"}
+            if "heap" in spec["sections"]:
+                parts["heap"] = sections[spec["sections"]["heap"]][0]  # Absolute file offset of the heap
+            self._parts[name] = parts
+
+    def _view(self, start, dtype, count):
+        return np.frombuffer(self._mmap, dtype=np.dtype(dtype), count=count, offset=start)
+
+    def _decode_range(self, parts, first, last):
+        """Decodes strings first..last-1 of a column with one slice of the heap."""
+        offsets = parts["offsets"][first:last + 1].tolist()
+        nulls = parts["nulls"][first:last].tolist()
+        base = parts["heap"]
+        chunk = self._mmap[base + offsets[0]:base + offsets[-1]]
+        origin = offsets[0]
+        return [
+            math.nan if null else chunk[start - origin:end - origin].decode("utf-8")
+            for start, end, null in zip(offsets, offsets[1:], nulls)
+        ]
+
+    def _value(self, name, row_id):
+        kind, parts = self.columns[name], self._parts[name]
+        if kind == "float":
+            return float(parts["values"][row_id])
+        if kind == "str_list":
+            start, end = parts["row_offsets"][row_id:row_id + 2].tolist()
+            return self._decode_range(parts, start, end)
+        value = self._decode_range(parts, row_id, row_id + 1)[0]
+        if kind == "json" and not _is_null(value):
+            return json.loads(value)
+        return value
+
+    def __len__(self):
+        return self.num_rows
+
+    def __getitem__(self, row_id):
+        row_id = int(row_id)
+        if row_id < 0:
+            row_id += self.num_rows
+        if not 0 <= row_id < self.num_rows:
+            raise IndexError(f"Row {row_id} out of range for a store of {self.num_rows} rows.")
+        if not self._valid[row_id]:
+            return None
+        return {name: self._value(name, row_id) for name in self.columns}
+
+    def __iter__(self):
+        for row_id in range(self.num_rows):
+            yield self[row_id]
+
+    def column(self, name):
+        """Returns a whole column: a zero-copy float64 array for numeric columns, else a decoded list."""
+        if self.columns[name] == "float":
+            return self._parts[name]["values"]
+        return [self._value(name, row_id) if self._valid[row_id] else None for row_id in range(self.num_rows)]
+
+
+def load_metadata(path):
+    """Opens FAISS metadata: a memory-mapped store, or a legacy pickled list of dicts."""
+    if path.endswith(".pkl"):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    return MetadataStore(path)
+
+
+if __name__ == "__main__":
+    # Convert a legacy pickle: python -m chatbot.metadata_store metadata_2.pkl metadata_2.bin
+    source, target = sys.argv[1], sys.argv[2]
+    with open(source, "rb") as f:
+        write_store(pickle.load(f), target)
+    print(f"✅ Converted {source} -> {target}")
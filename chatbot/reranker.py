@@ -0,0 +1,159 @@
+import time
+import threading
+from collections import OrderedDict
+from chatbot.config import (
+    RERANKER_MODEL_NAME, RERANK_DOC_TEXT, RERANK_DOC_TOKENS, RERANK_MAX_CANDIDATES,
+    RERANK_SKIP_MARGIN, RERANK_CACHE_SIZE
+)
+from chatbot.embedding_cache import normalize_query
+from chatbot.resources import register, get_resource
+
+
+# Load cross-encoder model for reranking
+@register("reranker")
+def _load_reranker():
+    from sentence_transformers import CrossEncoder
+
+    return CrossEncoder(RERANKER_MODEL_NAME)
+
+
+def _truncate_to_tokens(text, tokenizer, max_tokens):
+    """Cuts `text` after `max_tokens` tokens, keeping the original characters."""
+    encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+    offsets = encoding["offset_mapping"]
+    if len(offsets) <= max_tokens:
+        return text
+    return text[:offsets[max_tokens - 1][1]]
+
+
+def document_text(doc, mode=RERANK_DOC_TEXT, tokenizer=None):
+    """
+    Builds the text the cross-encoder scores for one FAISS document.
+    - "name": restaurant name and menu category (short, fastest)
+    - "rich": also lists the items and their ingredients, truncated to RERANK_DOC_TOKENS
+    """
+    name = doc["restaurant_name"] + " " + doc["menu_category"]
+    if mode != "rich":
+        return name
+
+    text = f"{name}. Items: {', '.join(map(str, doc['menu_items']))}. Ingredients: {'; '.join(map(str, doc['ingredients']))}"
+    return _truncate_to_tokens(text, tokenizer, RERANK_DOC_TOKENS) if tokenizer is not None else text
+
+
+# Document texts are built (and truncated) once per index, not on every query
+@register("rerank_documents")
+def _build_rerank_documents():
+    tokenizer = get_resource("reranker").tokenizer if RERANK_DOC_TEXT == "rich" else None
+    return [None if doc is None else document_text(doc, RERANK_DOC_TEXT, tokenizer) for doc in get_resource("faiss_metadata")]
+
+
+class ScoreCache:
+    """Thread-safe LRU of cross-encoder scores keyed by (normalized query, document id)."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._scores = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            score = self._scores.get(key)
+            if score is None:
+                self.misses += 1
+                return None
+            self._scores.move_to_end(key)
+            self.hits += 1
+            return score
+
+    def put(self, key, score):
+        with self._lock:
+            self._scores[key] = score
+            self._scores.move_to_end(key)
+            if len(self._scores) > self.capacity:
+                self._scores.popitem(last=False)
+
+
+score_cache = ScoreCache(RERANK_CACHE_SIZE)
+
+
+def is_decisive(distances):
+    """
+    True when FAISS already separates the best hit clearly: the nearest
+    candidate is closer than the runner-up by at least RERANK_SKIP_MARGIN (relative).
+    Fused candidates have no distances (None) and are always reranked.
+    """
+    if RERANK_SKIP_MARGIN is None or distances is None or len(distances) < 2 or distances[1] <= 0:
+        return False
+    return (distances[1] - distances[0]) / distances[1] >= RERANK_SKIP_MARGIN
+
+
+def rerank_batch(queries, candidate_ids, candidate_distances, top_n=5):
+    """
+    Reranks FAISS candidates for several queries with one cross-encoder call.
+
+    Per query, reranking is skipped when the FAISS gap is decisive, at most
+    RERANK_MAX_CANDIDATES candidates are scored, and cached scores are reused.
+    Unscored candidates keep their FAISS order after the scored ones.
+
+    Returns:
+        tuple: (list of ranked id lists, list of per-query rerank info dicts)
+    """
+    documents = get_resource("rerank_documents")
+    start = time.perf_counter()
+
+    plans = []
+    pending_pairs = []
+    pending_keys = []
+    for query_text, ids, distances in zip(queries, candidate_ids, candidate_distances):
+        info = {"ran": False, "reason": "", "candidates": 0, "cached_scores": 0, "scored_pairs": 0, "latency_ms": 0.0}
+        scores = {}
+        if len(ids) < 2:
+            info["reason"] = "fewer than two candidates"
+        elif is_decisive(distances):
+            info["reason"] = "decisive FAISS distance gap"
+        else:
+            info["ran"] = True
+            info["candidates"] = min(len(ids), RERANK_MAX_CANDIDATES)
+            query_key = normalize_query(query_text)
+            for doc_id in ids[:RERANK_MAX_CANDIDATES]:
+                cached = score_cache.get((query_key, RERANK_DOC_TEXT, doc_id))
+                if cached is not None:
+                    scores[doc_id] = cached
+                    info["cached_scores"] += 1
+                else:
+                    pending_pairs.append((query_text, documents[doc_id]))
+                    pending_keys.append((len(plans), (query_key, RERANK_DOC_TEXT, doc_id)))
+                    info["scored_pairs"] += 1
+        plans.append((ids, scores, info))
+
+    planning_seconds = time.perf_counter() - start
+
+    # Score every uncached (query, doc) pair of the batch together
+    predict_seconds = 0.0
+    if pending_pairs:
+        predict_start = time.perf_counter()
+        predicted = get_resource("reranker").predict(pending_pairs)
+        predict_seconds = time.perf_counter() - predict_start
+        for (plan_index, key), score in zip(pending_keys, predicted):
+            score = float(score)
+            score_cache.put(key, score)
+            plans[plan_index][1][key[2]] = score
+
+    ranked_ids = []
+    infos = []
+    for ids, scores, info in plans:
+        scored = [doc_id for doc_id in ids if doc_id in scores]
+        unscored = [doc_id for doc_id in ids if doc_id not in scores]
+
+        # Sort scored docs by reranker score (higher is better), then keep the top N
+        scored = sorted(scored, key=lambda doc_id: scores[doc_id], reverse=True)
+        ranked_ids.append((scored + unscored)[:top_n])
+
+        # Each query is charged its share of the batched predict call
+        share = info["scored_pairs"] / len(pending_pairs) if pending_pairs else 0.0
+        info["latency_ms"] = (planning_seconds / len(plans) + predict_seconds * share) * 1000
+        infos.append(info)
+
+    return ranked_ids, infos
@@ -0,0 +1,84 @@
+import time
+import threading
+
+
+class ResourceRegistry:
+    """
+    Loads heavy dependencies (indexes, models, datasets, connections) on first use.
+
+    Modules register a loader under a name at import time, which costs nothing;
+    the loader only runs the first time `get(name)` is called. Loading is
+    thread-safe: concurrent callers of the same resource wait for one load.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._resources = {}
+        self._load_times = {}
+        self._locks = {}
+        self._registry_lock = threading.Lock()
+
+    def register(self, name):
+        """Decorator registering `loader()` as the factory of resource `name`."""
+        def decorator(loader):
+            with self._registry_lock:
+                self._loaders[name] = loader
+                self._locks.setdefault(name, threading.Lock())
+            return loader
+        return decorator
+
+    def get(self, name):
+        """Returns resource `name`, loading it first if needed."""
+        try:
+            return self._resources[name]
+        except KeyError:
+            pass
+
+        if name not in self._loaders:
+            raise KeyError(f"No resource registered under '{name}'.")
+
+        with self._locks[name]:
+            if name not in self._resources:
+                start = time.perf_counter()
+                self._resources[name] = self._loaders[name]()
+                self._load_times[name] = time.perf_counter() - start
+                print(f"⏱️ Loaded {name} in {self._load_times[name] * 1000:.1f} ms")
+        return self._resources[name]
+
+    def set(self, name, value):
+        """Replaces a resource with an already built value (benchmarks, tests)."""
+        with self._locks.setdefault(name, threading.Lock()):
+            self._resources[name] = value
+
+    def is_loaded(self, name):
+        return name in self._resources
+
+    def warmup(self, names=None):
+        """
+        Eagerly loads the given resources (all registered ones by default) and
+        prints a per-resource load-time breakdown. Meant for production start-up:
+        a resource that fails to load is reported and left to load on first use.
+
+        Returns:
+            dict: Load time in seconds of every loaded resource.
+        """
+        for name in names or list(self._loaders):
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"⚠️ Could not load {name}: {e!r}")
+
+        print("\n📊 Resource load times:")
+        for name, seconds in sorted(self._load_times.items(), key=lambda item: item[1], reverse=True):
+            print(f"   - {name:28s} {seconds * 1000:10.1f} ms")
+        print(f"   = {'total':28s} {sum(self._load_times.values()) * 1000:10.1f} ms")
+        return dict(self._load_times)
+
+    def load_times(self):
+        return dict(self._load_times)
+
+
+registry = ResourceRegistry()
+register = registry.register
+get_resource = registry.get
+warmup = registry.warmup
@@ -1,5 +1,5 @@
 from chatbot.state import State  # ✅ Use the correct state structure
-from chatbot.config import llm  # Import LLM from config.py
+from chatbot.resources import get_resource
 
 def generate_llm_response(user_query, intent, results):
     prompt = f"""
@@ -35,7 +35,7 @@ def generate_llm_response(user_query, intent, results):
     """
 
     # Invoke LLM and generate a response
-    return llm.invoke(prompt[:6000]).content.strip()
+    return get_resource("llm").invoke(prompt[:6000]).content.strip()
 
 
 def generate_response(state: State, result_key: str) -> State:
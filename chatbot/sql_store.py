@@ -0,0 +1,264 @@
+import os
+import re
+import json
+import sqlite3
+import argparse
+import pandas as pd
+from chatbot.config import STRUCTURED_DATA_DIR, STRUCTURED_DB_PATH, MENU_DATA_PATH
+from chatbot.resources import register, get_resource
+from chatbot.menu_data import normalize_text_columns
+from chatbot.entity_filters import parse_entity_filters
+
+SCHEMA = """
+CREATE TABLE restaurants (
+    restaurant_id INTEGER PRIMARY KEY,
+    restaurant_name TEXT NOT NULL,
+    address1 TEXT, city TEXT, state TEXT, zip_code REAL, country TEXT,
+    rating REAL, review_count REAL, price TEXT
+);
+CREATE TABLE restaurant_categories (restaurant_id INTEGER NOT NULL, category TEXT);
+CREATE TABLE menus (menu_id INTEGER PRIMARY KEY, menu_category TEXT, restaurant_id INTEGER NOT NULL);
+CREATE TABLE menu_items (item_id INTEGER PRIMARY KEY, menu_id INTEGER NOT NULL, menu_item TEXT, menu_description TEXT);
+CREATE TABLE ingredients (item_id INTEGER NOT NULL, ingredient_name TEXT, confidence REAL);
+
+CREATE INDEX idx_restaurants_name ON restaurants (restaurant_name);
+CREATE INDEX idx_restaurants_city ON restaurants (city);
+CREATE INDEX idx_restaurants_state ON restaurants (state);
+CREATE INDEX idx_restaurants_price ON restaurants (price);
+CREATE INDEX idx_restaurants_rating ON restaurants (rating);
+CREATE INDEX idx_restaurant_categories ON restaurant_categories (restaurant_id, category);
+CREATE INDEX idx_menus_restaurant ON menus (restaurant_id);
+CREATE INDEX idx_menu_items_menu ON menu_items (menu_id);
+CREATE INDEX idx_ingredients_item ON ingredients (item_id);
+CREATE INDEX idx_ingredients_name ON ingredients (ingredient_name);
+
+-- Full-text index over each item's name, description and ingredients (rowid = item_id)
+CREATE VIRTUAL TABLE menu_items_fts USING fts5(
+    menu_item, menu_description, ingredients, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+TABLES = ("restaurants", "restaurant_categories", "menus", "menu_items", "ingredients")
+
+
+def _read_table(data_dir, name, normalize):
+    path = os.path.join(data_dir, f"{name}.csv")
+    if not os.path.exists(path):
+        return None
+    df = pd.read_csv(path)
+    return normalize_text_columns(df) if normalize else df
+
+
+def _derive_menu_items(menu_data, restaurants, menus):
+    """
+    Rebuilds menu_items / ingredients from the cleaned menu data when
+    internal_data_transform.py's menu_items.csv is not available.
+
+    Returns:
+        tuple: (menu_items, ingredients) DataFrames in the schema of the CSVs.
+    """
+    rows = menu_data.merge(restaurants[["restaurant_id", "restaurant_name"]], on="restaurant_name")
+    # Menus whose names only differ in case/spacing collapse once normalized; keep the first
+    rows = rows.merge(menus.drop_duplicates(["restaurant_id", "menu_category"]), on=["restaurant_id", "menu_category"])
+    rows.insert(0, "item_id", range(1, len(rows) + 1))
+
+    ingredients = rows[["item_id", "ingredient_name"]].assign(
+        ingredient_name=rows["ingredient_name"].str.split(","), confidence=None
+    ).explode("ingredient_name")
+    ingredients["ingredient_name"] = ingredients["ingredient_name"].str.strip()
+    ingredients = ingredients[ingredients["ingredient_name"].notna() & ~ingredients["ingredient_name"].isin(["", "nan"])]
+    return rows[["item_id", "menu_id", "menu_item", "menu_description"]], ingredients
+
+
+def read_tables(data_dir=STRUCTURED_DATA_DIR, menu_data_path=MENU_DATA_PATH, normalize=True):
+    """
+    Reads the CSVs of internal_data_transform.py, deriving menu_items /
+    ingredients from the cleaned menu data when menu_items.csv is missing.
+    With `normalize`, text is lower-cased and stripped like the pandas menu data.
+
+    Returns:
+        dict: One DataFrame per name in TABLES.
+    """
+    tables = {name: _read_table(data_dir, name, normalize) for name in TABLES}
+    if tables["menu_items"] is None:
+        print(f"⚠️ {data_dir}/menu_items.csv not found, deriving menu items from {menu_data_path}")
+        menu_data = pd.read_csv(menu_data_path)
+        tables["menu_items"], tables["ingredients"] = _derive_menu_items(
+            normalize_text_columns(menu_data) if normalize else menu_data, tables["restaurants"], tables["menus"]
+        )
+    tables["restaurant_categories"]["category"] = tables["restaurant_categories"]["category"].str.strip()
+    return tables
+
+
+def build_database(data_dir=STRUCTURED_DATA_DIR, db_path=STRUCTURED_DB_PATH, menu_data_path=MENU_DATA_PATH):
+    """
+    Loads the normalized CSVs of internal_data_transform.py into a SQLite
+    database with lookup indexes and an FTS5 table over the menu items.
+    """
+    tables = read_tables(data_dir, menu_data_path)
+
+    tmp_path = f"{db_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        for name in TABLES:
+            columns = list(tables[name].columns)
+            rows = tables[name].astype(object).where(tables[name].notna(), None).itertuples(index=False)
+            conn.executemany(
+                f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows
+            )
+        conn.execute("""
+            INSERT INTO menu_items_fts (rowid, menu_item, menu_description, ingredients)
+            SELECT i.item_id, i.menu_item, i.menu_description, group_concat(g.ingredient_name, ', ')
+            FROM menu_items i LEFT JOIN ingredients g ON g.item_id = i.item_id
+            GROUP BY i.item_id
+        """)
+        conn.execute("INSERT INTO menu_items_fts (menu_items_fts) VALUES ('optimize')")
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)  # Readers never see a half-built database
+
+    print(f"✅ SQLite database written to {db_path}: " + ", ".join(f"{len(tables[name])} {name}" for name in TABLES))
+
+
+# Read-only connection shared by all requests
+@register("structured_db")
+def _load_structured_db():
+    if not os.path.exists(STRUCTURED_DB_PATH):
+        raise FileNotFoundError(f"{STRUCTURED_DB_PATH} not found. Build it with `python -m chatbot.sql_store`.")
+    return sqlite3.connect(f"file:{STRUCTURED_DB_PATH}?mode=ro", uri=True, check_same_thread=False)
+
+
+def fts_query(terms):
+    """
+    Turns extracted terms into an FTS5 expression: each term becomes a phrase
+    whose last word is a prefix (so "chees" finds "cheese"), OR-ed together.
+    Regex syntax from the LLM is reduced to its words.
+
+    Returns:
+        str or None: The MATCH expression, None when no term has a word in it.
+    """
+    phrases = []
+    for term in terms:
+        for alternative in str(term).split("|"):
+            words = re.findall(r"\w+", alternative.lower())
+            if words:
+                phrases.append('"' + " ".join(words) + '"*')
+    return " OR ".join(phrases) if phrases else None
+
+
+def _distinct_json(array):
+    """A json_group_array result without NULLs or "nan" placeholders, sorted."""
+    return sorted(value for value in json.loads(array) if value not in (None, "", "nan"))
+
+
+def search_restaurants(conn, entities, top_n):
+    """
+    SQL counterpart of the pandas filter + top_restaurants: items matching the
+    menu item and ingredient terms (FTS5), in the requested locations and
+    price / rating / review_count ranges, counted per restaurant. All values
+    are bound as parameters.
+
+    Returns:
+        list: Up to `top_n` restaurant records, most matching items first.
+    """
+    conditions, params = [], []
+    match_groups = []
+    for key in ("menu_item", "ingredient_name"):
+        if entities.get(key):
+            expression = fts_query(entities[key])
+            if expression is None:
+                return []
+            match_groups.append(f"({expression})")
+    if match_groups:
+        conditions.append("i.item_id IN (SELECT rowid FROM menu_items_fts WHERE menu_items_fts MATCH ?)")
+        params.append(" AND ".join(match_groups))
+
+    locations = [str(location).lower() for location in entities.get("location", [])]
+    if locations:
+        conditions.append(f"r.city IN ({', '.join('?' * len(locations))})")
+        params.extend(locations)
+
+    filters = parse_entity_filters(entities)
+    if filters.get("price"):
+        conditions.append(f"r.price IN ({', '.join('?' * len(filters['price']))})")
+        params.extend(sorted(filters["price"]))
+    for name in ("rating", "review_count"):
+        low, high = filters.get(name) or (None, None)
+        if low is not None:
+            conditions.append(f"r.{name} >= ?")
+            params.append(low)
+        if high is not None:
+            conditions.append(f"r.{name} <= ?")
+            params.append(high)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    matches = conn.execute(f"""
+        SELECT r.restaurant_id, r.restaurant_name, r.address1, r.city, r.zip_code, r.country, r.state,
+               r.rating, r.review_count, r.price, json_group_array(DISTINCT i.menu_item) AS matched_items,
+               json_group_array(DISTINCT i.menu_description) AS matched_descriptions,
+               json_group_array(DISTINCT f.ingredients) AS matched_ingredients
+        FROM menu_items i
+        JOIN menu_items_fts f ON f.rowid = i.item_id
+        JOIN menus m ON m.menu_id = i.menu_id
+        JOIN restaurants r ON r.restaurant_id = m.restaurant_id
+        {where}
+        GROUP BY r.restaurant_id
+        ORDER BY COUNT(*) DESC, r.rating DESC
+        LIMIT ?
+    """, params + [top_n]).fetchall()
+    if not matches:
+        return []
+
+    ids = [row[0] for row in matches]
+    placeholders = ", ".join("?" * len(ids))
+    menus = dict(conn.execute(f"""
+        SELECT m.restaurant_id, json_group_array(DISTINCT m.menu_category)
+        FROM menus m JOIN menu_items i ON i.menu_id = m.menu_id
+        WHERE m.restaurant_id IN ({placeholders})
+        GROUP BY m.restaurant_id
+    """, ids))
+    categories = dict(conn.execute(f"""
+        SELECT restaurant_id, json_group_array(DISTINCT category) FROM restaurant_categories
+        WHERE restaurant_id IN ({placeholders}) GROUP BY restaurant_id
+    """, ids))
+
+    records = []
+    for (restaurant_id, name, address1, city, zip_code, country, state, rating, review_count, price,
+         items, descriptions, ingredients) in matches:
+        records.append({
+            "restaurant_name": name,
+            "menu_category": sorted(json.loads(menus.get(restaurant_id, "[]"))),
+            "categories": sorted(json.loads(categories.get(restaurant_id, "[]"))),
+            "address1": address1, "city": city, "zip_code": zip_code, "country": country, "state": state,
+            "rating": rating, "review_count": review_count,
+            "price": [price] if price is not None else [],
+            "matched_items": _distinct_json(items),
+            "matched_descriptions": _distinct_json(descriptions),
+            "matched_ingredients": _distinct_json(ingredients),
+        })
+    return records
+
+
+def query_restaurants(entities, intent, top_n):
+    """
+    Returns:
+        list or None: search_restaurants records for ingredient_discovery, None for other intents.
+    """
+    if intent != "ingredient_discovery":
+        return None
+    return search_restaurants(get_resource("structured_db"), entities, top_n)
+
+
+if __name__ == "__main__":
+    # Build the database: python -m chatbot.sql_store
+    parser = argparse.ArgumentParser(description="Load structured_internal_data into SQLite with FTS5")
+    parser.add_argument("--data-dir", default=STRUCTURED_DATA_DIR, help="Folder with the internal_data_transform.py CSVs")
+    parser.add_argument("--output", default=STRUCTURED_DB_PATH, help="SQLite database to write")
+    parser.add_argument("--menu-data", default=MENU_DATA_PATH, help="Fallback source of the menu items")
+    args = parser.parse_args()
+    build_database(args.data_dir, args.output, args.menu_data)
@@ -6,7 +6,9 @@ class State(TypedDict):
     structured_results: list
     entities : dict
     faiss_results: list
+    rerank_info: dict
     google_results: list
     graph_results: list
     llm_made_graph_results: list
+    cypher_cache_info: dict
     response: str
@@ -1,59 +1,47 @@
 import pandas as pd
+import numpy as np
 import json
-from chatbot.config import llm
+from chatbot.config import STRUCTURED_TOP_N, STRUCTURED_BACKEND
 from chatbot.state import State
+from chatbot.resources import register, get_resource
+from chatbot.menu_data import normalize_text_columns, top_restaurants, ColumnFilterIndex
+from chatbot.entity_filters import parse_entity_filters
+import chatbot.analytics_cube  # noqa: F401 (registers the analytics_cube resource)
 from langchain.schema.runnable import RunnableLambda
 from langchain_core.prompts import ChatPromptTemplate
 
-# Load dataset
-df = pd.read_csv("cleaned_menu_data.csv")
+# Trigram index over every column of the shared, already normalized menu data
+@register("menu_token_index")
+def _load_menu_token_index():
+    from chatbot.token_index import TrigramIndex
 
-def aggregate_restaurant_data(df):
-    """
-    Aggregates restaurant data into a single row per restaurant.
-    Merges duplicate menu items while collecting ingredients and other relevant details.
+    return TrigramIndex(get_resource("menu_data"))
 
-    Returns:
-        pd.DataFrame: Aggregated DataFrame with one row per restaurant.
-    """
-    aggregation_rules = {
-        "menu_item": lambda x: list(set(x.dropna())),
-        "menu_description": lambda x: list(set(x.dropna())),
-        "menu_category": lambda x: list(set(x.dropna())),
-        "categories": lambda x: list(set(x.dropna())),
-        "ingredient_name": lambda x: list(set(x.dropna())),
-        "address1": "first",
-        "city": "first",
-        "zip_code": "first",
-        "country": "first",
-        "state": "first",
-        "rating": "mean",
-        "review_count": "sum",
-        "price": lambda x: list(set(x.dropna()))
-    }
-
-    return df.groupby("restaurant_name").agg(aggregation_rules).reset_index()
-
-
-def compute_price_comparison(df, category_1, category_2, city):
+
+def compute_price_comparison(cube, category_1, category_2, city):
     """
-    Compares the average price of two cuisines in a given city.
+    Compares the typical price tier of two cuisines in a given city, read from the analytics cube.
     
     Returns:
-        dict: Comparison of average prices.
+        dict: Comparison of typical prices ("N/A" when a cuisine has no restaurants there).
     """
-    filtered_df = df[df["city"].str.lower() == city.lower()]
-    category_prices = filtered_df.groupby("menu_category")["price"].apply(lambda x: x.astype(str).mode().values)
-    
-    return {
-        category_1: category_prices.get(category_1, "N/A"),
-        category_2: category_prices.get(category_2, "N/A")
-    }
+    comparison = {}
+    for category in (category_1, category_2):
+        term = category.lower().strip()
+        dimension = cube.resolve(term)
+        cell = cube.cell(city=city.lower().strip(), **{dimension: term}) if dimension else None
+        comparison[category] = cell["typical_price"] if cell and cell["typical_price"] else "N/A"
+    return comparison
 
 
-def filter_df(df, entities, intent):
+def filter_df(df, entities, intent, token_index=None, filter_index=None):
     """
     Filters the DataFrame based on extracted entities from the user query and intent.
+    Menu item / ingredient matches are looked up in `token_index` (built from
+    `df` when not given) instead of scanning every row with a regex. Price,
+    rating and review_count entities become range predicates answered by
+    `filter_index` (a ColumnFilterIndex over the same rows). The shared menu
+    data is normalized once at load, so requests never re-normalize it.
     
     Returns:
         pd.DataFrame or dict: A filtered DataFrame or comparative analytics data.
@@ -63,33 +51,38 @@ def filter_df(df, entities, intent):
     menu_item_values = entities.get("menu_item", [])
     ingredient_values = entities.get("ingredient_name", [])
     category_values = entities.get("menu_category", [])
-    price_values = entities.get("price", [])
-    rating_values = entities.get("rating", [])
-    review_values = entities.get("review_count", [])
 
-    df = df.apply(lambda x: x.astype(str).str.lower().str.strip() if x.dtype == "object" else x)
+    if token_index is None:
+        from chatbot.token_index import TrigramIndex
+
+        token_index = TrigramIndex(normalize_text_columns(df))
+    df = token_index.df
+    mask = np.ones(len(df), dtype=bool)
+
+    # Numeric predicates: "4.5+ stars", "under $$$", "over 500 reviews"
+    numeric_filters = parse_entity_filters(entities)
+    if filter_index is None and numeric_filters.keys() - {"location"}:
+        filter_index = ColumnFilterIndex(df)
+    if filter_index is not None:
+        numeric_mask = filter_index.mask(numeric_filters)
+        if numeric_mask is not None:
+            mask &= numeric_mask
 
     if location_values:
-        df = df[df["city"].str.lower().isin([loc.lower() for loc in location_values])]
+        mask &= df["city"].isin([loc.lower() for loc in location_values]).to_numpy()
 
     if intent == "ingredient_discovery":
-        # Ensure menu_item_values is not empty before filtering
         # Step 1: Filter based on menu_item_values (anywhere in the dataframe)
         if menu_item_values:
-            search_pattern = '|'.join(menu_item_values)  # Create regex pattern for OR search
-            df = df[
-                df.apply(lambda row: row.astype(str).str.contains(search_pattern, case=False, na=False).any(), axis=1)
-            ]
+            search_pattern = '|'.join(menu_item_values)  # Regex pattern for OR search
+            mask &= token_index.match(search_pattern)
 
-        # Step 2: Filter the already filtered df based on ingredient_values (anywhere in the dataframe)
+        # Step 2: Filter the already filtered rows based on ingredient_values (anywhere in the dataframe)
         if ingredient_values:
-            search_pattern = '|'.join(ingredient_values)  # Create regex pattern
-            df = df[
-                df.apply(lambda row: row.astype(str).str.contains(search_pattern, case=False, na=False).any(), axis=1)
-            ]
+            search_pattern = '|'.join(ingredient_values)  # Regex pattern
+            mask &= token_index.match(search_pattern)
 
-
-        return df
+        return df[mask]
     else:
         return None
 
@@ -109,8 +102,20 @@ def query_database(state: State) -> State:
         state["structured_results"] = None
         return state
 
+    if intent == "comparative_analysis":
+        # Answered from the precomputed city x cuisine cube, whatever the backend
+        state["structured_results"] = get_resource("analytics_cube").compare(entities) or None
+        return state
+
+    if STRUCTURED_BACKEND == "sqlite":
+        from chatbot.sql_store import query_restaurants
+
+        state["structured_results"] = query_restaurants(entities, intent, STRUCTURED_TOP_N) or None
+        return state
+
     # Apply optimized filtering based on intent
-    filtered_df = filter_df(df, entities, intent)
+    filtered_df = filter_df(get_resource("menu_data"), entities, intent, token_index=get_resource("menu_token_index"),
+                            filter_index=get_resource("menu_filter_index"))
 
     if filtered_df is None or filtered_df.empty:
         print("WARNING: No matching results after filtering. Skipping aggregation.")
@@ -126,8 +131,9 @@ def query_database(state: State) -> State:
             state["structured_results"] = None
             return state  # ✅ Prevents KeyError
 
-        grouped_df = aggregate_restaurant_data(filtered_df)
-        state["structured_results"] = grouped_df.to_dict(orient="records") if not grouped_df.empty else None
+        # Slice the precomputed per-restaurant summaries of the best matching restaurants
+        records = top_restaurants(filtered_df, get_resource("restaurant_summary"), STRUCTURED_TOP_N)
+        state["structured_results"] = records or None
     else:
         state["structured_results"] = None  
 
@@ -1,19 +1,30 @@
 import json
-from chatbot.config import llm, slm  # Use smaller LLM for query validation
+from chatbot.config import GRAPH_BACKEND, MATERIALIZED_TRENDS, SUBCATEGORY_ROUTER
 from chatbot.state import State
-from py2neo import Graph
+from chatbot.resources import register, get_resource
+from chatbot.trending_aggregates import TEMPLATES as TRENDING_TEMPLATES
+import chatbot.subcategory_router  # noqa: F401 (registers the subcategory_router resource)
 from langchain.schema.runnable import RunnableLambda
 from langchain_core.prompts import ChatPromptTemplate
 
-# **🔗 Connect to Neo4j Database**
-graph = Graph("neo4j+s://fdd1303c.databases.neo4j.io", auth=("neo4j", "1f8bgEco73so8nVug9mfFTlEjNfatT8cnOE_Ee8hDKc"))
+# **🔗 Connect to Neo4j Database** (on first query), or the in-process graph
+@register("structured_graph")
+def _connect_graph():
+    if GRAPH_BACKEND == "memory":
+        import chatbot.memory_graph  # noqa: F401 (registers the memory_graph resource)
+
+        return get_resource("memory_graph")
+
+    from py2neo import Graph
+
+    return Graph("neo4j+s://fdd1303c.databases.neo4j.io", auth=("neo4j", "1f8bgEco73so8nVug9mfFTlEjNfatT8cnOE_Ee8hDKc"))
 
 QUERY_DICTIONARY = {
     "ingredient_discovery": {
         # 🌍 Find restaurants serving a specific cuisine in given cities
         "restaurant_search_based_on_cuisine_in_cities": """
             MATCH (r:Restaurant)-[:SERVES]->(m:MenuCategory)
-            WHERE toLower(m.name) IN {menu_categories} AND toLower(r.city) IN {locations}
+            WHERE toLower(m.name) IN $menu_categories AND toLower(r.city) IN $locations
             RETURN r.name AS restaurant, r.city AS city, collect(m.name) AS cuisine 
             ORDER BY r.rating DESC
             LIMIT 15
@@ -23,10 +34,10 @@ QUERY_DICTIONARY = {
         "restaurant_search_based_on_ingredient": """
             MATCH (r:Restaurant)-[:SERVES]->(m:MenuCategory)-[:HAS_ITEM]->(mi:MenuItem)
             OPTIONAL MATCH (mi)-[:CONTAINS]->(i:Ingredient)
-            WHERE apoc.text.containsAll(toLower(mi.name), {menu_items}) 
-                  OR apoc.text.containsAll(toLower(i.name), {ingredients})
-                  OR apoc.text.containsAll(toLower(m.name), {menu_categories})
-                  OR apoc.text.containsAll(toLower(mi.description), {ingredients})
+            WHERE apoc.text.containsAll(toLower(mi.name), $menu_items) 
+                  OR apoc.text.containsAll(toLower(i.name), $ingredients)
+                  OR apoc.text.containsAll(toLower(m.name), $menu_categories)
+                  OR apoc.text.containsAll(toLower(mi.description), $ingredients)
             RETURN r.name AS restaurant, collect(DISTINCT mi.name) AS matched_items
             ORDER BY r.rating DESC
             LIMIT 15
@@ -35,7 +46,7 @@ QUERY_DICTIONARY = {
         # 📍 Find dishes available in a city
         "dish_search_in_city": """
             MATCH (r:Restaurant)-[:SERVES]->(m:MenuCategory)-[:HAS_ITEM]->(mi:MenuItem)
-            WHERE toLower(mi.name) IN {menu_items} AND toLower(r.city) IN {locations}
+            WHERE toLower(mi.name) IN $menu_items AND toLower(r.city) IN $locations
             RETURN r.name AS restaurant, collect(mi.name) AS dishes 
             ORDER BY r.rating DESC
             LIMIT 15
@@ -46,7 +57,7 @@ QUERY_DICTIONARY = {
         # 📈 Find how often an ingredient is used in dishes
         "ingredient_use": """
             MATCH (i:Ingredient)<-[:CONTAINS]-(mi:MenuItem)
-            WHERE toLower(i.name) IN {ingredients}
+            WHERE toLower(i.name) IN $ingredients
             RETURN i.name AS ingredient, COUNT(mi) AS mentions
             ORDER BY mentions DESC
             LIMIT 15
@@ -83,7 +94,7 @@ QUERY_DICTIONARY = {
         # 💰 Compare menu prices for a cuisine across different locations
         "price_comparison": """
             MATCH (r:Restaurant)-[:SERVES]->(m:MenuCategory)-[:HAS_ITEM]->(mi:MenuItem)
-            WHERE toLower(m.name) IN {menu_categories} AND toLower(r.city) IN {locations}
+            WHERE toLower(m.name) IN $menu_categories AND toLower(r.city) IN $locations
             RETURN m.name AS cuisine, r.city AS city, 
                    ROUND(AVG(mi.price), 2) AS avg_price
             ORDER BY avg_price DESC
@@ -93,7 +104,7 @@ QUERY_DICTIONARY = {
         # 📍 Compare the popularity of two cuisines across cities
         "cuisine_popularity_comparison": """
             MATCH (r:Restaurant)-[:SERVES]->(m:MenuCategory)
-            WHERE toLower(m.name) IN {menu_categories} AND toLower(r.city) IN {locations}
+            WHERE toLower(m.name) IN $menu_categories AND toLower(r.city) IN $locations
             RETURN m.name AS cuisine, r.city AS city, COUNT(r) AS restaurant_count
             ORDER BY restaurant_count DESC
             LIMIT 10
@@ -104,7 +115,7 @@ QUERY_DICTIONARY = {
         # 🌟 Find top-rated restaurants in a city
         "top_rated_restaurants": """
             MATCH (r:Restaurant)
-            WHERE toLower(r.city) IN {locations}
+            WHERE toLower(r.city) IN $locations
             RETURN r.name AS restaurant, r.rating AS rating
             ORDER BY rating DESC
             LIMIT 10
@@ -113,7 +124,7 @@ QUERY_DICTIONARY = {
         # 🏆 Find the most reviewed restaurants
         "most_reviewed_restaurants": """
             MATCH (r:Restaurant)
-            WHERE toLower(r.city) IN {locations}
+            WHERE toLower(r.city) IN $locations
             RETURN r.name AS restaurant, r.review_count AS reviews
             ORDER BY reviews DESC
             LIMIT 10
@@ -123,6 +134,28 @@ QUERY_DICTIONARY = {
 
 
 def select_subcategory(intent, user_query):
+    """
+    Picks the subcategory of the intent with the local example router, and
+    asks the SLM when the router is not confident or cannot run (e.g. the
+    embedding model failed to load).
+
+    Returns:
+        str: The subcategory name.
+    """
+    if SUBCATEGORY_ROUTER:
+        try:
+            subcategory, info = get_resource("subcategory_router").route(intent, user_query)
+        except Exception as e:
+            print(f"⚠️ Subcategory router failed ({e!r}), asking the SLM")
+            subcategory, info = None, None
+        if info:
+            print(f"🔹 Subcategory router: {info}")
+        if subcategory:
+            return subcategory
+    return select_subcategory_slm(intent, user_query)
+
+
+def select_subcategory_slm(intent, user_query):
     """
     Uses SLM to determine the best subcategory for the intent.
     """
@@ -143,13 +176,35 @@ def select_subcategory(intent, user_query):
     "restaurant_search_based_on_ingredient"
     """
 
-    response = slm.invoke(subcategory_prompt).content.strip()
-    cleaned_response = response.replace('"', '').replace("'", "").strip()
-    return response
+    response = get_resource("slm").invoke(subcategory_prompt).content.strip()
+    cleaned_response = response.replace('"', '').replace("'", "").replace("`", "").strip().lower()
+    # Small models wrap the name in prose or punctuation: keep the subcategory it mentions
+    for subcategory in QUERY_DICTIONARY.get(intent, {}):
+        if subcategory in cleaned_response:
+            return subcategory
+    return cleaned_response
+
+
+def query_parameters(extracted_entities):
+    """Lower-cased entity lists for the $parameters of the templates (compared against toLower(...))."""
+    def values(key):
+        return [str(value).lower().strip() for value in extracted_entities.get(key) or []]
+
+    return {
+        "locations": values("location"),
+        "menu_items": values("menu_item"),
+        "ingredients": values("ingredient_name"),
+        "menu_categories": values("menu_category"),
+    }
 
 
 def construct_query(intent, subcategory, extracted_entities):
-    """Constructs the correct Cypher query based on intent and extracted entities."""
+    """
+    Selects the Cypher template for the intent / subcategory and its parameters.
+
+    Returns:
+        tuple: (query, parameters), or (None, None) when no template matches.
+    """
     
     # Normalize subcategory key
     subcategory = subcategory.replace('"', '').replace("'", "").strip().lower()
@@ -164,19 +219,13 @@ def construct_query(intent, subcategory, extracted_entities):
     # Debug: Check if query template was found
     if query_template is None:
         print(f"\n❌ ERROR: No query template found for subcategory '{subcategory}' under intent '{intent}'.")
-        return None
+        return None, None
     else:
         print("\n✅ Selected Query Template:", query_template)
 
-    # Inject extracted entities into the query
-    query = query_template.format(
-        locations=json.dumps(extracted_entities.get("location", [])),
-        menu_items=json.dumps(extracted_entities.get("menu_item", [])),
-        ingredients=json.dumps(extracted_entities.get("ingredient_name", [])),
-        menu_categories=json.dumps(extracted_entities.get("menu_category", []))
-    )
-
-    return query
+    # Entities are sent as query parameters: the query text stays the same for
+    # every request, so Neo4j plans each template once and reuses the plan
+    return query_template, query_parameters(extracted_entities)
 
 
 def verify_query_with_slm(intent, query_options):
@@ -202,7 +251,7 @@ def verify_query_with_slm(intent, query_options):
     - If a query needs modification, return the modified query.
     """
 
-    response = slm.invoke(query_verification_prompt).content.strip()
+    response = get_resource("slm").invoke(query_verification_prompt).content.strip()
     return response
 
 def query_knowledge_graph(state: State) -> State:
@@ -229,16 +278,22 @@ def query_knowledge_graph(state: State) -> State:
     
 
     # Step 3: Construct the Correct Cypher Query
-    cypher_query = construct_query(intent, selected_subcategory, entities)
+    cypher_query, parameters = construct_query(intent, selected_subcategory, entities)
     print("\n🔍 Generated Cypher Query:")
     print(cypher_query)
+    print("🔍 Parameters:", parameters)
 
     if not cypher_query:
         state["graph_results"] = []
         return state
 
-    # Step 4: Execute the Query in Neo4j
-    results = graph.run(cypher_query).data()
+    # Step 4: Execute the Query in Neo4j, or read the counts the trending templates
+    # would compute from the materialized aggregates
+    subcategory = selected_subcategory.replace('"', '').replace("'", "").strip().lower()
+    if MATERIALIZED_TRENDS and subcategory in TRENDING_TEMPLATES:
+        results = get_resource("trending_aggregates").run(subcategory, parameters)
+    else:
+        results = get_resource("structured_graph").run(cypher_query, parameters).data()
 
     # Step 5: Store Results in State
     state["graph_results"] = results
@@ -0,0 +1,181 @@
+import time
+import threading
+import numpy as np
+from chatbot.config import ROUTER_MIN_SIMILARITY, ROUTER_MIN_MARGIN
+from chatbot.resources import register, get_resource
+
+# Labeled questions per QUERY_DICTIONARY subcategory; the router picks the subcategory of the nearest ones
+SUBCATEGORY_EXAMPLES = {
+    "ingredient_discovery": {
+        "restaurant_search_based_on_cuisine_in_cities": [
+            "Which restaurants serve Mexican food in San Francisco?",
+            "Find Italian restaurants in New York and Chicago",
+            "Where can I get Thai cuisine in Austin?",
+            "List Japanese places in Los Angeles",
+            "Are there any Indian restaurants in Seattle?",
+            "Show me Mediterranean restaurants in Boston",
+        ],
+        "restaurant_search_based_on_ingredient": [
+            "Which restaurants have dishes with truffle?",
+            "Where can I find dishes made with Impossible Meat?",
+            "Restaurants that use saffron in their food",
+            "Find places serving something with goat cheese",
+            "Which menus have items containing tofu?",
+            "Where do they cook with miso?",
+        ],
+        "dish_search_in_city": [
+            "Where can I get ramen in San Francisco?",
+            "Which restaurants in Chicago serve deep dish pizza?",
+            "Find tacos al pastor in Los Angeles",
+            "Who sells the best burritos in the Mission?",
+            "Places in New York that have bagels",
+            "Is there pho in Austin?",
+        ],
+    },
+    "menu_innovation": {
+        "ingredient_use": [
+            "How often is avocado used in dishes?",
+            "How many menu items contain kimchi?",
+            "How common is truffle oil on menus?",
+            "Count the dishes that use oat milk",
+            "How frequently does yuzu appear in recipes?",
+            "In how many dishes is tahini an ingredient?",
+        ],
+        "trending_ingredients": [
+            "What ingredients are trending right now?",
+            "Which ingredients are becoming popular on menus?",
+            "What are the hottest new ingredients chefs use?",
+            "Show me emerging ingredients across restaurants",
+            "Which ingredients should I add to a new menu?",
+            "What are the most used ingredients these days?",
+        ],
+    },
+    "trending_insights": {
+        "popular_dishes": [
+            "What are the most popular dishes?",
+            "Which dishes appear on the most menus?",
+            "What food is everyone ordering lately?",
+            "Top trending dishes right now",
+            "Which menu items are the most common?",
+            "What are the best selling plates across restaurants?",
+        ],
+        "ingredient_trends": [
+            "What are the trends in ingredient usage?",
+            "How is ingredient usage changing across menus?",
+            "Which ingredients are mentioned most often?",
+            "Give me a summary of ingredient trends",
+            "What ingredients dominate menus today?",
+            "Show ingredient popularity trends",
+        ],
+        "price_comparison": [
+            "Compare menu prices of Mexican food across cities",
+            "Is sushi more expensive in New York than in San Francisco?",
+            "What is the average price of Italian dishes in Chicago versus Boston?",
+            "How much do Thai dishes cost in different cities?",
+            "Where is pizza cheapest?",
+            "Compare the average menu price of vegan restaurants in two cities",
+        ],
+        "cuisine_popularity_comparison": [
+            "Is Mexican or Italian food more popular in San Francisco?",
+            "Compare the number of Thai and Vietnamese restaurants in Austin",
+            "Which cuisine has more restaurants in New York, Chinese or Korean?",
+            "How popular is Indian food in Chicago compared to Seattle?",
+            "Are there more sushi places or taco places in Los Angeles?",
+            "Compare the popularity of two cuisines across cities",
+        ],
+    },
+    "reviews_analysis": {
+        "top_rated_restaurants": [
+            "What are the top rated restaurants in San Francisco?",
+            "Best reviewed places to eat in Chicago",
+            "Which restaurants in Austin have the highest ratings?",
+            "Show me five star restaurants in New York",
+            "Highest rated spots in Los Angeles",
+            "Which places in Boston have the best scores?",
+        ],
+        "most_reviewed_restaurants": [
+            "Which restaurants in San Francisco have the most reviews?",
+            "Most reviewed places in Chicago",
+            "What are the most talked about restaurants in New York?",
+            "Which spots in Austin get the most reviews?",
+            "Restaurants with the largest number of reviews in Seattle",
+            "Where do people leave the most reviews in Los Angeles?",
+        ],
+    },
+}
+
+
+class SubcategoryRouter:
+    """
+    Nearest-example classifier over SUBCATEGORY_EXAMPLES. Each subcategory
+    scores the cosine similarity of its closest example to the query; the
+    best one is accepted when it reaches ROUTER_MIN_SIMILARITY and beats the
+    runner-up by ROUTER_MIN_MARGIN. Example vectors are embedded once.
+    """
+
+    def __init__(self, embed_query, embed_documents, examples=SUBCATEGORY_EXAMPLES,
+                 min_similarity=ROUTER_MIN_SIMILARITY, min_margin=ROUTER_MIN_MARGIN):
+        self.embed_query = embed_query
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.routes = {}
+        for intent, subcategories in examples.items():
+            labels = [name for name, questions in subcategories.items() for _ in questions]
+            texts = [question for questions in subcategories.values() for question in questions]
+            self.routes[intent] = (np.array(labels), self._normalize(np.asarray(embed_documents(texts), dtype=np.float32)))
+        self._lock = threading.Lock()
+        self.routed = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def _normalize(vectors):
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def scores(self, intent, query):
+        """
+        Returns:
+            list: (subcategory, similarity of its closest example) pairs, best first; empty for unknown intents.
+        """
+        if intent not in self.routes:
+            return []
+        labels, vectors = self.routes[intent]
+        similarities = vectors @ self._normalize(np.asarray(self.embed_query(query), dtype=np.float32))
+        best = {}
+        for label, similarity in zip(labels, similarities):
+            best[label] = max(best.get(label, -1.0), float(similarity))
+        return sorted(best.items(), key=lambda item: -item[1])
+
+    def route(self, intent, query):
+        """
+        Returns:
+            tuple: (subcategory or None when not confident, info dict with score, margin and latency).
+        """
+        start = time.perf_counter()
+        ranked = self.scores(intent, query)
+        score = ranked[0][1] if ranked else 0.0
+        margin = score - ranked[1][1] if len(ranked) > 1 else score
+        confident = bool(ranked) and score >= self.min_similarity and margin >= self.min_margin
+        with self._lock:
+            if confident:
+                self.routed += 1
+            else:
+                self.fallbacks += 1
+        info = {"subcategory": ranked[0][0] if ranked else None, "score": round(score, 3),
+                "margin": round(margin, 3), "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+        return (ranked[0][0] if confident else None), info
+
+    def stats(self):
+        total = self.routed + self.fallbacks
+        return {"routed": self.routed, "fallbacks": self.fallbacks, "routed_share": self.routed / total if total else 0.0}
+
+
+# Query vectors come from the FAISS search's embedding cache, so a question embedded for one is free for the other
+@register("subcategory_router")
+def _load_subcategory_router():
+    import chatbot.faiss_search  # noqa: F401 (registers the embedding resources)
+
+    return SubcategoryRouter(
+        lambda text: get_resource("query_embedding_cache").embed(text),
+        lambda texts: get_resource("query_embedding_cache").embed_many(texts),
+    )
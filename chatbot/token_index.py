@@ -0,0 +1,87 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Any of these makes a pattern a real regex; only plain "a|b|c" alternatives are pruned by trigrams
+REGEX_METACHARACTERS = set(".^$*+?{}[]\\()")
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    Inverted index from character trigrams to the distinct cell values of a DataFrame.
+
+    `match(pattern)` returns the same rows as
+    `df.apply(lambda row: row.astype(str).str.contains(pattern, case=False, na=False).any(), axis=1)`.
+    Trigram postings narrow each literal alternative down to a few candidate values.
+    Only those candidates are checked with the regex, and each matching value maps
+    back to its rows through the column's category codes.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.num_rows = len(df)
+        self.columns = []      # (name, int codes per row, distinct string values)
+        self.offsets = []      # Global id of each column's first distinct value
+        postings = {}
+
+        offset = 0
+        for name in df.columns:
+            column = df[name]
+            if isinstance(column.dtype, pd.CategoricalDtype):  # Reuse the existing codes
+                codes, values = column.cat.codes.to_numpy(), column.cat.categories.astype(str)
+            else:
+                codes, values = column.astype(str).factorize()
+            values = list(values)
+            self.columns.append((name, np.asarray(codes), values))
+            self.offsets.append(offset)
+            for local_id, value in enumerate(values):
+                for gram in trigrams(value.casefold()):
+                    postings.setdefault(gram, []).append(offset + local_id)
+            offset += len(values)
+
+        self.num_values = offset
+        self.postings = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+
+    def _candidates(self, pattern):
+        """Global value ids that may match `pattern`, or None when trigrams cannot prune it."""
+        if REGEX_METACHARACTERS & set(pattern):
+            return None
+
+        candidates = []
+        for literal in pattern.casefold().split("|"):
+            if len(literal) < 3 or not literal.isascii():
+                return None
+            ids = None
+            for gram in trigrams(literal):
+                posting = self.postings.get(gram)
+                if posting is None:
+                    ids = np.empty(0, dtype=np.int64)
+                    break
+                ids = posting if ids is None else np.intersect1d(ids, posting, assume_unique=True)
+            candidates.append(ids)
+        return np.unique(np.concatenate(candidates)) if candidates else np.empty(0, dtype=np.int64)
+
+    def match(self, pattern):
+        """
+        Returns:
+            np.ndarray: Boolean mask of the rows where any column contains `pattern` (regex, case-insensitive).
+        """
+        regex = re.compile(pattern, flags=re.IGNORECASE)
+        candidates = self._candidates(pattern)
+
+        mask = np.zeros(self.num_rows, dtype=bool)
+        for (_, codes, values), offset in zip(self.columns, self.offsets):
+            if candidates is None:
+                local_ids = range(len(values))
+            else:
+                local_ids = candidates[(candidates >= offset) & (candidates < offset + len(values))] - offset
+            matched = np.zeros(len(values) + 1, dtype=bool)  # Extra slot for code -1, never matched
+            for local_id in local_ids:
+                if regex.search(values[local_id]):
+                    matched[local_id] = True
+            mask |= matched[codes]
+        return mask
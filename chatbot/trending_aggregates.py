@@ -0,0 +1,237 @@
+import os
+import re
+import json
+import itertools
+from collections import Counter
+import pandas as pd
+from chatbot.config import TRENDING_AGGREGATES_PATH
+from chatbot.resources import register, get_resource
+import chatbot.menu_data  # noqa: F401 (registers the menu_data resource)
+
+ALL = "*"  # Scope value of the totals over every city / category
+AGGREGATES_VERSION = 1
+GROUP_COLUMNS = ["restaurant_name", "menu_category", "menu_item", "ingredient_name", "categories", "city"]
+
+# QUERY_DICTIONARY templates answered from the aggregates: (kind, name key, count key, limit)
+TEMPLATES = {
+    "trending_ingredients": ("ingredients", "ingredient", "usage_count", 15),
+    "ingredient_trends": ("ingredients", "ingredient", "mentions", 15),
+    "ingredient_use": ("ingredients", "ingredient", "mentions", 15),
+    "popular_dishes": ("dishes", "dish", "appearances", 15),
+}
+
+# Questions the counts cannot answer (prices, comparisons) go to the graph
+_DISH_WORDS = re.compile(r"\b(dish|dishes|food|foods|item|items|meal|meals|menu)\b")
+_INGREDIENT_WORDS = re.compile(r"\bingredients?\b")
+_OTHER_WORDS = re.compile(r"\b(price|prices|cost|cheap\w*|expensive|compare\w*|vs|versus|rating|rated|reviews?)\b")
+# Only a question about how much an ingredient is used gets its ingredient_use counts
+_USAGE_WORDS = re.compile(r"\b(how (often|many|common|frequently|popular)|count|number of|usage)\b")
+# Restaurant searches and dietary qualifiers are not in the counts either
+_SEARCH_WORDS = re.compile(r"\b(restaurants?|places?|where|serves?|serving)\b")
+_DIET_WORDS = re.compile(r"\b(vegan|vegetarian|gluten[- ]free|dairy[- ]free|halal|kosher|keto|healthy|spicy)\b")
+
+
+def match_template(question, parameters):
+    """
+    Picks the TEMPLATES subcategory a trending / menu innovation question asks
+    for, from its wording and extracted entities. Questions about specific
+    dishes, restaurants or diets are not answered by the counts.
+
+    Returns:
+        str or None: The subcategory, None when the question needs the graph.
+    """
+    question = question.lower()
+    if parameters.get("menu_items"):
+        return None  # "Which taco dishes are most popular?" asks about tacos, not the top dishes
+    if _OTHER_WORDS.search(question) or _SEARCH_WORDS.search(question) or _DIET_WORDS.search(question):
+        return None
+    if parameters.get("ingredients"):
+        # "Which dishes use saffron?" is a search, not a count: leave it to the LLM
+        return "ingredient_use" if _USAGE_WORDS.search(question) else None
+    if _INGREDIENT_WORDS.search(question):
+        return "ingredient_trends"
+    if _DISH_WORDS.search(question):
+        return "popular_dishes"
+    return None
+
+
+def _normalized(df):
+    """The columns the aggregates read, lower-cased and stripped like the menu data."""
+    return pd.DataFrame({column: df[column].astype(str).str.lower().str.strip() for column in GROUP_COLUMNS})
+
+
+def group_hashes(df):
+    """
+    Content hash of every restaurant-category group, from the per-row hashes
+    of the normalized columns (so row order within a group does not matter).
+
+    Returns:
+        dict: Group key -> hash string.
+    """
+    rows = _normalized(df)
+    row_hashes = pd.util.hash_pandas_object(rows.drop(columns=["restaurant_name", "menu_category"]), index=False)
+    sums = row_hashes.groupby([rows["restaurant_name"], rows["menu_category"]]).sum()
+    return {f"{restaurant}\x1f{category}": format(int(value), "x") for (restaurant, category), value in sums.items()}
+
+
+def group_entry(rows, digest):
+    """Counts contributed by one restaurant-category group (normalized rows)."""
+    first = rows.iloc[0]
+    ingredients = Counter()
+    for value in rows["ingredient_name"]:
+        # Each item counts once per ingredient, like the CONTAINS edges
+        ingredients.update({name.strip() for name in value.split(",")} - {"", "nan"})
+    categories = {category.strip() for category in first["categories"].split("|")} | {first["menu_category"]}
+    return {
+        "hash": digest,
+        "city": first["city"],
+        "categories": sorted(categories - {"", "nan"}),
+        "ingredients": dict(ingredients),
+        "dishes": dict(Counter(rows["menu_item"])),
+    }
+
+
+class TrendingAggregates:
+    """
+    Materialized ingredient usage and dish appearance counts, overall and per
+    city, restaurant / menu category and city x category. Each restaurant-category
+    group's contribution is kept with its content hash, so `refresh()` only
+    recounts the groups that were added, changed or removed.
+    """
+
+    def __init__(self, groups=None):
+        self.groups = {}
+        self.counts = {"ingredients": {}, "dishes": {}}
+        self._ranked = {}
+        for key, entry in (groups or {}).items():
+            self._apply(key, entry, 1)
+
+    @staticmethod
+    def _scopes(entry):
+        return itertools.product((entry["city"], ALL), entry["categories"] + [ALL])
+
+    def _apply(self, key, entry, sign):
+        for scope in self._scopes(entry):
+            for kind in ("ingredients", "dishes"):
+                counter = self.counts[kind].setdefault(scope, Counter())
+                for name, count in entry[kind].items():
+                    counter[name] += sign * count
+                    if counter[name] <= 0:
+                        del counter[name]
+                self._ranked.pop((kind, scope), None)
+        if sign > 0:
+            self.groups[key] = entry
+        else:
+            del self.groups[key]
+
+    def refresh(self, df):
+        """
+        Brings the aggregates up to date with the menu rows in `df`.
+
+        Returns:
+            tuple: (added, changed, removed) group counts.
+        """
+        hashes = group_hashes(df)
+        removed = [key for key in self.groups if key not in hashes]
+        changed = [key for key, digest in hashes.items() if key in self.groups and self.groups[key]["hash"] != digest]
+        added = [key for key in hashes if key not in self.groups]
+
+        for key in removed + changed:
+            self._apply(key, self.groups[key], -1)
+        stale = set(changed + added)
+        if stale:
+            rows = _normalized(df)
+            keys = rows["restaurant_name"] + "\x1f" + rows["menu_category"]
+            rows = rows[keys.isin(stale)]
+            for (restaurant, category), group in rows.groupby(["restaurant_name", "menu_category"]):
+                key = f"{restaurant}\x1f{category}"
+                self._apply(key, group_entry(group, hashes[key]), 1)
+        return len(added), len(changed), len(removed)
+
+    def top(self, kind, city=ALL, category=ALL):
+        """
+        Returns:
+            list: (name, count) pairs of the scope, largest count first.
+        """
+        key = (kind, (city, category))
+        if key not in self._ranked:
+            self._ranked[key] = self.counts[kind].get((city, category), Counter()).most_common()
+        return self._ranked[key]
+
+    def _scopes_for(self, parameters):
+        """(city, category) scopes named by the query parameters, none when all of them are unknown."""
+        known = self.counts["dishes"]
+        cities = [city for city in parameters.get("locations") or [] if (city, ALL) in known]
+        if parameters.get("locations") and not cities:
+            return []  # Only cities outside the dataset were asked for
+        categories = [category for category in parameters.get("menu_categories") or [] if (ALL, category) in known]
+        if parameters.get("menu_categories") and not categories:
+            return []  # Only categories outside the dataset were asked for
+        return list(itertools.product(dict.fromkeys(cities or [ALL]), dict.fromkeys(categories or [ALL])))
+
+    def run(self, subcategory, parameters=None):
+        """
+        Answers a TEMPLATES subcategory with the records its Cypher template
+        returns, restricted to the requested cities / categories if any
+        (each scope then gets its own top list, tagged with `city` / `category`).
+
+        Returns:
+            list: The records.
+        """
+        kind, name_key, count_key, limit = TEMPLATES[subcategory]
+        parameters = parameters or {}
+        wanted = set(parameters.get("ingredients") or []) if subcategory == "ingredient_use" else None
+
+        records = []
+        for city, category in self._scopes_for(parameters):
+            scope = {key: value for key, value in (("city", city), ("category", category)) if value != ALL}
+            if wanted is None:
+                ranked = self.top(kind, city, category)
+            else:
+                counts = self.counts[kind].get((city, category), Counter())
+                ranked = sorted(((name, counts[name]) for name in wanted if name in counts), key=lambda pair: -pair[1])
+            records.extend({name_key: name, count_key: count, **scope} for name, count in ranked[:limit])
+        return records
+
+    def save(self, path=TRENDING_AGGREGATES_PATH):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": AGGREGATES_VERSION, "groups": self.groups}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=TRENDING_AGGREGATES_PATH):
+        """
+        Returns:
+            TrendingAggregates: The materialized aggregates, empty when the file is missing or outdated.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        return cls(stored["groups"] if stored.get("version") == AGGREGATES_VERSION else None)
+
+
+def refresh_aggregates(df, path=TRENDING_AGGREGATES_PATH):
+    """
+    Loads the materialized aggregates, recounts the groups of `df` that
+    changed since they were written and saves them again if anything did.
+
+    Returns:
+        TrendingAggregates: The up-to-date aggregates.
+    """
+    aggregates = TrendingAggregates.load(path)
+    added, changed, removed = aggregates.refresh(df)
+    if added or changed or removed:
+        print(f"🔹 Trending aggregates: {added} new, {changed} changed, {removed} removed groups")
+        try:
+            aggregates.save(path)
+        except OSError as e:
+            print(f"⚠️ Could not write {path}: {e}")
+    return aggregates
+
+
+@register("trending_aggregates")
+def _load_trending_aggregates():
+    return refresh_aggregates(get_resource("menu_data"))
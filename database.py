@@ -66,77 +66,442 @@
 
 
 import os
+import json
+import time
+import hashlib
+import sys
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
 import pandas as pd
-import faiss
 import numpy as np
-from langchain_core.documents import Document
-import pickle
-from langchain.embeddings import HuggingFaceEmbeddings
 from tqdm import tqdm
+from chatbot.config import (
+    EMBEDDING_BACKEND, FAISS_INDEX_PATH, FAISS_METADATA_PATH, FAISS_MANIFEST_PATH, FAISS_VECTORS_PATH,
+    FAISS_ITEM_INDEX_PATH, FAISS_ITEM_PARENTS_PATH, FAISS_ITEM_VECTORS_PATH, FAISS_ITEM_MANIFEST_PATH
+)
+from chatbot.embeddings import embedding_fingerprint, make_embedding_model
+from chatbot.metadata_store import write_store
+from chatbot.csv_snapshot import load_csv
+from chatbot.trending_aggregates import refresh_aggregates
+from chatbot.faiss_index import INDEX_TYPES, atomic_write, build_index, load_index, load_index_settings, save_index
 
-# Load cleaned restaurant dataset
+# Cleaned restaurant dataset
 data_path = "cleaned_menu_data.csv"
-df = pd.read_csv(data_path)
 
-# Load HuggingFace embedding model
-embedding_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-mpnet-base-v2")
 
-def generate_embedding(text):
-    """Generate embeddings using HuggingFaceEmbeddings"""
-    return embedding_model.embed_query(text)
+def build_structured_text(row):
+    """Creates the structured text embedded for one restaurant-category group."""
+    structured_text = f"Restaurant: {row['restaurant_name']}\nMenu Category: {row['menu_category']}\nItems:\n"
 
-# Group by restaurant and menu_category
-grouped_data = df.groupby(['restaurant_name', 'menu_category']).agg(list).reset_index()
-
-documents = []
-embeddings = []
-metadata_list = []
-
-# Generate structured embeddings for each restaurant-category
-for _, row in tqdm(grouped_data.iterrows(), total=len(grouped_data), desc="Processing Categories"):
-
-    restaurant = row['restaurant_name']
-    category = row['menu_category']
-    
-    # Create structured format for embedding
-    structured_text = f"Restaurant: {restaurant}\nMenu Category: {category}\nItems:\n"
-    
     for item, desc, ingredients in zip(row['menu_item'], row['menu_description'], row['ingredient_name']):
         structured_text += f"  - {item}\n    - Description: {desc}\n    - Ingredients: {ingredients}\n"
 
-    # Generate embedding
-    embedding_vector = generate_embedding(structured_text)
+    return structured_text
+
 
-    # Metadata
-    metadata = {
-        "restaurant_name": restaurant,
-        "menu_category": category,
+def build_metadata(row):
+    """Creates the metadata stored alongside the embedding of one restaurant-category group."""
+    return {
+        "restaurant_name": row['restaurant_name'],
+        "menu_category": row['menu_category'],
         "menu_items": row["menu_item"],
         "menu_descriptions": row["menu_description"],
         "ingredients": row["ingredient_name"],
         "categories": row["categories"][0],  # Take the first as representative
         "address": f"{row['address1'][0]}, {row['city'][0]}, {row['state'][0]}, {row['country'][0]} - {row['zip_code'][0]}",
+        "city": row["city"][0],  # Kept separately for metadata-filtered search
+        "state": row["state"][0],
         "rating": row["rating"][0],
         "review_count": row["review_count"][0],
         "price": row["price"][0]
     }
-    
-    doc = Document(page_content=structured_text, metadata=metadata)
-    documents.append(doc)
-    embeddings.append(embedding_vector)
-    metadata_list.append(metadata)
 
-# Convert embeddings to numpy array
-embedding_dim = len(embeddings[0])  # Get embedding dimension
-embedding_matrix = np.array(embeddings, dtype=np.float32)
 
-# Create FAISS index
-faiss_index = faiss.IndexFlatL2(embedding_dim)
-faiss_index.add(embedding_matrix)
+def group_key(row):
+    """Stable key of a restaurant-category group in the build manifest."""
+    return f"{row['restaurant_name']}\x1f{row['menu_category']}"
+
+
+def content_hash(text):
+    """Hash of a group's structured text; a new hash means the group must be re-embedded."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def iter_groups(df):
+    """
+    Pipeline stage 1: streams the menu data one restaurant-category group at a time.
+
+    Yields:
+        tuple: (group key, structured text, metadata dict)
+    """
+    for (restaurant, category), group in df.groupby(['restaurant_name', 'menu_category']):
+        row = {column: group[column].tolist() for column in group.columns}
+        row["restaurant_name"], row["menu_category"] = restaurant, category
+        yield group_key(row), build_structured_text(row), build_metadata(row)
+
+
+def _batched(iterable, batch_size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def embed_batches(embedding_model, texts, batch_size):
+    """Pipeline stage 2: embeds texts with one `embed_documents` call per batch."""
+    for batch in _batched(texts, batch_size):
+        yield np.asarray(embedding_model.embed_documents(batch), dtype=np.float32)
+
+
+# Embedding model of a pool worker, loaded once per process by _init_worker
+_worker_model = None
+
+
+def _init_worker(backend, num_threads):
+    global _worker_model
+    _worker_model = make_embedding_model(backend, num_threads)
+
+
+def _embed_shard(texts):
+    return np.asarray(_worker_model.embed_documents(texts), dtype=np.float32)
+
+
+def embed_batches_parallel(texts, batch_size, workers):
+    """
+    Pipeline stage 3: shards batches across a process pool, one model per worker.
+    At most two shards per worker are in flight, so memory stays bounded no
+    matter how large the input stream is. Partial matrices come back in input order.
+    """
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"),
+                             initializer=_init_worker, initargs=(EMBEDDING_BACKEND, num_threads)) as pool:
+        pending = deque()
+        for batch in _batched(texts, batch_size):
+            pending.append(pool.submit(_embed_shard, batch))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def peak_rss_mb():
+    """
+    Peak resident memory of this process and of its largest child, in MB.
+
+    Returns:
+        tuple: (own, children) in MB, or None where `resource` is unavailable (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit
+    return own, children
+
+
+def run_embedding_pipeline(items, embedding_model=None, batch_size=32, workers=0):
+    """
+    Embeds a stream of (id, text) pairs and merges the partial matrices.
+    Uses `embedding_model` in-process when `workers` is 0, otherwise a process pool.
+
+    Returns:
+        tuple: (int64 ids, float32 matrix with one row per id)
+    """
+    ids = []
+
+    def texts():
+        for item_id, text in items:
+            ids.append(item_id)
+            yield text
+
+    start = time.perf_counter()
+    if workers > 0:
+        chunks = embed_batches_parallel(texts(), batch_size, workers)
+    else:
+        chunks = embed_batches(embedding_model, texts(), batch_size)
+
+    matrices = []
+    for chunk in tqdm(chunks, desc="Embedding batches"):
+        matrices.append(chunk)
+    elapsed = time.perf_counter() - start
+
+    rss = peak_rss_mb()
+    rate = len(ids) / elapsed if elapsed > 0 else 0.0
+    print(f"📊 Embedded {len(ids)} groups in {elapsed:.1f}s ({rate:.1f} rows/sec)"
+          + (f", peak RSS {rss[0]:.0f} MB (largest worker {rss[1]:.0f} MB)" if rss else ""))
+
+    matrix = np.vstack(matrices) if matrices else np.zeros((0, 0), dtype=np.float32)
+    return np.array(ids, dtype=np.int64), matrix
+
+
+def embed_groups(embedding_model, df, batch_size=32, workers=0):
+    """
+    Embeds every restaurant-category group from scratch.
+
+    Returns:
+        tuple: (float32 embedding matrix, list of metadata dicts in the same row order)
+    """
+    metadata_list = []
+
+    def items():
+        for position, (_, text, metadata) in enumerate(iter_groups(df)):
+            metadata_list.append(metadata)
+            yield position, text
+
+    _, embedding_matrix = run_embedding_pipeline(items(), embedding_model, batch_size, workers)
+    return embedding_matrix, metadata_list
+
+
+def load_previous_build(index_type, build_params):
+    """
+    Loads the manifest, stored vectors and index of the last build.
+
+    Returns:
+        tuple: (manifest, vectors, index) — index is None when it must be rebuilt
+               from the stored vectors; (None, None, None) when everything must be re-embedded.
+    """
+    if not (os.path.exists(FAISS_MANIFEST_PATH) and os.path.exists(FAISS_VECTORS_PATH)):
+        return None, None, None
+
+    with open(FAISS_MANIFEST_PATH, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("embedding_model") != embedding_fingerprint():
+        print(f"♻️ Embedding model changed ({manifest.get('embedding_model')} -> {embedding_fingerprint()}). Re-embedding everything.")
+        return None, None, None
+
+    vectors = np.load(FAISS_VECTORS_PATH)
+
+    if not os.path.exists(FAISS_INDEX_PATH):
+        return manifest, vectors, None
+    index, settings = load_index(FAISS_INDEX_PATH)
+
+    # Reuse the index only if it is ID-mapped and was built with the requested layout
+    same_layout = settings.get("index_type") == index_type and all(
+        settings.get(name) == value for name, value in build_params.items() if value is not None
+    )
+    if not same_layout or "IDMap" not in type(index).__name__:
+        return manifest, vectors, None
+    return manifest, vectors, index
+
+
+def incremental_build(df, embedding_model=None, index_type="flat", full=False, batch_size=32, workers=0, **build_params):
+    """
+    Brings the FAISS index, its vectors and metadata up to date with `df`.
+
+    Only restaurant-category groups whose structured text hash changed are
+    re-embedded. Index ids are stable per group, so removed or changed groups
+    are dropped from the ID-mapped index by id and new vectors are added in place.
+    Indexes that cannot remove ids (HNSW) are rebuilt from the stored vectors.
+    """
+    manifest, vectors, faiss_index = (None, None, None) if full else load_previous_build(index_type, build_params)
+    old_groups = manifest["groups"] if manifest else {}
+    next_id = manifest["next_id"] if manifest else 0
+
+    new_groups = {}
+    metadata_by_id = {}
+    changed_ids = []
+
+    def groups_to_embed():
+        """Streams (id, text) for new or changed groups while recording every group seen."""
+        nonlocal next_id
+        for key, text, metadata in iter_groups(df):
+            digest = content_hash(text)
+            previous = old_groups.get(key)
+            if previous is not None:
+                group_id = previous["id"]
+                if previous["hash"] != digest:
+                    changed_ids.append(group_id)
+                    yield group_id, text
+            else:
+                group_id = next_id
+                next_id += 1
+                yield group_id, text
+            new_groups[key] = {"id": group_id, "hash": digest}
+            metadata_by_id[group_id] = metadata
+
+    # Embed only what changed
+    new_ids, new_vectors = run_embedding_pipeline(groups_to_embed(), embedding_model, batch_size, workers)
+
+    removed_ids = [entry["id"] for key, entry in old_groups.items() if key not in new_groups]
+    stale_ids = removed_ids + changed_ids
+    print(f"🔹 {len(new_ids) - len(changed_ids)} new, {len(changed_ids)} changed, {len(removed_ids)} removed, "
+          f"{len(new_groups) - len(new_ids)} unchanged groups")
+
+    dim = vectors.shape[1] if vectors is not None else new_vectors.shape[1]
+    all_vectors = np.zeros((next_id, dim), dtype=np.float32)
+    if vectors is not None:
+        all_vectors[:len(vectors)] = vectors
+    all_vectors[removed_ids] = 0
+    if len(new_ids):
+        all_vectors[new_ids] = new_vectors
+
+    # Update the ID-mapped index in place where possible
+    if faiss_index is not None:
+        try:
+            if stale_ids:
+                faiss_index.remove_ids(np.array(stale_ids, dtype=np.int64))
+            if len(new_ids):
+                faiss_index.add_with_ids(new_vectors, new_ids)
+            settings = load_index_settings(FAISS_INDEX_PATH)
+        except RuntimeError as e:
+            print(f"⚠️ In-place update not supported ({e}). Rebuilding from stored vectors.")
+            faiss_index = None
+
+    if faiss_index is None:
+        live_ids = np.array(sorted(metadata_by_id), dtype=np.int64)
+        faiss_index, settings = build_index(all_vectors[live_ids], index_type, ids=live_ids, **build_params)
+
+    # Metadata is cheap to rebuild, so it always reflects the latest rows (ratings, prices, ...)
+    metadata_list = [None] * next_id
+    for group_id, metadata in metadata_by_id.items():
+        metadata_list[group_id] = metadata
+
+    def write_vectors(path):
+        with open(path, "wb") as f:
+            np.save(f, all_vectors)
+
+    def write_metadata(path):
+        write_store(metadata_list, path)
+
+    def write_manifest(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"embedding_model": embedding_fingerprint(), "next_id": next_id, "groups": new_groups}, f)
+
+    # Each file is swapped in atomically; the manifest goes last so an interrupted
+    # run is simply redone by the next incremental build.
+    atomic_write(FAISS_VECTORS_PATH, write_vectors)
+    save_index(faiss_index, FAISS_INDEX_PATH, index_type, settings, embedding_model=embedding_fingerprint())
+    atomic_write(FAISS_METADATA_PATH, write_metadata)
+    atomic_write(FAISS_MANIFEST_PATH, write_manifest)
+    return faiss_index
+
+
+def build_item_text(row):
+    """Creates the text embedded for one menu item row of the item-level index."""
+    return (f"Restaurant: {row.restaurant_name}\nMenu Category: {row.menu_category}\nItem: {row.menu_item}\n"
+            f"Description: {row.menu_description}\nIngredients: {row.ingredient_name}")
+
+
+def build_item_index(df, embedding_model=None, index_type="pq", batch_size=32, workers=0, **build_params):
+    """
+    Builds the optional item-level index: one compressed vector per menu item row,
+    pointing at the id of its restaurant-category group in the category index.
+    Item vectors whose text hash is unchanged since the last run are reused.
+    Must run after `incremental_build`, whose manifest provides the group ids.
+    """
+    with open(FAISS_MANIFEST_PATH, "r", encoding="utf-8") as f:
+        group_ids = {key: entry["id"] for key, entry in json.load(f)["groups"].items()}
+
+    texts, hashes, parents = [], [], []
+    for row in df.itertuples(index=False):
+        key = group_key({"restaurant_name": row.restaurant_name, "menu_category": row.menu_category})
+        if key not in group_ids:  # Rows with a missing restaurant or category have no group
+            continue
+        text = build_item_text(row)
+        texts.append(text)
+        hashes.append(content_hash(text))
+        parents.append(group_ids[key])
+
+    # Reuse vectors of unchanged items from the previous build
+    previous_rows, previous_vectors = {}, None
+    if os.path.exists(FAISS_ITEM_MANIFEST_PATH) and os.path.exists(FAISS_ITEM_VECTORS_PATH):
+        with open(FAISS_ITEM_MANIFEST_PATH, "r", encoding="utf-8") as f:
+            item_manifest = json.load(f)
+        if item_manifest.get("embedding_model") == embedding_fingerprint():
+            previous_rows = {digest: position for position, digest in enumerate(item_manifest["hashes"])}
+            previous_vectors = np.load(FAISS_ITEM_VECTORS_PATH, mmap_mode="r")
+
+    missing = [(position, text) for position, (text, digest) in enumerate(zip(texts, hashes)) if digest not in previous_rows]
+    print(f"🔹 Item index: {len(texts) - len(missing)} unchanged, {len(missing)} items to embed")
+    new_positions, new_vectors = run_embedding_pipeline(iter(missing), embedding_model, batch_size, workers)
+
+    dim = new_vectors.shape[1] if len(new_positions) else previous_vectors.shape[1]
+    item_vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for position, digest in enumerate(hashes):
+        if digest in previous_rows:
+            item_vectors[position] = previous_vectors[previous_rows[digest]]
+    if len(new_positions):
+        item_vectors[new_positions] = new_vectors
+
+    item_index, settings = build_index(item_vectors, index_type, **build_params)
+
+    def write_array(array):
+        def write(path):
+            with open(path, "wb") as f:
+                np.save(f, array)
+        return write
+
+    def write_manifest(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"embedding_model": embedding_fingerprint(), "hashes": hashes}, f)
+
+    atomic_write(FAISS_ITEM_VECTORS_PATH, write_array(item_vectors))
+    atomic_write(FAISS_ITEM_PARENTS_PATH, write_array(np.array(parents, dtype=np.int64)))
+    save_index(item_index, FAISS_ITEM_INDEX_PATH, index_type, settings, embedding_model=embedding_fingerprint())
+    atomic_write(FAISS_ITEM_MANIFEST_PATH, write_manifest)
+    return item_index
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the FAISS index from cleaned_menu_data.csv")
+    parser.add_argument("--full", action="store_true", help="Re-embed every group instead of only changed ones")
+    parser.add_argument("--batch-size", type=int, default=32, help="Texts per embed_documents call")
+    parser.add_argument("--workers", type=int, default=0, help="Embedding processes (0 embeds in this process)")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat", help="FAISS index layout")
+    parser.add_argument("--nlist", type=int, help="IVF cells (default ~4*sqrt(n))")
+    parser.add_argument("--nprobe", type=int, help="IVF cells visited per query")
+    parser.add_argument("--pq-m", type=int, help="PQ sub-quantizers for ivf_pq")
+    parser.add_argument("--pq-nbits", type=int, help="Bits per PQ code for ivf_pq")
+    parser.add_argument("--hnsw-m", type=int, help="HNSW graph degree")
+    parser.add_argument("--ef-construction", type=int, help="HNSW build-time beam width")
+    parser.add_argument("--ef-search", type=int, help="HNSW query-time beam width")
+    parser.add_argument("--transform", choices=("pca", "opq"), help="Learn a dimensionality reduction stored with the index")
+    parser.add_argument("--transform-dim", type=int, help="Output dimension of --transform (e.g. 64, 128, 256)")
+    parser.add_argument("--item-index-type", choices=INDEX_TYPES,
+                        help="Also build the item-level index with this layout (pq or sq8 keep it compact)")
+    parser.add_argument("--item-pq-m", type=int, default=48, help="PQ sub-quantizers of the item-level index")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # Load cleaned restaurant dataset (from its columnar snapshot when the CSV is unchanged),
+    # with numeric columns in memory since the build works on a mutable frame
+    df = load_csv(data_path, writable=True)
+
+    # Load the embedding model of the configured backend (pool workers load their own copy)
+    embedding_model = make_embedding_model() if args.workers == 0 else None
+
+    # Create or update the FAISS index
+    incremental_build(
+        df, embedding_model, args.index_type, full=args.full, batch_size=args.batch_size, workers=args.workers,
+        nlist=args.nlist, nprobe=args.nprobe, pq_m=args.pq_m, pq_nbits=args.pq_nbits,
+        hnsw_m=args.hnsw_m, ef_construction=args.ef_construction, ef_search=args.ef_search,
+        transform=args.transform, transform_dim=args.transform_dim
+    )
+
+    print(f"Optimized FAISS index ({args.index_type}) stored successfully!")
+
+    # Recount only the groups that changed in the materialized trending aggregates
+    refresh_aggregates(df)
+
+    if args.item_index_type:
+        build_item_index(
+            df, embedding_model, args.item_index_type, batch_size=args.batch_size, workers=args.workers,
+            pq_m=args.item_pq_m, pq_nbits=args.pq_nbits, nlist=args.nlist, nprobe=args.nprobe,
+            hnsw_m=args.hnsw_m, ef_construction=args.ef_construction, ef_search=args.ef_search
+        )
+        print(f"Item-level FAISS index ({args.item_index_type}) stored successfully!")
 
-# Save FAISS index and metadata
-faiss.write_index(faiss_index, "faiss_index_2.bin")
-with open("metadata_2.pkl", "wb") as f:
-    pickle.dump(metadata_list, f)
 
-print("Optimized FAISS index stored successfully!")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
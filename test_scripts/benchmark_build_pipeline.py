@@ -0,0 +1,37 @@
+import os
+import argparse
+import pandas as pd
+from chatbot.embeddings import make_embedding_model
+from database import data_path, embed_groups
+
+
+def replicate(df, factor):
+    """Builds a `factor`x larger menu dataset by cloning every restaurant under a new name."""
+    if factor == 1:
+        return df
+    copies = []
+    for copy in range(factor):
+        clone = df.copy()
+        clone["restaurant_name"] = clone["restaurant_name"] + f" #{copy}"
+        copies.append(clone)
+    return pd.concat(copies, ignore_index=True)
+
+
+def benchmark():
+    """Runs the streaming / batched / multi-process embedding pipeline over a replicated dataset."""
+    parser = argparse.ArgumentParser(description="Benchmark the index-construction embedding pipeline")
+    parser.add_argument("--factor", type=int, default=1, help="Replicate cleaned_menu_data.csv this many times")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=0, help=f"Embedding processes (this box has {os.cpu_count()} CPUs)")
+    args = parser.parse_args()
+
+    df = replicate(pd.read_csv(data_path), args.factor)
+    print(f"🔹 {len(df):,} menu rows ({args.factor}x), batch size {args.batch_size}, {args.workers} workers")
+
+    embedding_model = make_embedding_model() if args.workers == 0 else None
+    matrix, metadata_list = embed_groups(embedding_model, df, batch_size=args.batch_size, workers=args.workers)
+    print(f"✅ {matrix.shape[0]:,} group vectors of dimension {matrix.shape[1]}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,27 @@
+import sys
+import time
+import subprocess
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import chatbot.langgraph_workflow
+print(f"{(time.perf_counter() - start) * 1000:.1f}")
+"""
+
+
+def benchmark():
+    """Measures import time of the workflow in a fresh interpreter, then the lazy loads it now defers."""
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True)
+    print(f"🔹 Cold import of chatbot.langgraph_workflow: {output.stdout.strip().splitlines()[-1]} ms")
+
+    import chatbot.langgraph_workflow  # noqa: F401 (registers every resource)
+    from chatbot.resources import registry
+
+    start = time.perf_counter()
+    registry.warmup()
+    print(f"🔹 warmup(): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
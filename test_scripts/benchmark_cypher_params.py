@@ -0,0 +1,106 @@
+import re
+import json
+import time
+import random
+import argparse
+import numpy as np
+from chatbot.resources import get_resource
+from chatbot.structured_graph_search import QUERY_DICTIONARY, query_parameters
+
+CITIES = ["San Francisco", "New York", "Chicago", "Los Angeles", "Austin"]
+ITEMS = ["pizza", "tacos", "ramen", "burger", "pad thai", "tres leches", "pho", "salad"]
+INGREDIENTS = ["cheese", "basil", "tofu", "pork", "chili", "avocado", "garlic"]
+CATEGORIES = ["mexican", "italian", "thai", "japanese", "desserts", "burgers"]
+
+
+def inline_parameters(query, parameters):
+    """The previous path: entity lists pasted into the query text as JSON literals."""
+    return re.sub(r"\$(\w+)", lambda match: json.dumps(parameters[match.group(1)]), query)
+
+
+def build_workload(count, seed=0):
+    """(query template, parameters) pairs drawn over every template and random entities."""
+    rng = random.Random(seed)
+    templates = [query for queries in QUERY_DICTIONARY.values() for query in queries.values()]
+    workload = []
+    for _ in range(count):
+        entities = {
+            "location": rng.sample(CITIES, rng.randint(1, 2)),
+            "menu_item": rng.sample(ITEMS, rng.randint(1, 2)),
+            "ingredient_name": rng.sample(INGREDIENTS, rng.randint(1, 2)),
+            "menu_category": rng.sample(CATEGORIES, rng.randint(1, 2)),
+        }
+        workload.append((rng.choice(templates), query_parameters(entities)))
+    return workload
+
+
+class StatementCounter:
+    """In-memory stand-in for the graph: records the query texts the server would have to plan."""
+
+    def __init__(self):
+        self.statements = set()
+
+    def run(self, query, parameters=None):
+        self.statements.add(query)
+        return self
+
+    def data(self):
+        return []
+
+
+def run(graph, workload, parameterized):
+    latencies = []
+    for query, parameters in workload:
+        start = time.perf_counter()
+        if parameterized:
+            graph.run(query, parameters).data()
+        else:
+            graph.run(inline_parameters(query, parameters)).data()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def benchmark():
+    """End-to-end latency of string-built vs parameterized Cypher, and how many distinct statements each sends."""
+    parser = argparse.ArgumentParser(description="Benchmark parameterized Cypher against string-built queries")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--url", help="Neo4j URL (e.g. bolt://localhost:7687 for a local container); "
+                                      "default: the configured structured_graph")
+    parser.add_argument("--user", default="neo4j")
+    parser.add_argument("--password", default="neo4j")
+    parser.add_argument("--stand-in", action="store_true", help="Only count distinct statements, without a server")
+    parser.add_argument("--memory", action="store_true", help="Run against the in-process MemoryGraph instead of Neo4j")
+    args = parser.parse_args()
+
+    if args.stand_in:
+        workload = build_workload(args.requests)
+        for parameterized in (False, True):
+            counter = StatementCounter()
+            run(counter, workload, parameterized)
+            print(f"{'parameterized' if parameterized else 'string-built':14s} "
+                  f"{len(counter.statements):5d} distinct statements for {len(workload)} requests")
+        return
+
+    if args.memory:
+        from chatbot.memory_graph import MemoryGraph
+        graph = MemoryGraph.from_csvs()
+        # Only parameterized templates are recognised in-process
+        latencies = run(graph, build_workload(args.requests), True)
+        print(f"{'memory graph':14s} p50 {np.percentile(latencies, 50):7.3f} ms   p95 {np.percentile(latencies, 95):7.3f} ms")
+        return
+
+    if args.url:
+        from py2neo import Graph
+        graph = Graph(args.url, auth=(args.user, args.password))
+    else:
+        graph = get_resource("structured_graph")
+
+    # Alternate the two paths; fresh entities each round, as new user requests would bring
+    for round_number, parameterized in enumerate((False, True, False, True)):
+        latencies = run(graph, build_workload(args.requests, seed=round_number), parameterized)
+        print(f"{'parameterized' if parameterized else 'string-built':14s} p50 {np.percentile(latencies, 50):7.2f} ms   "
+              f"p95 {np.percentile(latencies, 95):7.2f} ms   total {sum(latencies) / 1000:6.2f} s")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,48 @@
+import time
+import faiss
+import numpy as np
+from chatbot.faiss_index import build_index
+from test_scripts.benchmark_index_types import K, NUM_QUERIES, load_base_vectors, latency_percentiles, recall_at_k
+
+TARGET_DIMS = [64, 128, 256]
+
+# (label, index type, build params without the target dimension)
+CONFIGURATIONS = [
+    ("pca + flat", "flat", {"transform": "pca"}),
+    ("opq + pq", "pq", {"transform": "opq", "pq_m": 16}),
+]
+
+
+def report(label, index, queries, exact):
+    _, approx = index.search(queries, K)
+    p50, p99 = latency_percentiles(index, queries)
+    size = len(faiss.serialize_index(index))
+    print(f"{label:22s} {recall_at_k(approx, exact):10.3f} {size / 1024:10.1f} {size / index.ntotal:13.1f} {p50:8.3f} {p99:8.3f}")
+
+
+def benchmark():
+    """Sweeps PCA / OPQ target dimensions against the full-dimension flat index: recall@10, bytes and latency."""
+    rng = np.random.default_rng(0)
+    corpus = load_base_vectors()
+    sample = rng.choice(len(corpus), size=min(NUM_QUERIES, len(corpus)), replace=False)
+    queries = corpus[sample] + rng.normal(size=(len(sample), corpus.shape[1])).astype(np.float32) * 0.02
+
+    exact_index, _ = build_index(corpus, "flat")
+    _, exact = exact_index.search(queries, K)
+
+    print(f"🔹 {len(corpus):,} vectors of {corpus.shape[1]} dims")
+    print(f"{'index':22s} {'recall@10':>10s} {'index KB':>10s} {'bytes/vector':>13s} {'p50 ms':>8s} {'p99 ms':>8s}")
+    report(f"flat {corpus.shape[1]}d", exact_index, queries, exact)
+
+    for target_dim in TARGET_DIMS:
+        if target_dim >= corpus.shape[1]:
+            continue
+        for label, index_type, params in CONFIGURATIONS:
+            start = time.perf_counter()
+            index, _ = build_index(corpus, index_type, transform_dim=target_dim, **params)
+            build_seconds = time.perf_counter() - start
+            report(f"{label} {target_dim}d ({build_seconds:.1f}s)", index, queries, exact)
+
+
+if __name__ == "__main__":
+    benchmark()
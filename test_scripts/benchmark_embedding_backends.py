@@ -0,0 +1,77 @@
+import os
+import time
+import random
+import numpy as np
+import pandas as pd
+from chatbot.config import MENU_DATA_PATH
+from chatbot.embeddings import make_embedding_model
+
+NUM_QUERIES = 100
+BATCH_SIZE = 32
+THREAD_COUNTS = sorted({1, 2, 4, os.cpu_count() or 1})
+
+QUERY_TEMPLATES = [
+    "Where can I get {item}?",
+    "Restaurants with {item} on the menu",
+    "Which places serve {item} with {ingredient}?",
+]
+
+
+def build_queries(count, seed=0):
+    """Query-like sentences built from the menu items and ingredients."""
+    rng = random.Random(seed)
+    rows = pd.read_csv(MENU_DATA_PATH)[["menu_item", "ingredient_name"]].dropna().values.tolist()
+    return [rng.choice(QUERY_TEMPLATES).format(item=item, ingredient=ingredient)
+            for item, ingredient in rng.sample(rows, count)]
+
+
+def measure(model, queries):
+    """Returns (p50 ms, p95 ms) of single-query latency, batched docs/sec and the query embeddings."""
+    model.embed_query(queries[0])  # Warm-up
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        model.embed_query(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    embeddings = np.vstack([
+        np.asarray(model.embed_documents(queries[offset:offset + BATCH_SIZE]), dtype=np.float32)
+        for offset in range(0, len(queries), BATCH_SIZE)
+    ])
+    throughput = len(queries) / (time.perf_counter() - start)
+    return np.percentile(latencies, 50), np.percentile(latencies, 95), throughput, embeddings
+
+
+def cosine(a, b):
+    return np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+
+def top10_overlap(a, b, corpus):
+    """How many of the fp32 top-10 neighbours (over the query set itself) the int8 embeddings keep."""
+    top_a = np.argsort(-(a @ corpus.T), axis=1)[:, :10]
+    top_b = np.argsort(-(b @ corpus.T), axis=1)[:, :10]
+    return np.mean([len(set(x) & set(y)) / 10 for x, y in zip(top_a, top_b)])
+
+
+def benchmark():
+    """Compares the fp32 and int8 backends: latency, throughput and agreement, per thread count."""
+    queries = build_queries(NUM_QUERIES)
+    print(f"{'backend':8s} {'threads':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'docs/sec':>9s}")
+
+    reference = None
+    for backend in ("fp32", "int8"):
+        for num_threads in THREAD_COUNTS:
+            model = make_embedding_model(backend, num_threads)
+            p50, p95, throughput, embeddings = measure(model, queries)
+            print(f"{backend:8s} {num_threads:7d} {p50:8.2f} {p95:8.2f} {throughput:9.1f}")
+        if reference is None:
+            reference = embeddings
+
+    similarities = cosine(reference, embeddings)
+    print(f"\n🔹 int8 vs fp32 cosine: mean {similarities.mean():.4f}, min {similarities.min():.4f}; "
+          f"top-10 neighbour overlap {top10_overlap(reference, embeddings, reference):.1%}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,67 @@
+import time
+import tempfile
+import chatbot.faiss_search as faiss_search
+from chatbot.embeddings import embedding_fingerprint
+from chatbot.embedding_cache import EmbeddingCache
+from chatbot.resources import registry, get_resource
+
+BATCH_SIZES = [1, 8, 32, 128]
+
+QUERY_TEMPLATES = [
+    "Best {category} at {restaurant}",
+    "Where can I find {category} like {restaurant}?",
+]
+
+
+def build_queries(count):
+    """Builds distinct benchmark queries from the indexed restaurant/category pairs."""
+    queries = []
+    for doc in get_resource("faiss_metadata"):
+        if doc is None:  # Id of a group removed by an incremental build
+            continue
+        for template in QUERY_TEMPLATES:
+            queries.append(template.format(category=doc["menu_category"], restaurant=doc["restaurant_name"]))
+            if len(queries) == count:
+                return queries
+    return queries
+
+
+def fresh_cache():
+    """Swaps in an empty embedding cache so every run pays for the model."""
+    embedding_model = get_resource("embedding_model")
+    registry.set("query_embedding_cache", EmbeddingCache(
+        embedding_model.embed_query, embedding_fingerprint(), tempfile.mkdtemp(prefix="bench_embeddings_"),
+        embed_batch_fn=embedding_model.embed_documents
+    ))
+
+
+def same_results(batched, single):
+    keys = lambda docs: [(doc["restaurant_name"], doc["menu_category"]) for doc in docs]
+    return all(keys(b) == keys(s) for b, s in zip(batched, single))
+
+
+def benchmark(total_queries=256):
+    """Compares per-query search_faiss calls against search_faiss_batch at several batch sizes."""
+    queries = build_queries(total_queries)
+
+    fresh_cache()
+    start = time.perf_counter()
+    single_results = [faiss_search.search_faiss({"input": query})["faiss_results"] for query in queries]
+    single_qps = len(queries) / (time.perf_counter() - start)
+    print(f"\n🔹 search_faiss (one call per query): {single_qps:8.1f} queries/sec")
+
+    for batch_size in BATCH_SIZES:
+        fresh_cache()
+        batched_results = []
+        start = time.perf_counter()
+        for offset in range(0, len(queries), batch_size):
+            batched_results.extend(faiss_search.search_faiss_batch(queries[offset:offset + batch_size]))
+        elapsed = time.perf_counter() - start
+
+        match = "✅ matches" if same_results(batched_results, single_results) else "❌ differs from"
+        print(f"🔹 batch size {batch_size:4d}: {len(queries) / elapsed:8.1f} queries/sec "
+              f"({len(queries) / elapsed / single_qps:.2f}x) — {match} single-query path")
+
+
+if __name__ == "__main__":
+    benchmark()
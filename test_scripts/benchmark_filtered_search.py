@@ -0,0 +1,56 @@
+import time
+import numpy as np
+import chatbot.faiss_search  # noqa: F401 (registers the FAISS resources)
+from chatbot.entity_filters import parse_entity_filters
+from chatbot.faiss_filters import filtered_search
+from chatbot.resources import get_resource
+
+NUM_QUERIES = 200
+
+# Entity sets as the extractor would return them
+ENTITY_CASES = [
+    {"location": ["San Francisco", "SF"]},
+    {"price": ["cheap"]},
+    {"price": ["fine dining"], "rating": ["4.5+ stars"]},
+    {"location": ["San Francisco"], "price": ["$$"], "rating": ["top rated"]},
+    {"location": ["Chicago"]},
+]
+
+
+def post_filter(index, queries, mask, k=10):
+    """The old behaviour: take a fixed top k, then drop what does not match."""
+    _, indices = index.search(queries, k)
+    return [[idx for idx in row if idx != -1 and mask[idx]] for row in indices]
+
+
+def benchmark():
+    """Compares post-filtering a fixed top 10 with selector / exact prefiltered search."""
+    index = get_resource("faiss_index")
+    vectors = get_resource("faiss_vectors")
+    filter_index = get_resource("faiss_filters")
+    queries = np.random.default_rng(0).standard_normal((NUM_QUERIES, index.d)).astype(np.float32)
+
+    print(f"{'filters':70s} {'matching':>9s} {'post-filter hits':>17s} {'selector':>18s} {'exact':>18s}")
+    for entities in ENTITY_CASES:
+        filters = parse_entity_filters(entities)
+        mask = filter_index.mask(filters)
+        if mask is None:
+            continue
+
+        start = time.perf_counter()
+        kept = post_filter(index, queries, mask)
+        post_ms = (time.perf_counter() - start) * 1000 / NUM_QUERIES
+
+        timings = []
+        for exact_vectors in (None, vectors):
+            start = time.perf_counter()
+            _, indices = filtered_search(index, queries, mask, 10, vectors=exact_vectors, exact_max=len(mask))
+            timings.append(((time.perf_counter() - start) * 1000 / NUM_QUERIES, np.mean((indices != -1).sum(axis=1))))
+
+        exact = f"{timings[1][0]:7.3f} ms {timings[1][1]:5.1f}" if vectors is not None else "no vectors file"
+        print(f"{str(filters):70s} {int(mask.sum()):9d} {np.mean([len(row) for row in kept]):7.1f} ({post_ms:.3f} ms) "
+              f"{timings[0][0]:7.3f} ms {timings[0][1]:5.1f} {exact:>18s}")
+
+
+if __name__ == "__main__":
+    benchmark()
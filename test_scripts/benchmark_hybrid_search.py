@@ -0,0 +1,73 @@
+import time
+import random
+import numpy as np
+import chatbot.faiss_search  # noqa: F401 (registers the FAISS resources)
+from chatbot.config import BM25_CANDIDATES, RRF_K
+from chatbot.lexical_search import reciprocal_rank_fusion, tokenize
+from chatbot.resources import get_resource
+
+NUM_QUERIES = 300
+
+QUERY_TEMPLATES = [
+    "Where can I get {item}?",
+    "Which restaurants serve {item}",
+    "dishes with {ingredient}",
+]
+
+
+def build_queries(count, seed=0):
+    """
+    Builds (query, FAISS id) pairs naming a dish or ingredient of that document.
+    Hit rate is how often the source document is among the 10 candidates.
+    """
+    rng = random.Random(seed)
+    metadata_list = get_resource("faiss_metadata")
+    doc_ids = [doc_id for doc_id in range(len(metadata_list)) if metadata_list[doc_id] is not None]
+
+    pairs = []
+    while len(pairs) < count:
+        doc_id = rng.choice(doc_ids)
+        doc = metadata_list[doc_id]
+        items = [item for item in doc["menu_items"] if isinstance(item, str)]
+        ingredients = [item for item in doc["ingredients"] if isinstance(item, str)]
+        template = rng.choice(QUERY_TEMPLATES)
+        if "{item}" in template and items:
+            pairs.append((template.format(item=rng.choice(items)), doc_id))
+        elif ingredients:
+            pairs.append((template.format(ingredient=rng.choice(ingredients)), doc_id))
+    return pairs
+
+
+def benchmark():
+    """Compares candidate hit rate and latency of FAISS only, BM25 only and their RRF fusion."""
+    pairs = build_queries(NUM_QUERIES)
+    queries = [query for query, _ in pairs]
+    faiss_index = get_resource("faiss_index")
+    bm25_index = get_resource("bm25_index")
+    embedding_cache = get_resource("query_embedding_cache")
+    embedding_cache.embed_many(queries)  # Time retrieval, not the embedding model
+
+    start = time.perf_counter()
+    _, faiss_ids = faiss_index.search(embedding_cache.embed_many(queries), k=10)
+    faiss_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    start = time.perf_counter()
+    bm25_ids = [bm25_index.search(query, k=BM25_CANDIDATES)[0] for query in queries]
+    bm25_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    start = time.perf_counter()
+    fused_ids = [reciprocal_rank_fusion([row, lexical], k=RRF_K, limit=10) for row, lexical in zip(faiss_ids, bm25_ids)]
+    fusion_ms = (time.perf_counter() - start) * 1000 / len(queries) + faiss_ms + bm25_ms
+
+    def hit_rate(rankings):
+        return np.mean([target in list(ranking) for (_, target), ranking in zip(pairs, rankings)])
+
+    print(f"🔹 {len(queries)} queries, {len(bm25_index.postings)} BM25 terms, "
+          f"{np.mean([len(tokenize(query)) for query in queries]):.1f} tokens per query")
+    print(f"{'retriever':12s} {'hit@10':>8s} {'ms/query':>10s}")
+    for name, rankings, ms in (("faiss", faiss_ids, faiss_ms), ("bm25", bm25_ids, bm25_ms), ("rrf fused", fused_ids, fusion_ms)):
+        print(f"{name:12s} {hit_rate(rankings):8.1%} {ms:10.4f}")
+
+
+if __name__ == "__main__":
+    benchmark()
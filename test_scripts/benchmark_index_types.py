@@ -0,0 +1,90 @@
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+from chatbot.config import FAISS_MANIFEST_PATH, FAISS_VECTORS_PATH
+from chatbot.faiss_index import build_index, apply_search_params
+
+K = 10
+NUM_QUERIES = 200
+REPLICA_FACTORS = [1, 10, 100]
+
+# (index type, build params, query-time sweep)
+CONFIGURATIONS = [
+    ("flat", {}, [{}]),
+    ("ivf_flat", {}, [{"nprobe": 1}, {"nprobe": 4}, {"nprobe": 16}, {"nprobe": 64}]),
+    ("ivf_pq", {"pq_m": 32}, [{"nprobe": 4}, {"nprobe": 16}, {"nprobe": 64}]),
+    ("hnsw", {"hnsw_m": 32}, [{"ef_search": 16}, {"ef_search": 64}, {"ef_search": 256}]),
+]
+
+
+def load_base_vectors():
+    """Reuses the vectors stored by database.py, otherwise embeds cleaned_menu_data.csv."""
+    if os.path.exists(FAISS_MANIFEST_PATH) and os.path.exists(FAISS_VECTORS_PATH):
+        with open(FAISS_MANIFEST_PATH, "r", encoding="utf-8") as f:
+            live_ids = sorted(entry["id"] for entry in json.load(f)["groups"].values())
+        return np.load(FAISS_VECTORS_PATH)[live_ids]
+
+    from chatbot.embeddings import make_embedding_model
+    from database import data_path, embed_groups
+
+    embedding_model = make_embedding_model()
+    vectors, _ = embed_groups(embedding_model, pd.read_csv(data_path))
+    return vectors
+
+
+def replicate(vectors, factor, rng):
+    """Builds a synthetic corpus `factor` times larger by jittering copies of the real vectors."""
+    if factor == 1:
+        return vectors
+    noise_scale = 0.05 * vectors.std(axis=0, keepdims=True)
+    copies = [vectors] + [vectors + rng.normal(size=vectors.shape).astype(np.float32) * noise_scale for _ in range(factor - 1)]
+    return np.ascontiguousarray(np.vstack(copies), dtype=np.float32)
+
+
+def latency_percentiles(index, queries):
+    """Searches one query at a time, as search_faiss does, and returns (p50, p99) in ms."""
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query[np.newaxis, :], K)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+
+def recall_at_k(approx, exact):
+    return np.mean([len(set(a) & set(e)) / K for a, e in zip(approx, exact)])
+
+
+def benchmark():
+    """Reports recall@10 against the flat index and p50/p99 search latency per configuration."""
+    rng = np.random.default_rng(0)
+    base_vectors = load_base_vectors()
+
+    for factor in REPLICA_FACTORS:
+        corpus = replicate(base_vectors, factor, rng)
+        sample = rng.choice(len(base_vectors), size=NUM_QUERIES, replace=False)
+        queries = base_vectors[sample] + rng.normal(size=(NUM_QUERIES, corpus.shape[1])).astype(np.float32) * 0.02
+
+        exact_index, _ = build_index(corpus, "flat")
+        _, exact = exact_index.search(queries, K)
+
+        print(f"\n===== {factor}x corpus: {len(corpus):,} vectors =====")
+        print(f"{'index':10s} {'params':22s} {'build s':>8s} {'recall@10':>10s} {'p50 ms':>8s} {'p99 ms':>8s}")
+
+        for index_type, build_params, sweep in CONFIGURATIONS:
+            start = time.perf_counter()
+            index, settings = build_index(corpus, index_type, **build_params)
+            build_seconds = time.perf_counter() - start
+
+            for search_params in sweep:
+                apply_search_params(index, {**settings, **search_params})
+                _, approx = index.search(queries, K)
+                p50, p99 = latency_percentiles(index, queries)
+                label = ", ".join(f"{k}={v}" for k, v in search_params.items()) or "-"
+                print(f"{index_type:10s} {label:22s} {build_seconds:8.2f} {recall_at_k(approx, exact):10.3f} {p50:8.3f} {p99:8.3f}")
+
+
+if __name__ == "__main__":
+    benchmark()
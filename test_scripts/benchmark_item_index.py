@@ -0,0 +1,69 @@
+import time
+import random
+import faiss
+import numpy as np
+import pandas as pd
+import chatbot.faiss_search  # noqa: F401 (registers the FAISS resources)
+from chatbot.config import FAISS_VECTORS_PATH, FAISS_ITEM_VECTORS_PATH, FAISS_ITEM_PARENTS_PATH, FAISS_ITEM_CANDIDATES, MENU_DATA_PATH
+from chatbot.faiss_index import build_index
+from chatbot.faiss_search import rollup_items
+from chatbot.resources import get_resource
+
+NUM_QUERIES = 200
+
+# (label, level, index type, build params)
+LAYOUTS = [
+    ("category flat", "category", "flat", {}),
+    ("item flat", "item", "flat", {}),
+    ("item sq8", "item", "sq8", {}),
+    ("item pq m=96", "item", "pq", {"pq_m": 96}),
+    ("item pq m=48", "item", "pq", {"pq_m": 48}),
+    ("item pq m=16", "item", "pq", {"pq_m": 16}),
+]
+
+
+def build_queries(parents, count, seed=0):
+    """(query, group id) pairs naming one menu item; a hit is its group among the top 10."""
+    rng = random.Random(seed)
+    items = pd.read_csv(MENU_DATA_PATH)["menu_item"].tolist()
+    positions = [rng.randrange(len(parents)) for _ in range(count)]
+    return [(f"Where can I get {items[position]}?", int(parents[position])) for position in positions]
+
+
+def benchmark():
+    """Compares memory per vector, latency and hit@10 of the category index and item-level layouts."""
+    category_vectors = np.load(FAISS_VECTORS_PATH)
+    item_vectors = np.load(FAISS_ITEM_VECTORS_PATH)
+    parents = np.load(FAISS_ITEM_PARENTS_PATH)
+    live_ids = np.flatnonzero(np.abs(category_vectors).sum(axis=1) > 0)  # Removed groups are stored as zeros
+
+    pairs = build_queries(parents, NUM_QUERIES)
+    queries = get_resource("query_embedding_cache").embed_many([query for query, _ in pairs])
+    targets = [target for _, target in pairs]
+
+    print(f"🔹 {len(live_ids)} category vectors, {len(item_vectors)} item vectors, {queries.shape[1]} dims")
+    print(f"{'layout':16s} {'vectors':>8s} {'bytes/vector':>13s} {'index MB':>9s} {'ms/query':>9s} {'hit@10':>7s}")
+    for label, level, index_type, params in LAYOUTS:
+        if queries.shape[1] % params.get("pq_m", 1) != 0:
+            print(f"{label:16s} skipped: pq_m does not divide {queries.shape[1]} dims")
+            continue
+        if level == "category":
+            index, _ = build_index(category_vectors[live_ids], index_type, ids=live_ids, **params)
+        else:
+            index, _ = build_index(item_vectors, index_type, **params)
+        size = len(faiss.serialize_index(index))
+
+        start = time.perf_counter()
+        if level == "category":
+            _, indices = index.search(queries, 10)
+        else:
+            item_distances, item_indices = index.search(queries, FAISS_ITEM_CANDIDATES)
+            _, indices = rollup_items(item_distances, item_indices, parents, k=10)
+        ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        hits = np.mean([target in row for target, row in zip(targets, indices)])
+        print(f"{label:16s} {index.ntotal:8d} {size / index.ntotal:13.1f} {size / 2**20:9.2f} {ms:9.3f} {hits:7.1%}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,52 @@
+import os
+import time
+import random
+from multiprocessing import get_context
+from chatbot.config import FAISS_METADATA_PATH, FAISS_LEGACY_METADATA_PATH
+from chatbot.metadata_store import load_metadata, write_store
+
+NUM_LOOKUPS = 1000
+
+
+def rss_mb():
+    """Current resident memory of this process (Linux)."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def measure(path, queue):
+    """Runs in a fresh process: load time, RSS growth and the cost of decoding 10-row FAISS results."""
+    before = rss_mb()
+    start = time.perf_counter()
+    metadata_list = load_metadata(path)
+    load_ms = (time.perf_counter() - start) * 1000
+    loaded_rss = rss_mb() - before
+
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(NUM_LOOKUPS):
+        [metadata_list[rng.randrange(len(metadata_list))] for _ in range(10)]
+    lookup_us = (time.perf_counter() - start) / NUM_LOOKUPS * 1e6
+
+    queue.put((load_ms, loaded_rss, rss_mb() - before, lookup_us))
+
+
+def benchmark():
+    """Compares the legacy pickle with the memory-mapped columnar store in fresh processes."""
+    if not os.path.exists(FAISS_METADATA_PATH):
+        print(f"🔹 {FAISS_METADATA_PATH} not found, converting {FAISS_LEGACY_METADATA_PATH} for the comparison")
+        write_store(load_metadata(FAISS_LEGACY_METADATA_PATH), FAISS_METADATA_PATH)
+
+    context = get_context("spawn")
+    print(f"{'format':28s} {'load ms':>9s} {'RSS after load':>15s} {'RSS after lookups':>18s} {'10-row decode':>14s}")
+    for path in (FAISS_LEGACY_METADATA_PATH, FAISS_METADATA_PATH):
+        queue = context.Queue()
+        process = context.Process(target=measure, args=(path, queue))
+        process.start()
+        load_ms, loaded_rss, final_rss, lookup_us = queue.get()
+        process.join()
+        print(f"{path:28s} {load_ms:9.2f} {loaded_rss:12.1f} MB {final_rss:15.1f} MB {lookup_us:11.1f} µs")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,100 @@
+import sys
+import time
+import random
+import numpy as np
+from chatbot.config import STRUCTURED_TOP_N
+from chatbot.resources import get_resource
+from chatbot.entity_filters import parse_entity_filters
+from chatbot.menu_data import top_restaurants
+from chatbot.structured_db_search import filter_df
+
+NUMERIC_KEYS = ("price", "rating", "review_count")
+PRICE_TERMS = ["$", "$$", "under $$$", "$$ or less", "cheap", "expensive", "$$-$$$"]
+RATING_TERMS = ["4.5+ stars", "above 4", "at least 4.2", "top rated", "under 4"]
+REVIEW_TERMS = ["over 500 reviews", "at least 1000 reviews", "popular", "under 200 reviews"]
+ITEMS = ["pizza", "tacos", "burger", "salad", "ramen", "sandwich", "curry", "pasta"]
+
+
+def build_cases(count=50, seed=0):
+    """Dish queries combined with one to three numeric constraints."""
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        entities = {"location": [], "menu_item": [rng.choice(ITEMS)], "ingredient_name": []}
+        for key, terms in (("price", PRICE_TERMS), ("rating", RATING_TERMS), ("review_count", REVIEW_TERMS)):
+            if rng.random() < 0.6:
+                entities[key] = [rng.choice(terms)]
+        cases.append(entities)
+    return cases
+
+
+def reference_mask(df, filters):
+    """The same predicates as plain pandas comparisons over every row."""
+    mask = np.ones(len(df), dtype=bool)
+    if "price" in filters:
+        mask &= df["price"].astype(str).isin(filters["price"]).to_numpy()
+    for name in ("rating", "review_count"):
+        if name in filters:
+            low, high = filters[name]
+            values = df[name].to_numpy(dtype=float)
+            with np.errstate(invalid="ignore"):
+                mask &= (values >= low if low is not None else ~np.isnan(values))
+                mask &= (values <= high if high is not None else ~np.isnan(values))
+    return mask
+
+
+def results(entities):
+    rows = filter_df(get_resource("menu_data"), entities, "ingredient_discovery",
+                     token_index=get_resource("menu_token_index"), filter_index=get_resource("menu_filter_index"))
+    return rows, top_restaurants(rows, get_resource("restaurant_summary"), STRUCTURED_TOP_N)
+
+
+def benchmark(call_llm=False):
+    """
+    Compares structured results with and without the numeric filters: rows kept,
+    restaurants and prompt characters sent downstream, and (with --llm) response latency.
+    """
+    df = get_resource("menu_data")
+    filter_index = get_resource("menu_filter_index")
+
+    index_us, scan_us, stats = [], [], []
+    for entities in build_cases():
+        filters = parse_entity_filters(entities)
+        if not filters:
+            continue
+
+        start = time.perf_counter()
+        mask = filter_index.mask(filters)
+        index_us.append((time.perf_counter() - start) * 1e6)
+        start = time.perf_counter()
+        expected = reference_mask(df, filters)
+        scan_us.append((time.perf_counter() - start) * 1e6)
+        assert np.array_equal(mask, expected), f"Mask mismatch for {filters}"
+
+        unfiltered_rows, unfiltered = results({key: value for key, value in entities.items() if key not in NUMERIC_KEYS})
+        rows, filtered = results(entities)
+        assert expected[rows.index].all()
+        stats.append((len(unfiltered_rows), len(rows), len(unfiltered), len(filtered),
+                      len(str(unfiltered)), len(str(filtered)), entities, unfiltered, filtered))
+
+    stats_array = np.array([row[:6] for row in stats], dtype=float)
+    print(f"🔹 Predicate masks: index {np.median(index_us):.0f} µs, pandas comparisons {np.median(scan_us):.0f} µs (median)")
+    print(f"🔹 Matching rows:   {stats_array[:, 0].mean():8.1f} -> {stats_array[:, 1].mean():8.1f} per query")
+    print(f"🔹 Restaurants:     {stats_array[:, 2].mean():8.1f} -> {stats_array[:, 3].mean():8.1f} per query")
+    print(f"🔹 Prompt chars:    {stats_array[:, 4].mean():8.0f} -> {stats_array[:, 5].mean():8.0f} per query "
+          f"(~{(stats_array[:, 4] - stats_array[:, 5]).mean() / 4:.0f} tokens saved)")
+
+    if call_llm:
+        from chatbot.response_generator import generate_llm_response
+
+        timings = {"unfiltered": [], "filtered": []}
+        for *_, entities, unfiltered, filtered in stats[:10]:
+            for name, records in (("unfiltered", unfiltered), ("filtered", filtered)):
+                start = time.perf_counter()
+                generate_llm_response(f"Restaurants serving {entities['menu_item'][0]}", "ingredient_discovery", records)
+                timings[name].append(time.perf_counter() - start)
+        print(f"🔹 LLM response: {np.median(timings['unfiltered']):.2f}s -> {np.median(timings['filtered']):.2f}s (median)")
+
+
+if __name__ == "__main__":
+    benchmark(call_llm="--llm" in sys.argv)
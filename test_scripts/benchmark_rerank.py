@@ -0,0 +1,90 @@
+import time
+import numpy as np
+import chatbot.reranker as reranker
+import chatbot.faiss_search as faiss_search
+from chatbot.reranker import ScoreCache, document_text
+from chatbot.resources import registry, get_resource
+
+# (label, doc text mode, skip margin, candidate budget)
+CONFIGS = [
+    ("always rerank, name text", "name", None, 10),
+    ("adaptive, name text", "name", 0.25, 10),
+    ("adaptive, budget 5", "name", 0.25, 5),
+    ("adaptive, rich text", "rich", 0.25, 10),
+]
+
+QUERY_TEMPLATES = [
+    "Best {category} at {restaurant}",
+    "Where can I find {category}?",
+    "{item} near me",
+]
+
+
+def build_queries(count):
+    """Builds benchmark queries from the indexed restaurants, categories and items."""
+    queries = []
+    for doc in get_resource("faiss_metadata"):
+        if doc is None:
+            continue
+        item = doc["menu_items"][0] if doc["menu_items"] else doc["menu_category"]
+        for template in QUERY_TEMPLATES:
+            queries.append(template.format(category=doc["menu_category"], restaurant=doc["restaurant_name"], item=item))
+            if len(queries) == count:
+                return queries
+    return queries
+
+
+def configure(mode, margin, budget):
+    """Points the rerank stage at one configuration with an empty score cache."""
+    reranker.RERANK_DOC_TEXT = mode
+    reranker.RERANK_SKIP_MARGIN = margin
+    reranker.RERANK_MAX_CANDIDATES = budget
+    reranker.score_cache = ScoreCache(reranker.RERANK_CACHE_SIZE)
+
+    tokenizer = get_resource("reranker").tokenizer if mode == "rich" else None
+    start = time.perf_counter()
+    registry.set("rerank_documents", [
+        None if doc is None else document_text(doc, mode, tokenizer) for doc in get_resource("faiss_metadata")
+    ])
+    return (time.perf_counter() - start) * 1000
+
+
+def run(queries):
+    """Runs every query through search_faiss and collects the results and rerank infos."""
+    results, infos = [], []
+    for query in queries:
+        state = faiss_search.search_faiss({"input": query})
+        results.append(state["faiss_results"])
+        infos.append(state["rerank_info"])
+    return results, infos
+
+
+def overlap(results, reference):
+    keys = lambda docs: {(doc["restaurant_name"], doc["menu_category"]) for doc in docs}
+    return np.mean([len(keys(a) & keys(b)) / max(len(keys(b)), 1) for a, b in zip(results, reference)])
+
+
+def benchmark(total_queries=300):
+    """Reports rerank p50/p95 latency, skip rate, cache reuse and agreement with always-rerank."""
+    queries = build_queries(total_queries)
+    faiss_search.search_faiss_batch(queries[:1])  # Load models and indexes outside the timings
+
+    reference = None
+    print(f"{'config':28s} {'build ms':>9s} {'ran':>6s} {'p50 ms':>8s} {'p95 ms':>8s} {'warm p95':>9s} {'top-5 overlap':>14s}")
+    for label, mode, margin, budget in CONFIGS:
+        build_ms = configure(mode, margin, budget)
+        results, infos = run(queries)
+        _, warm_infos = run(queries)  # Same queries again: scores now come from the cache
+
+        latencies = [info["latency_ms"] for info in infos]
+        warm_latencies = [info["latency_ms"] for info in warm_infos]
+        ran = np.mean([info["ran"] for info in infos])
+        if reference is None:
+            reference = results
+
+        print(f"{label:28s} {build_ms:9.1f} {ran:6.0%} {np.percentile(latencies, 50):8.2f} "
+              f"{np.percentile(latencies, 95):8.2f} {np.percentile(warm_latencies, 95):9.2f} {overlap(results, reference):14.2f}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,39 @@
+import os
+import time
+import shutil
+import tempfile
+import pandas as pd
+from chatbot.config import MENU_DATA_PATH
+from chatbot.csv_snapshot import load_csv, snapshot_dir
+from chatbot.menu_data import load_menu_data, normalize_menu_data
+from test_scripts.benchmark_build_pipeline import replicate
+
+FACTORS = (1, 10, 100)
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000
+
+
+def benchmark():
+    """Start-up cost of the menu data: CSV parse + normalization vs the columnar snapshot, at 1x/10x/100x."""
+    source = pd.read_csv(MENU_DATA_PATH)
+    print(f"{'size':>5s} {'rows':>9s} {'CSV MB':>7s} {'csv ms':>8s} {'1st load ms':>12s} {'snapshot ms':>12s} {'speed-up':>9s}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for factor in FACTORS:
+            csv_path = os.path.join(tmp_dir, f"menu_{factor}x.csv")
+            replicate(source, factor).to_csv(csv_path, index=False)
+            shutil.rmtree(snapshot_dir(csv_path, "normalized"), ignore_errors=True)
+
+            csv_ms = timed(load_csv, csv_path, transform=normalize_menu_data, use_snapshot=False)
+            first_ms = timed(load_menu_data, csv_path)
+            snapshot_ms = min(timed(load_menu_data, csv_path) for _ in range(3))
+            print(f"{factor:>4d}x {factor * len(source):>9,d} {os.path.getsize(csv_path) / 1e6:7.1f} "
+                  f"{csv_ms:8.0f} {first_ms:12.0f} {snapshot_ms:12.0f} {csv_ms / snapshot_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark()
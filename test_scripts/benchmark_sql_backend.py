@@ -0,0 +1,42 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from chatbot.config import MENU_DATA_PATH, STRUCTURED_DB_PATH, STRUCTURED_TOP_N
+from chatbot.resources import get_resource
+from chatbot.menu_data import top_restaurants
+from chatbot.structured_db_search import filter_df
+from chatbot.sql_store import build_database, search_restaurants
+from test_scripts.test_token_index import build_cases
+
+
+def benchmark():
+    """Compares the pandas and SQLite structured backends: latency and top-N agreement."""
+    if not os.path.exists(STRUCTURED_DB_PATH):
+        build_database()
+    conn = get_resource("structured_db")
+    menu_data, token_index, summary = (get_resource(name) for name in ("menu_data", "menu_token_index", "restaurant_summary"))
+
+    pandas_ms, sql_ms, overlaps = [], [], []
+    for entities in build_cases(pd.read_csv(MENU_DATA_PATH)):
+        start = time.perf_counter()
+        rows = filter_df(menu_data, entities, "ingredient_discovery", token_index=token_index)
+        expected = top_restaurants(rows, summary, STRUCTURED_TOP_N)
+        pandas_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        actual = search_restaurants(conn, entities, STRUCTURED_TOP_N)
+        sql_ms.append((time.perf_counter() - start) * 1000)
+
+        expected_names = {record["restaurant_name"] for record in expected}
+        if expected_names:
+            overlaps.append(len(expected_names & {record["restaurant_name"] for record in actual}) / len(expected_names))
+
+    for name, latencies in (("pandas", pandas_ms), ("sqlite", sql_ms)):
+        print(f"{name:8s} p50 {np.percentile(latencies, 50):7.2f} ms   p95 {np.percentile(latencies, 95):7.2f} ms")
+    print(f"🔹 SQLite top-{STRUCTURED_TOP_N} overlap with pandas: {np.mean(overlaps):.1%} "
+          f"(FTS5 matches words and prefixes, pandas matches substrings)")
+
+
+if __name__ == "__main__":
+    benchmark()
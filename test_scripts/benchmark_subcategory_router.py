@@ -0,0 +1,86 @@
+import sys
+import time
+import numpy as np
+from chatbot.resources import get_resource
+from chatbot.structured_graph_search import QUERY_DICTIONARY, select_subcategory_slm
+from chatbot.subcategory_router import SUBCATEGORY_EXAMPLES
+
+# Held-out questions (none of them is a router example) with their expected subcategory
+EVALUATION_SET = [
+    ("ingredient_discovery", "Any good Korean restaurants in San Francisco?", "restaurant_search_based_on_cuisine_in_cities"),
+    ("ingredient_discovery", "Show French restaurants located in Chicago", "restaurant_search_based_on_cuisine_in_cities"),
+    ("ingredient_discovery", "Which Vietnamese restaurants are there in Houston and Dallas?", "restaurant_search_based_on_cuisine_in_cities"),
+    ("ingredient_discovery", "Which restaurants in San Francisco offer dishes with Impossible Meat?", "restaurant_search_based_on_ingredient"),
+    ("ingredient_discovery", "Find dishes that include jackfruit", "restaurant_search_based_on_ingredient"),
+    ("ingredient_discovery", "Where can I eat something with black garlic in it?", "restaurant_search_based_on_ingredient"),
+    ("ingredient_discovery", "Find restaurants in San Francisco that serve gluten-free pizza.", "dish_search_in_city"),
+    ("ingredient_discovery", "Where can I order dumplings in Seattle?", "dish_search_in_city"),
+    ("ingredient_discovery", "Which places in Boston serve clam chowder?", "dish_search_in_city"),
+    ("menu_innovation", "How many dishes use matcha?", "ingredient_use"),
+    ("menu_innovation", "How popular is gochujang as an ingredient in menu items?", "ingredient_use"),
+    ("menu_innovation", "How often do menus include cauliflower?", "ingredient_use"),
+    ("menu_innovation", "What new ingredients are restaurants experimenting with?", "trending_ingredients"),
+    ("menu_innovation", "Which ingredients are on the rise?", "trending_ingredients"),
+    ("menu_innovation", "Suggest trendy ingredients for an innovative menu", "trending_ingredients"),
+    ("trending_insights", "Which dishes are the most popular right now?", "popular_dishes"),
+    ("trending_insights", "What items show up on menus most often?", "popular_dishes"),
+    ("trending_insights", "What are people eating the most these days?", "popular_dishes"),
+    ("trending_insights", "Give me a summary of the latest trends in ingredients", "ingredient_trends"),
+    ("trending_insights", "Which ingredients appear most across all menus?", "ingredient_trends"),
+    ("trending_insights", "How has ingredient usage been trending?", "ingredient_trends"),
+    ("trending_insights", "Compare the average menu price of vegan restaurants in San Francisco vs. Mexican restaurants.", "price_comparison"),
+    ("trending_insights", "Are burgers pricier in Los Angeles than in Austin?", "price_comparison"),
+    ("trending_insights", "What do Indian dishes cost in Seattle compared to Boston?", "price_comparison"),
+    ("trending_insights", "Is Japanese food more popular than Chinese food in San Francisco?", "cuisine_popularity_comparison"),
+    ("trending_insights", "Which city has more Mexican restaurants, Austin or Houston?", "cuisine_popularity_comparison"),
+    ("trending_insights", "Compare how many pizza and burger restaurants there are in Chicago", "cuisine_popularity_comparison"),
+    ("reviews_analysis", "Which San Francisco restaurants have the best ratings?", "top_rated_restaurants"),
+    ("reviews_analysis", "Top rated brunch places in Austin", "top_rated_restaurants"),
+    ("reviews_analysis", "Who has the highest star rating in Chicago?", "top_rated_restaurants"),
+    ("reviews_analysis", "Which restaurants in Boston are reviewed the most?", "most_reviewed_restaurants"),
+    ("reviews_analysis", "Most popular restaurants by number of reviews in Seattle", "most_reviewed_restaurants"),
+    ("reviews_analysis", "Which places in New York have thousands of reviews?", "most_reviewed_restaurants"),
+]
+
+
+def evaluate(call_slm=False):
+    """
+    Routing accuracy on EVALUATION_SET: nearest-example top-1, how many
+    questions clear the confidence thresholds and how accurate those are,
+    and (with --slm) the SLM and router + SLM fallback accuracy and latency.
+    """
+    for intent, subcategories in SUBCATEGORY_EXAMPLES.items():
+        assert set(subcategories) == set(QUERY_DICTIONARY[intent]), f"Examples do not cover {intent}"
+
+    router = get_resource("subcategory_router")
+    rows = []
+    for intent, question, expected in EVALUATION_SET:
+        start = time.perf_counter()
+        subcategory, info = router.route(intent, question)
+        rows.append((expected, info["subcategory"], subcategory, (time.perf_counter() - start) * 1000))
+
+    top1 = np.mean([expected == best for expected, best, _, _ in rows])
+    confident = [(expected, chosen) for expected, _, chosen, _ in rows if chosen]
+    print(f"🔹 Router top-1 accuracy:       {top1:.1%} ({len(rows)} questions)")
+    print(f"🔹 Above the thresholds:        {len(confident) / len(rows):.1%}, "
+          f"{np.mean([e == c for e, c in confident]) if confident else 0:.1%} of them correct")
+    print(f"⏱️ Router latency:              p50 {np.percentile([row[3] for row in rows], 50):.2f} ms")
+    for expected, best, chosen, _ in rows:
+        if best != expected:
+            print(f"   ❌ expected {expected}, nearest {best}{'' if chosen else ' (below threshold)'}")
+
+    if call_slm:
+        slm_correct, combined_correct, slm_ms = [], [], []
+        for (intent, question, expected), (_, _, chosen, _) in zip(EVALUATION_SET, rows):
+            start = time.perf_counter()
+            answer = select_subcategory_slm(intent, question)
+            slm_ms.append((time.perf_counter() - start) * 1000)
+            slm_correct.append(answer == expected)
+            combined_correct.append((chosen or answer) == expected)
+        print(f"🔹 SLM accuracy:                {np.mean(slm_correct):.1%}, p50 {np.percentile(slm_ms, 50):.0f} ms")
+        print(f"🔹 Router + SLM fallback:       {np.mean(combined_correct):.1%}, "
+              f"{len(rows) - len(confident)} of {len(rows)} SLM calls")
+
+
+if __name__ == "__main__":
+    evaluate(call_slm="--slm" in sys.argv)
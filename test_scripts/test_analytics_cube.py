@@ -0,0 +1,63 @@
+import time
+import random
+import numpy as np
+import chatbot.menu_data  # noqa: F401 (registers the menu_data resource)
+from chatbot.resources import get_resource
+from chatbot.analytics_cube import AnalyticsCube, PRICE_ORDINALS, ALL
+
+
+def cell_reference(df, city, menu_category, category):
+    """Aggregates one cell straight from the menu rows."""
+    rows = df.astype(object)
+    if city != ALL:
+        rows = rows[rows["city"] == city]
+    if menu_category != ALL:
+        rows = rows[rows["menu_category"] == menu_category]
+    if category != ALL:
+        rows = rows[rows["categories"].apply(lambda value: category in [part.strip() for part in value.split("|")])]
+    if rows.empty:
+        return None
+
+    restaurants = {}
+    for (name, row_city), group in rows.groupby(["restaurant_name", "city"]):
+        locations = df[(df["restaurant_name"] == name) & (df["city"] == row_city)].astype(object).drop_duplicates("address1")
+        restaurants[name, row_city] = (
+            locations["price"].map(PRICE_ORDINALS).astype(float).mean(),
+            locations["rating"].astype(float).mean(),
+            locations["review_count"].astype(float).sum(),
+        )
+    prices, ratings, reviews = (np.array(values) for values in zip(*restaurants.values()))
+    return len(restaurants), round(float(np.nanmean(prices)), 2), round(float(np.nanmean(ratings)), 2), int(reviews.sum())
+
+
+def test_analytics_cube(samples=30, seed=0):
+    """Checks random cube cells (and rollups) against a direct aggregation, and times lookups."""
+    df = get_resource("menu_data")
+    start = time.perf_counter()
+    cube = AnalyticsCube(df)
+    print(f"🔹 Built {len(cube.cells)} cells in {time.perf_counter() - start:.2f}s")
+
+    rng = random.Random(seed)
+    keys = rng.sample(sorted(cube.cells), samples)
+    for key in keys:
+        cell = cube.cell(*key)
+        expected = cell_reference(df, *key)
+        actual = (cell["restaurants"], cell["mean_price_tier"], cell["mean_rating"], cell["total_reviews"])
+        assert actual == expected, f"Mismatch for {key}: {actual} vs {expected}"
+
+    # Unresolved cuisines and empty questions fall through to the graph / FAISS search
+    assert cube.compare({"menu_item": ["xyzzy"]}) == []
+    assert cube.compare({"location": ["San Francisco"], "menu_category": ["xyzzy"]}) == []
+    assert cube.compare({}) == []
+    assert [record["location"] for record in cube.compare({"location": ["San Francisco"]})] == ["san francisco"]
+    assert cube.compare({"menu_category": ["Mexican", "xyzzy"]})
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        cube.compare({"location": ["San Francisco"], "menu_category": ["Mexican", "Italian"]})
+    print(f"🔹 compare(): {(time.perf_counter() - start) * 1000:.1f} µs per query")
+    print("✅ Analytics cube test completed!")
+
+
+if __name__ == "__main__":
+    test_analytics_cube()
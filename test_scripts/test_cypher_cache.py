@@ -0,0 +1,113 @@
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+from chatbot.cypher_cache import CypherTemplateCache, query_signature, parameterize
+
+# (question, entities, generated Cypher) as the LLM writes them for the first question of a shape
+GENERATED = [
+    (
+        "Which restaurants in San Francisco serve tacos?",
+        {"location": ["San Francisco", "SF"], "menu_item": ["tacos", "taco"]},
+        """MATCH (r:Restaurant)-[:SERVES]->(:MenuCategory)-[:HAS_ITEM]->(m:MenuItem)
+           WHERE toLower(r.city) = "san francisco" AND (toLower(m.name) CONTAINS "tacos" OR toLower(m.name) CONTAINS "taco")
+           RETURN r.name AS restaurant, collect(m.name) AS items LIMIT 20""",
+    ),
+    (
+        "What are the top rated restaurants in San Francisco?",
+        {"location": ["San Francisco"]},
+        """MATCH (r:Restaurant) WHERE r.city = 'San Francisco'
+           RETURN r.name AS restaurant, r.rating AS rating ORDER BY rating DESC LIMIT 10""",
+    ),
+    (
+        "Which dishes use saffron?",
+        {"ingredient_name": ["saffron"]},
+        """MATCH (m:MenuItem) OPTIONAL MATCH (m)-[:CONTAINS]->(i:Ingredient)
+           WHERE toLower(i.name) CONTAINS "saffron" OR toLower(m.description) CONTAINS "crocus"
+           RETURN m.name AS dish LIMIT 20""",
+    ),
+]
+
+# Later questions: (question, entities, expected parameters of the reused template, or None for a miss)
+LATER = [
+    ("Which restaurants in Austin serve ramen?", {"location": ["Austin"], "menu_item": ["ramen"]},
+     {"location_0": "austin", "menu_item_0": "ramen", "menu_item_syn_0": "ramen"}),
+    ("which restaurants in new york serve pizza", {"location": ["New York", "NYC"], "menu_item": ["pizza", "flatbread"]},
+     {"location_0": "new york", "menu_item_0": "pizza", "menu_item_syn_0": "flatbread"}),
+    ("What are the top rated restaurants in Chicago?", {"location": ["Chicago"]}, {"location_0__title": "Chicago"}),
+    ("Which dishes use basil?", {"ingredient_name": ["basil"]}, None),  # "crocus" was an LLM synonym: not cached
+    ("Which restaurants serve tacos in Austin?", {"location": ["Austin"], "menu_item": ["tacos"]}, None),  # Other shape
+]
+
+
+def test_cypher_cache():
+    cache = CypherTemplateCache("test prompt", path=None)
+    for question, entities, cypher in GENERATED:
+        stored = cache.store(question, entities, cypher, llm_ms=1500.0)
+        print(f"🔹 {query_signature(question, entities)[0]!r}: {'cached' if stored else 'not reusable'}")
+
+    for question, entities, expected in LATER:
+        template, parameters, _ = cache.lookup(question, entities)
+        if expected is None:
+            assert template is None, f"Unexpected hit for {question!r}"
+            continue
+        assert template is not None, f"Expected a hit for {question!r}"
+        assert all(parameters[name] == value for name, value in expected.items()), (question, parameters)
+        assert "tacos" not in template and "San Francisco" not in template
+    print("✅ Same-shape questions reuse the template with their own parameters")
+    print("🔹 Cache stats:", cache.stats())
+
+
+def test_persistence():
+    """Evictions survive a restart, the file stays bounded and placeholder names are not fixed words."""
+    path = os.path.join(tempfile.mkdtemp(prefix="cypher_cache_"), "templates.jsonl")
+    question, entities, cypher = GENERATED[0]
+    cache = CypherTemplateCache("test prompt", capacity=2, path=path)
+    cache.store(question, entities, cypher, llm_ms=1500.0)
+    cache.evict(query_signature(question, entities)[0])
+    assert CypherTemplateCache("test prompt", capacity=2, path=path).lookup(question, entities)[0] is None
+
+    for city in ("Austin", "Boston", "Denver", "Miami", "Tampa"):
+        cache.store(question.replace("San Francisco", city), {**entities, "location": [city]},
+                    cypher.replace("san francisco", city.lower()), llm_ms=1500.0)
+    with open(path, encoding="utf-8") as f:
+        assert len(f.readlines()) <= 2 * cache.capacity
+    restarted = CypherTemplateCache("test prompt", capacity=2, path=path)
+    assert restarted.lookup(question, entities)[0] is not None
+    print("✅ Evictions are persisted and the cache file is compacted")
+
+    signature, slots = query_signature(question, entities)
+    made_up = cypher.replace('"taco"', '"menu item"')  # Words of the <menu_item> placeholder, not of the question
+    assert parameterize(made_up, signature, slots, {})[0] is None
+    print("✅ Placeholder names are not treated as words of the question")
+
+
+def benchmark_live(rounds=2):
+    """Runs question variants through the real LLM + Neo4j path and reports hit rate and latency."""
+    from chatbot.entity_extraction import extract_entities
+    from chatbot.llm_graph_search import query_knowledge_graph
+    from chatbot.resources import get_resource
+
+    shapes = ["Which restaurants in {city} serve {dish}?", "Which dishes in {city} use {ingredient}?"]
+    values = [("San Francisco", "tacos", "saffron"), ("New York", "pizza", "basil"), ("Chicago", "ramen", "tofu")]
+    latencies = {True: [], False: []}
+    for round_number in range(rounds):
+        for city, dish, ingredient in values:
+            for shape in shapes:
+                state = extract_entities({"input": shape.format(city=city, dish=dish, ingredient=ingredient), "intent": "fallback"})
+                start = time.perf_counter()
+                state = query_knowledge_graph(state)
+                latencies[state["cypher_cache_info"]["hit"]].append((time.perf_counter() - start) * 1000)
+
+    for hit, values_ms in latencies.items():
+        if values_ms:
+            print(f"⏱️ {'cache hit' if hit else 'LLM':9s} p50 {np.percentile(values_ms, 50):8.1f} ms over {len(values_ms)} requests")
+    print("🔹 Cache stats:", get_resource("cypher_cache").stats())
+
+
+if __name__ == "__main__":
+    test_cypher_cache()
+    test_persistence()
+    if "--llm" in sys.argv:
+        benchmark_live()
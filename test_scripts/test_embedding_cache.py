@@ -0,0 +1,99 @@
+import os
+import time
+import tempfile
+import threading
+import numpy as np
+from langchain_huggingface import HuggingFaceEmbeddings
+from chatbot.config import EMBEDDING_MODEL_NAME
+from chatbot.embedding_cache import EmbeddingCache
+
+embedding_model = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+
+
+def timed_embed(cache, query):
+    start = time.perf_counter()
+    vector = cache.embed(query)
+    return vector, (time.perf_counter() - start) * 1000
+
+
+def test_embedding_cache():
+    """Checks memory hits, disk hits after a restart, and invalidation on model change."""
+    cache_dir = tempfile.mkdtemp(prefix="query_embeddings_")
+    queries = ["Best sushi in New York", "best  sushi in new york ", "Healthy vegan salads"]
+
+    cache = EmbeddingCache(embedding_model.embed_query, EMBEDDING_MODEL_NAME, cache_dir)
+    for query in queries:
+        _, elapsed = timed_embed(cache, query)
+        print(f"🔹 {query!r}: {elapsed:.2f} ms")
+    print("📊 First run:", cache.stats())
+    assert cache.misses == 2 and cache.memory_hits == 1
+
+    # A fresh instance simulates a process restart and must be served from disk
+    restarted = EmbeddingCache(embedding_model.embed_query, EMBEDDING_MODEL_NAME, cache_dir)
+    vector, elapsed = timed_embed(restarted, queries[0])
+    print(f"🔹 After restart: {elapsed:.2f} ms")
+    print("📊 Restarted:", restarted.stats())
+    assert restarted.disk_hits == 1 and restarted.misses == 0
+    assert np.allclose(vector, cache.embed(queries[0]))
+
+    # A crash between the two writes leaves an orphan vector row or an orphan key line;
+    # keys stored after the restart must still get their own vectors
+    with open(restarted._vectors_path, "ab") as f:
+        f.write(np.zeros(restarted._dim, dtype=np.float32).tobytes())
+    recovered = EmbeddingCache(embedding_model.embed_query, EMBEDDING_MODEL_NAME, cache_dir)
+    new_vector = recovered.embed("Late night tacos")
+    with open(recovered._keys_path, "a", encoding="utf-8") as f:
+        f.write('[999, "orphan key"]\n')
+    recovered = EmbeddingCache(embedding_model.embed_query, EMBEDDING_MODEL_NAME, cache_dir)
+    last_vector = recovered.embed("Spicy ramen")
+    recovered = EmbeddingCache(embedding_model.embed_query, EMBEDDING_MODEL_NAME, cache_dir)
+    assert np.allclose(recovered.embed("Late night tacos"), new_vector)
+    assert np.allclose(recovered.embed("Spicy ramen"), last_vector)
+    assert np.allclose(recovered.embed(queries[0]), vector)
+    assert recovered.misses == 0 and "orphan key" not in recovered._disk_rows
+
+    # Changing the model name must drop the stored vectors
+    other_model = EmbeddingCache(embedding_model.embed_query, "some-other-model", cache_dir)
+    assert other_model.stats()["disk_entries"] == 0
+
+    print("✅ Embedding cache test completed!")
+
+
+def test_shared_disk_tier(writers=4, queries_per_writer=50):
+    """Several caches (standing in for processes) appending to one directory, then a capped, compacted restart."""
+    cache_dir = tempfile.mkdtemp(prefix="query_embeddings_shared_")
+    dim = 8
+
+    def embed(text):
+        return np.random.default_rng(abs(hash(text)) % 2**32).random(dim, dtype=np.float32)
+
+    def write(writer):
+        cache = EmbeddingCache(embed, EMBEDDING_MODEL_NAME, cache_dir)
+        for i in range(queries_per_writer):
+            cache.embed(f"writer {writer} query {i}")
+
+    threads = [threading.Thread(target=write, args=(writer,)) for writer in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    restarted = EmbeddingCache(embed, EMBEDDING_MODEL_NAME, cache_dir)
+    assert len(restarted._disk_rows) == writers * queries_per_writer
+    for key in restarted._disk_rows:
+        assert np.allclose(restarted._read_disk(key), embed(key)), f"{key!r} returned another query's vector"
+    print("✅ Concurrent writers keep every key on its own vector")
+
+    capped = EmbeddingCache(embed, EMBEDDING_MODEL_NAME, cache_dir, disk_capacity=100)
+    capped.embed("one more query")
+    reopened = EmbeddingCache(embed, EMBEDDING_MODEL_NAME, cache_dir, disk_capacity=100)
+    assert len(reopened._disk_rows) == 50 and "one more query" in reopened._disk_rows
+    assert os.path.getsize(reopened._vectors_path) == 50 * 4 * dim
+    for key in reopened._disk_rows:
+        assert np.allclose(reopened._read_disk(key), embed(key))
+    print("✅ Past its capacity the disk tier is compacted to the newest rows")
+
+
+if __name__ == "__main__":
+    test_embedding_cache()
+    test_shared_disk_tier()
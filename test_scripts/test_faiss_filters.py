@@ -0,0 +1,51 @@
+import faiss
+import numpy as np
+from chatbot.entity_filters import parse_entity_filters
+from chatbot.faiss_filters import MetadataFilterIndex, filtered_search
+
+METADATA = [
+    {"city": "San Francisco", "state": "CA", "price": "$$", "rating": 4.5},
+    {"city": "San Francisco", "state": "CA", "price": "$", "rating": 3.5},
+    {"city": "Chicago", "state": "IL", "price": "$$$", "rating": 4.0},
+    None,  # Group removed by an incremental build
+    {"city": "Austin", "state": "TX", "price": "$$", "rating": 4.8},
+]
+
+
+def search(filter_index, index, vectors, query, entities):
+    """What search_faiss_batch does: filtered search when there is a mask, plain search otherwise."""
+    mask = filter_index.mask(parse_entity_filters(entities))
+    if mask is None:
+        _, indices = index.search(query, 3)
+    else:
+        _, indices = filtered_search(index, query, mask, 3, vectors=vectors)
+    return [int(idx) for idx in indices[0] if idx != -1]
+
+
+def test_faiss_filters():
+    """Unknown filter values are ignored instead of excluding every document."""
+    filter_index = MetadataFilterIndex(METADATA)
+    rng = np.random.default_rng(0)
+    vectors = rng.random((len(METADATA), 8), dtype=np.float32)
+    index = faiss.IndexIDMap(faiss.IndexFlatL2(8))
+    ids = np.array([faiss_id for faiss_id, doc in enumerate(METADATA) if doc is not None], dtype=np.int64)
+    index.add_with_ids(vectors[ids], ids)
+    query = rng.random((1, 8), dtype=np.float32)
+
+    assert set(search(filter_index, index, vectors, query, {"location": ["San Francisco"]})) == {0, 1}
+    assert filter_index.mask(parse_entity_filters({"location": ["bay area"]})) is None
+    assert len(search(filter_index, index, vectors, query, {"location": ["bay area"]})) == 3
+    print("✅ An unknown location falls back to the unfiltered search")
+
+    mask = filter_index.mask(parse_entity_filters({"location": ["bay area", "Chicago"]}))
+    assert np.flatnonzero(mask).tolist() == [2]
+    mask = filter_index.mask(parse_entity_filters({"location": ["Atlantis"], "price": ["$$"]}))
+    assert np.flatnonzero(mask).tolist() == [0, 4]
+    print("✅ Unknown values are dropped, the known ones still filter")
+
+    assert filter_index.mask(parse_entity_filters({"location": ["Chicago"], "price": ["$"]})) is None
+    print("✅ Filters that exclude every document fall back to the unfiltered search")
+
+
+if __name__ == "__main__":
+    test_faiss_filters()
@@ -0,0 +1,73 @@
+import sys
+import time
+import subprocess
+import numpy as np
+from chatbot.memory_graph import MemoryGraph
+from chatbot.sql_store import read_tables
+from chatbot.structured_graph_search import QUERY_DICTIONARY, construct_query
+
+ENTITIES = {
+    "location": ["San Francisco"],
+    "menu_item": ["Burrito", "pizza"],
+    "ingredient_name": ["cheese"],
+    "menu_category": ["Desserts", "burgers"],
+}
+
+
+def test_memory_graph():
+    """Checks a few templates against pandas over the same tables and times every template."""
+    tables = read_tables(normalize=False)
+    start = time.perf_counter()
+    graph = MemoryGraph(tables)
+    print(f"🔹 Built in-memory graph in {time.perf_counter() - start:.2f}s")
+
+    restaurants = tables["restaurants"]
+    items = tables["menu_items"].merge(tables["menus"], on="menu_id").merge(restaurants, on="restaurant_id")
+    ingredients = tables["ingredients"].assign(ingredient_name=tables["ingredients"]["ingredient_name"].str.strip())
+
+    # dish_search_in_city: exact (case-insensitive) item names in the city
+    query, parameters = construct_query("ingredient_discovery", "dish_search_in_city", ENTITIES)
+    actual = {record["restaurant"]: sorted(record["dishes"]) for record in graph.run(query, parameters).data()}
+    rows = items[items["menu_item"].str.lower().isin(parameters["menu_items"]) & items["city"].str.lower().isin(parameters["locations"])]
+    expected = {name: sorted(group["menu_item"]) for name, group in rows.groupby("restaurant_name")}
+    assert actual == {name: expected[name] for name in actual} and len(actual) == min(15, len(expected))
+
+    # ingredient_use: CONTAINS edges per ingredient
+    query, parameters = construct_query("menu_innovation", "ingredient_use", ENTITIES)
+    counts = ingredients["ingredient_name"].value_counts()
+    for record in graph.run(query, parameters).data():
+        assert record["mentions"] == counts[record["ingredient"]]
+
+    # top_rated_restaurants: ratings descending within the city
+    query, parameters = construct_query("reviews_analysis", "top_rated_restaurants", ENTITIES)
+    ratings = [record["rating"] for record in graph.run(query, parameters).data()]
+    in_city = restaurants[restaurants["city"].str.lower() == "san francisco"]["rating"].sort_values(ascending=False)
+    assert ratings == in_city.head(10).tolist()
+
+    print(f"{'template':48s} {'records':>7s} {'µs':>9s}")
+    for intent, queries in QUERY_DICTIONARY.items():
+        for name in queries:
+            query, parameters = construct_query(intent, name, ENTITIES)
+            latencies = []
+            for _ in range(20):
+                start = time.perf_counter()
+                records = graph.run(query, parameters).data()
+                latencies.append((time.perf_counter() - start) * 1e6)
+            print(f"{name:48s} {len(records):7d} {np.median(latencies):9.0f}")
+
+    # GRAPH_BACKEND = "memory" through the resource the workflow uses, in a fresh
+    # interpreter so nothing imported here registers the memory graph for it
+    check = ("import chatbot.structured_graph_search as search; search.GRAPH_BACKEND = 'memory'; "
+             "from chatbot.resources import get_resource; "
+             "query, parameters = search.construct_query('reviews_analysis', 'top_rated_restaurants', "
+             "{'location': ['San Francisco']}); "
+             "print(type(get_resource('structured_graph')).__name__, "
+             "len(get_resource('structured_graph').run(query, parameters).data()))")
+    output = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, check=True).stdout
+    assert output.strip().splitlines()[-1].startswith("MemoryGraph "), output
+    print("✅ get_resource('structured_graph') serves the memory graph")
+    print("✅ Memory graph test completed!")
+
+
+if __name__ == "__main__":
+    test_memory_graph()
@@ -0,0 +1,114 @@
+import time
+import pandas as pd
+from chatbot.config import MENU_DATA_PATH
+from chatbot.resources import get_resource
+from chatbot.config import STRUCTURED_TOP_N
+from chatbot.structured_db_search import query_database
+from test_scripts.test_token_index import filter_df_scan, build_cases
+
+# Fields of the former per-restaurant aggregation and the record fields that now hold them
+MATCHED_FIELDS = {"menu_item": "matched_items", "menu_description": "matched_descriptions",
+                  "ingredient_name": "matched_ingredients"}
+
+
+def aggregate_restaurant_data(df):
+    """The former aggregation of the matching rows: one row per restaurant, list fields deduplicated."""
+    aggregation_rules = {
+        "menu_item": lambda x: list(set(x.dropna())),
+        "menu_description": lambda x: list(set(x.dropna())),
+        "menu_category": lambda x: list(set(x.dropna())),
+        "categories": lambda x: list(set(x.dropna())),
+        "ingredient_name": lambda x: list(set(x.dropna())),
+        "address1": "first",
+        "city": "first",
+        "zip_code": "first",
+        "country": "first",
+        "state": "first",
+        "rating": "mean",
+        "review_count": "sum",
+        "price": lambda x: list(set(x.dropna()))
+    }
+    return df.groupby("restaurant_name").agg(aggregation_rules).reset_index()
+
+
+def query_database_reference(df, entities):
+    """The previous query_database: normalize the raw CSV, scan it row by row, then aggregate."""
+    filtered_df = filter_df_scan(df, entities)
+    if filtered_df.empty:
+        return None
+    grouped_df = aggregate_restaurant_data(filtered_df)
+    return grouped_df.to_dict(orient="records") if not grouped_df.empty else None
+
+
+def distinct(values):
+    return sorted(set(map(str, values)) - {"nan"})
+
+
+def check_against_reference(records, expected):
+    """Every returned restaurant was in the former results, with the same matched rows and location."""
+    if expected is None:
+        assert records is None
+        return
+    reference = {record["restaurant_name"]: record for record in expected}
+    for record in records:
+        previous = reference[record["restaurant_name"]]
+        for field, key in MATCHED_FIELDS.items():
+            assert record[key] == distinct(previous[field]), f"{key} differs for {record['restaurant_name']}"
+        assert (record["city"], record["state"]) == (previous["city"], previous["state"])
+        assert set(distinct(previous["menu_category"])) <= set(record["menu_category"])
+
+
+def check_top_restaurants(records, match_counts):
+    """The results are the restaurants with the most matching rows, most matches first."""
+    if match_counts.empty:
+        assert records is None
+        return
+    names = [record["restaurant_name"] for record in records]
+    counts = [match_counts[name] for name in names]
+    assert len(names) == min(STRUCTURED_TOP_N, len(match_counts))
+    assert counts == sorted(counts, reverse=True)
+    others = match_counts.drop(names)
+    assert others.empty or counts[-1] >= others.max()
+
+
+def test_menu_data():
+    """Checks that query_database over the shared menu data returns what the per-request pipeline did."""
+    raw_df = pd.read_csv(MENU_DATA_PATH)
+    menu_data = get_resource("menu_data")
+    get_resource("menu_token_index")
+    get_resource("restaurant_summary")
+    print(f"🔹 Raw frame {raw_df.memory_usage(deep=True).sum() / 1e6:.1f} MB, "
+          f"shared normalized frame {menu_data.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+
+    reference_seconds = shared_seconds = 0.0
+    cases = build_cases(raw_df)
+    for entities in cases:
+        start = time.perf_counter()
+        expected = query_database_reference(raw_df, entities)
+        reference_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = query_database({"entities": entities, "intent": "ingredient_discovery"})["structured_results"]
+        shared_seconds += time.perf_counter() - start
+
+        check_against_reference(actual, expected)
+
+    print(f"🔹 {len(cases)} queries: per-request pipeline {reference_seconds / len(cases) * 1000:.1f} ms, "
+          f"shared menu data + summaries {shared_seconds / len(cases) * 1000:.1f} ms per query")
+    print("✅ Menu data test completed!")
+
+
+def test_top_restaurants():
+    """Checks that the top-N summaries are the restaurants with the most matching rows."""
+    raw_df = pd.read_csv(MENU_DATA_PATH)
+    for entities in build_cases(raw_df):
+        rows = filter_df_scan(raw_df, entities)
+        match_counts = rows["restaurant_name"].value_counts() if not rows.empty else pd.Series(dtype=int)
+        records = query_database({"entities": entities, "intent": "ingredient_discovery"})["structured_results"]
+        check_top_restaurants(records, match_counts)
+    print("✅ Top restaurants test completed!")
+
+
+if __name__ == "__main__":
+    test_menu_data()
+    test_top_restaurants()
@@ -0,0 +1,75 @@
+import time
+import random
+import pandas as pd
+from chatbot.config import MENU_DATA_PATH
+from chatbot.structured_db_search import filter_df, normalize_text_columns
+from chatbot.token_index import TrigramIndex
+
+
+def filter_df_scan(df, entities):
+    """The previous ingredient_discovery filter: a row-wise regex over every column."""
+    df = normalize_text_columns(df)
+    if entities.get("location"):
+        df = df[df["city"].str.lower().isin([loc.lower() for loc in entities["location"]])]
+    for key in ("menu_item", "ingredient_name"):
+        if entities.get(key):
+            search_pattern = '|'.join(entities[key])
+            df = df[df.apply(lambda row: row.astype(str).str.contains(search_pattern, case=False, na=False).any(), axis=1)]
+    return df
+
+
+def build_cases(df, count=40, seed=0):
+    """Entity sets mixing real items and ingredients, word fragments, short terms and regexes."""
+    rng = random.Random(seed)
+    items = df["menu_item"].dropna().tolist()
+    ingredients = df["ingredient_name"].dropna().tolist()
+    cases = [
+        {"menu_item": ["pizza"], "ingredient_name": ["cheese", "Mozzarella"]},
+        {"menu_item": ["Tres Leches", "tacos"], "ingredient_name": []},
+        {"menu_item": ["ham"], "ingredient_name": ["gluten-free", "GF"]},
+        {"menu_item": ["pi"], "ingredient_name": ["4.5"]},
+        {"menu_item": ["burger|sandwich"], "ingredient_name": ["(beef|pork)"]},
+        {"menu_item": ["zzzz-not-a-dish"], "ingredient_name": []},
+        {"location": ["San Francisco"], "menu_item": ["salad"], "ingredient_name": ["kale"]},
+        {"location": ["Chicago"], "menu_item": ["salad"], "ingredient_name": []},
+    ]
+    for _ in range(count):
+        item = rng.choice(items).split()
+        cases.append({
+            "menu_item": [rng.choice(item)[:rng.randint(3, 10)]],
+            "ingredient_name": [rng.choice(ingredients).split()[0]] if rng.random() < 0.5 else [],
+        })
+    return cases
+
+
+def test_token_index():
+    """Checks that filter_df returns exactly the rows of the row-wise scan, and compares timings."""
+    df = pd.read_csv(MENU_DATA_PATH)
+
+    start = time.perf_counter()
+    token_index = TrigramIndex(normalize_text_columns(df))
+    print(f"🔹 Built trigram index over {token_index.num_values} distinct values in {time.perf_counter() - start:.2f}s")
+
+    scan_seconds = index_seconds = 0.0
+    cases = build_cases(df)
+    for entities in cases:
+        start = time.perf_counter()
+        expected = filter_df_scan(df, entities)
+        scan_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = filter_df(df, entities, "ingredient_discovery", token_index=token_index)
+        index_seconds += time.perf_counter() - start
+
+        # Empty results may differ in dtypes after the row-wise apply, so compare the rows themselves
+        same = actual.index.equals(expected.index) and (actual.empty or actual.equals(expected))
+        assert same, f"Mismatch for {entities}: {len(actual)} vs {len(expected)} rows"
+
+    print(f"🔹 {len(cases)} queries: row-wise scan {scan_seconds / len(cases) * 1000:.1f} ms, "
+          f"token index {index_seconds / len(cases) * 1000:.2f} ms per query "
+          f"({scan_seconds / index_seconds:.0f}x)")
+    print("✅ Token index test completed!")
+
+
+if __name__ == "__main__":
+    test_token_index()
@@ -0,0 +1,93 @@
+import time
+import pandas as pd
+from collections import Counter
+from chatbot.config import MENU_DATA_PATH
+from chatbot.csv_snapshot import load_csv
+from chatbot.trending_aggregates import TrendingAggregates, TEMPLATES, match_template
+
+
+def recount(df, city=None, category=None):
+    """What the Cypher templates compute on every request: a full pass over the menu rows."""
+    rows = df.astype(str).apply(lambda column: column.str.lower().str.strip())
+    if city:
+        rows = rows[rows["city"] == city]
+    if category:
+        categories = rows["categories"].str.split("|").apply(lambda values: {value.strip() for value in values})
+        rows = rows[categories.apply(lambda values: category in values) | (rows["menu_category"] == category)]
+    ingredients = Counter()
+    for value in rows["ingredient_name"]:
+        ingredients.update({name.strip() for name in value.split(",")} - {"", "nan"})
+    return {"ingredients": ingredients, "dishes": Counter(rows["menu_item"])}
+
+
+def check(aggregates, df, city=None, category=None):
+    expected = recount(df, city, category)
+    for kind in ("ingredients", "dishes"):
+        counts = dict(aggregates.top(kind, city or "*", category or "*"))
+        assert counts == dict(expected[kind]), f"{kind} mismatch for city={city} category={category}"
+
+
+# (question, query parameters, expected template or None for the LLM)
+QUESTIONS = [
+    ("How often is avocado used in dishes?", {"ingredients": ["avocado"]}, "ingredient_use"),
+    ("How many menu items contain kimchi?", {"ingredients": ["kimchi"]}, "ingredient_use"),
+    ("Which dishes use saffron?", {"ingredients": ["saffron"]}, None),
+    ("What are the most popular dishes with truffle?", {"ingredients": ["truffle"]}, None),
+    ("What ingredients are trending right now?", {}, "ingredient_trends"),
+    ("What are the most popular dishes?", {}, "popular_dishes"),
+    ("Is sushi more expensive than tacos?", {}, None),
+    ("Which taco dishes are most popular in LA?", {"menu_items": ["tacos"], "locations": ["la"]}, None),
+    ("What vegan menu items are trending?", {}, None),
+    ("Which restaurants serve birria dishes?", {"menu_items": ["birria"]}, None),
+    ("Which restaurants serve birria dishes?", {}, None),
+]
+
+
+def test_match_template():
+    for question, parameters, expected in QUESTIONS:
+        assert match_template(question, parameters) == expected, question
+    print("✅ Only generic trend and ingredient usage questions are answered from the counts")
+
+
+def test_trending_aggregates():
+    df = load_csv(MENU_DATA_PATH)
+
+    start = time.perf_counter()
+    aggregates = TrendingAggregates()
+    aggregates.refresh(df)
+    print(f"🔹 Materialized {len(aggregates.groups)} groups in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    check(aggregates, df)
+    city = df["city"].str.lower().mode()[0]
+    for category in ("mexican", "desserts", "pizza"):
+        check(aggregates, df, city=city, category=category)
+    print("✅ Overall and per city / category counts match a full recount")
+
+    # Rows added by the ingestion pipeline: only the new / changed groups are recounted
+    added = df.sample(200, random_state=0).assign(restaurant_name=lambda x: x["restaurant_name"] + " (new)")
+    changed = df.copy()
+    changed.loc[changed.index[:5], "ingredient_name"] = "saffron, garlic"
+    updated = pd.concat([changed, added], ignore_index=True)
+    start = time.perf_counter()
+    print(f"🔹 Incremental refresh (new, changed, removed groups): {aggregates.refresh(updated)} "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    check(aggregates, updated)
+    check(aggregates, updated, city=city, category="mexican")
+    print("✅ Incremental refresh matches a full recount")
+    assert aggregates.run("popular_dishes", {"menu_categories": ["not a category"]}) == []
+
+    for subcategory in TEMPLATES:
+        parameters = {"ingredients": ["garlic", "cheese"], "locations": [city]}
+        start = time.perf_counter()
+        for _ in range(100):
+            aggregates.run(subcategory, parameters)
+        served_us = (time.perf_counter() - start) / 100 * 1e6
+        start = time.perf_counter()
+        recount(updated, city)
+        recount_ms = (time.perf_counter() - start) * 1000
+        print(f"⏱️ {subcategory:22s} served in {served_us:6.1f} µs (recounting the rows: {recount_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    test_match_template()
+    test_trending_aggregates()